@@ -0,0 +1,86 @@
+"""
+Offline accuracy and latency comparison of the LLM category classifier against the
+embedding centroid classifier, over a labelled JSONL file of {"query", "category"} rows.
+
+Uses the Pinecone and Ollama settings from backend/.env:
+
+    python -m benchmarks.compare_classifiers [--data benchmarks/data/classifier_eval.jsonl]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), "data", "classifier_eval.jsonl")
+
+
+def load_rows(path: str) -> List[Dict[str, str]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(name: str, rows: List[Dict[str, str]], predictions: List, latencies: List[float]) -> dict:
+    correct = sum(1 for row, pred in zip(rows, predictions) if pred == row["category"])
+    ms = np.asarray(latencies) * 1000
+    return {
+        "classifier": name,
+        "accuracy": round(correct / len(rows), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "mean_ms": round(float(ms.mean()), 2),
+    }
+
+
+async def run(path: str) -> None:
+    from src.core.category_classifier import EmbeddingCategoryClassifier
+    from src.core.clients import chat_bot, pinecone_client
+
+    rows = load_rows(path)
+
+    llm_predictions, llm_latencies = [], []
+    for row in rows:
+        started = time.perf_counter()
+        llm_predictions.append(await chat_bot.aclassify_category(row["query"]))
+        llm_latencies.append(time.perf_counter() - started)
+
+    # a fresh classifier so neither memo nor centroids are shared with the app instance;
+    # centroids are built up front, their one-off cost is not a per-query cost
+    classifier = EmbeddingCategoryClassifier(embedder=pinecone_client, fallback=chat_bot)
+    await classifier.centroids()
+
+    embedding_predictions, embedding_latencies = [], []
+    for row in rows:
+        started = time.perf_counter()
+        embedding_predictions.append(await classifier.aclassify_category(row["query"]))
+        embedding_latencies.append(time.perf_counter() - started)
+
+    report = [
+        summarize("llm", rows, llm_predictions, llm_latencies),
+        {
+            **summarize("embedding", rows, embedding_predictions, embedding_latencies),
+            **classifier.stats(),
+        },
+    ]
+    print(json.dumps(report, indent=2))
+
+    for row, llm_pred, emb_pred in zip(rows, llm_predictions, embedding_predictions):
+        if llm_pred != row["category"] or emb_pred != row["category"]:
+            print(f"- {row['query']!r}: expected={row['category']} llm={llm_pred} embedding={emb_pred}")
+
+    await pinecone_client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DEFAULT_DATA, help="labelled JSONL file")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.data))
+
+
+if __name__ == "__main__":
+    main()
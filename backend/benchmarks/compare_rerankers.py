@@ -0,0 +1,108 @@
+"""
+Latency and top-1 agreement of the local rerankers (core/reranker.py) against the
+hosted Pinecone reranker (bge-reranker-v2-m3). Every query of a JSONL file of
+{"query"} rows is retrieved once with query_documents(top_k); the same candidates go
+to every reranker, and agreement counts how often a local reranker picks the same
+top document as the hosted one.
+
+Uses the Pinecone settings from backend/.env; the ONNX reranker is included when
+RERANKER_ONNX_PATH holds a model and onnxruntime/tokenizers are installed:
+
+    python -m benchmarks.compare_rerankers [--data benchmarks/data/classifier_eval.jsonl] [--top-k 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), "data", "classifier_eval.jsonl")
+
+
+def load_queries(path: str) -> List[str]:
+    with open(path) as f:
+        return [json.loads(line)["query"] for line in f if line.strip()]
+
+
+def summarize(name: str, latencies: List[float], rankings: List[List[str]], reference: List[List[str]]) -> Dict:
+    ms = np.asarray(latencies) * 1000
+    agree = sum(1 for ranking, ref in zip(rankings, reference) if ranking[:1] == ref[:1])
+    # where the hosted reranker's pick landed in this ranking, 1/rank averaged
+    reciprocal = [
+        1 / (ranking.index(ref[0]) + 1) if ref and ref[0] in ranking else 0.0
+        for ranking, ref in zip(rankings, reference)
+    ]
+    return {
+        "reranker": name,
+        "top1_agreement": round(agree / len(reference), 3),
+        "mrr_of_remote_top1": round(float(np.mean(reciprocal)), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    from src.config import settings
+    from src.core.pincone_client import PineconeClient
+    from src.core.reranker import LexicalReranker, OnnxCrossEncoderReranker
+
+    # no local reranker on this client, so rerank_results() is the hosted model
+    client = PineconeClient(
+        api_key=settings.PINECONE_API_KEY,
+        index_name=settings.PINECONE_INDEX_NAME,
+        namespace=settings.PINECONE_NAME_SPACE,
+    )
+
+    local = {"lexical": LexicalReranker()}
+    try:
+        local["onnx"] = OnnxCrossEncoderReranker(settings.RERANKER_ONNX_PATH, threads=settings.RERANKER_THREADS)
+    except Exception as e:
+        print(f"skipping the ONNX reranker: {e}")
+
+    queries = load_queries(args.data)
+    candidates = []
+    for query in queries:
+        vector = await client.aembed_query(query)
+        candidates.append(await client.aquery_documents(vector, top_k=args.top_k))
+
+    remote_latencies, remote_rankings = [], []
+    for query, docs in zip(queries, candidates):
+        started = time.perf_counter()
+        reranked = await client.arerank_results(query, docs, top_n=len(docs))
+        remote_latencies.append(time.perf_counter() - started)
+        remote_rankings.append([doc["id"] for doc in reranked])
+
+    report = [summarize("pinecone", remote_latencies, remote_rankings, remote_rankings)]
+    for name, reranker in local.items():
+        latencies, rankings = [], []
+        for query, docs in zip(queries, candidates):
+            started = time.perf_counter()
+            reranked = await reranker.arerank(query, docs, top_n=len(docs))
+            latencies.append(time.perf_counter() - started)
+            rankings.append([doc["id"] for doc in reranked])
+        report.append(summarize(name, latencies, rankings, remote_rankings))
+
+        for query, ranking, ref in zip(queries, rankings, remote_rankings):
+            if ranking[:1] != ref[:1]:
+                print(f"- [{name}] {query!r}: pinecone={ref[:1]} {name}={ranking[:1]}")
+        reranker.close()
+
+    print(json.dumps(report, indent=2))
+    await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DEFAULT_DATA, help="JSONL file with a `query` per row")
+    parser.add_argument("--top-k", type=int, default=5, help="candidates retrieved per query, as in the chat pipeline")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
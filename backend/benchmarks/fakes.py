@@ -0,0 +1,536 @@
+"""
+Deterministic local stand-ins for the services the backend talks to, so benchmarks
+run on a laptop without network access:
+
+- FakeOllamaServer: an Ollama-compatible HTTP server (/api/chat, /api/generate) that
+  streams a fixed number of tokens with configurable prefill and per-token latency.
+- FakePinecone / FakePineconeAsyncio: Pinecone inference (embed, rerank) and index
+  query over a synthetic FAQ corpus, with configurable per-call latency.
+- MemoryCollection: the subset of the asyncio pymongo collection API the handlers use.
+"""
+import argparse
+import asyncio
+import copy
+import os
+import hashlib
+import json
+import operator
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from bson import ObjectId
+
+CATEGORIES = [
+    "account & registration",
+    "payments & transactions",
+    "technical support & troubleshooting",
+    "regulations & compliance",
+    "security & fraud prevention",
+]
+
+# markers of the prompts in PromptConfig that expect a short, structured reply
+CLASSIFIER_MARKER = "You are a text classification model."
+SUMMARY_MARKER = "You maintain a running summary"
+
+
+def fake_embedding(text: str, dim: int = 1024) -> List[float]:
+    """
+    Unit vector seeded by the text, identical across runs and processes.
+    """
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def _pick(text: str, options: List[str]) -> str:
+    return options[int(hashlib.sha256(text.encode()).hexdigest(), 16) % len(options)]
+
+
+# -----------------------------
+# Ollama
+# -----------------------------
+class FakeOllamaServer:
+    """
+    Ollama-compatible HTTP server on a background thread. Answers take `prefill_ms`
+    before the first token and `token_latency_ms` per token after that; classification
+    and summary prompts get a short reply so the pipeline takes its usual branches.
+    """
+
+    def __init__(
+        self,
+        prefill_ms: float = 30.0,
+        token_latency_ms: float = 5.0,
+        answer_tokens: int = 40,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.prefill_ms = prefill_ms
+        self.token_latency_ms = token_latency_ms
+        self.answer_tokens = answer_tokens
+        self.requests = 0
+
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reply_tokens(self, prompt: str) -> List[str]:
+        if CLASSIFIER_MARKER in prompt:
+            return [_pick(prompt, CATEGORIES)]
+        if SUMMARY_MARKER in prompt:
+            return ["The", " customer", " asked", " about", " their", " account", "."]
+        return [f" tok{i}" for i in range(self.answer_tokens)]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                self._send_json({"status": "Ollama is running"})
+
+            def do_POST(self) -> None:
+                server.requests += 1
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+                if self.path == "/api/chat":
+                    prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+                elif self.path == "/api/generate":
+                    prompt = body.get("prompt", "")
+                else:
+                    self.send_error(404)
+                    return
+
+                chat = self.path == "/api/chat"
+                tokens = server.reply_tokens(prompt)
+                prompt_tokens = len(prompt) // 4 + 1
+
+                started = time.perf_counter()
+                time.sleep(server.prefill_ms / 1000)
+                prefilled = time.perf_counter()
+
+                if body.get("stream", True):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.end_headers()
+                    for token in tokens:
+                        time.sleep(server.token_latency_ms / 1000)
+                        self._write_line(self._part(body, chat, token, done=False))
+                    self._write_line(self._final(body, chat, "", prompt_tokens, len(tokens), started, prefilled))
+                else:
+                    time.sleep(server.token_latency_ms * len(tokens) / 1000)
+                    self._send_json(self._final(body, chat, "".join(tokens), prompt_tokens, len(tokens), started, prefilled))
+
+            def _part(self, body: Dict, chat: bool, token: str, done: bool) -> Dict:
+                part = {"model": body.get("model", "fake"), "created_at": "2025-01-01T00:00:00Z", "done": done}
+                if chat:
+                    part["message"] = {"role": "assistant", "content": token}
+                else:
+                    part["response"] = token
+                return part
+
+            def _final(self, body, chat, text, prompt_tokens, eval_tokens, started, prefilled) -> Dict:
+                finished = time.perf_counter()
+                return {
+                    **self._part(body, chat, text, done=True),
+                    "done_reason": "stop",
+                    "total_duration": int((finished - started) * 1e9),
+                    "load_duration": 0,
+                    "prompt_eval_count": prompt_tokens,
+                    "prompt_eval_duration": int((prefilled - started) * 1e9),
+                    "eval_count": eval_tokens,
+                    "eval_duration": int((finished - prefilled) * 1e9),
+                }
+
+            def _write_line(self, payload: Dict) -> None:
+                self.wfile.write(json.dumps(payload).encode() + b"\n")
+                self.wfile.flush()
+
+            def _send_json(self, payload: Dict) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+# -----------------------------
+# Pinecone
+# -----------------------------
+class FakePineconeCorpus:
+    """
+    Synthetic FAQ corpus with deterministic embeddings, searched exactly.
+    """
+
+    def __init__(self, size: int = 500, dim: int = 1024) -> None:
+        self.dim = dim
+        self.records = []
+        for i in range(size):
+            category = CATEGORIES[i % len(CATEGORIES)]
+            self.records.append({
+                "id": f"faq-{i}",
+                "metadata": {
+                    "category": category,
+                    "question": f"How do I handle {category} case {i}?",
+                    "answer": f"For {category} case {i}, open the app settings and follow the steps shown.",
+                },
+            })
+        self.matrix = np.asarray(
+            [fake_embedding(r["metadata"]["question"], dim) for r in self.records], dtype=np.float32
+        )
+
+    def embed(self, inputs: Iterable[str]):
+        return SimpleNamespace(data=[SimpleNamespace(values=fake_embedding(text, self.dim)) for text in inputs])
+
+    def query(self, vector: List[float], top_k: int) -> Dict:
+        scores = self.matrix @ np.asarray(vector, dtype=np.float32)
+        rows = np.argsort(-scores)[:top_k]
+        return {
+            "matches": [
+                {"id": self.records[row]["id"], "score": float(scores[row]), "metadata": self.records[row]["metadata"]}
+                for row in rows
+            ]
+        }
+
+    @staticmethod
+    def rerank(query: str, documents: List[Dict], top_n: int) -> Dict:
+        words = set(query.lower().split())
+        scored = sorted(
+            documents,
+            key=lambda doc: len(words & set(doc.get("question", "").lower().split())),
+            reverse=True,
+        )
+        return {"data": [{"index": i, "score": 1.0 / (i + 1), "document": doc} for i, doc in enumerate(scored[:top_n])]}
+
+
+class FakePinecone:
+    """
+    Stand-in for pinecone.Pinecone, with a sleep per call to model the network round-trip.
+    """
+
+    def __init__(self, corpus: FakePineconeCorpus, embed_ms: float = 15.0, query_ms: float = 20.0, rerank_ms: float = 25.0) -> None:
+        self.corpus = corpus
+        self.latency = {"embed": embed_ms / 1000, "query": query_ms / 1000, "rerank": rerank_ms / 1000}
+        self.inference = SimpleNamespace(embed=self._embed, rerank=self._rerank)
+
+    def Index(self, name: Optional[str] = None, host: Optional[str] = None):
+        return SimpleNamespace(query=self._query, config=SimpleNamespace(host="fake.pinecone.local"))
+
+    def _embed(self, model: str, inputs: List[str], parameters: Dict):
+        time.sleep(self.latency["embed"])
+        return self.corpus.embed(inputs)
+
+    def _query(self, namespace: str, vector: List[float], top_k: int, **kwargs):
+        time.sleep(self.latency["query"])
+        return self.corpus.query(vector, top_k)
+
+    def _rerank(self, model: str, query: str, documents: List[Dict], top_n: int, **kwargs):
+        time.sleep(self.latency["rerank"])
+        return self.corpus.rerank(query, documents, top_n)
+
+
+class FakePineconeAsyncio(FakePinecone):
+    """
+    Stand-in for pinecone.PineconeAsyncio and its IndexAsyncio.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.inference = SimpleNamespace(embed=self._aembed, rerank=self._arerank)
+
+    def Index(self, name: Optional[str] = None, host: Optional[str] = None):
+        return SimpleNamespace(query=self._aquery, close=self.close)
+
+    async def close(self) -> None:
+        pass
+
+    async def _aembed(self, model: str, inputs: List[str], parameters: Dict):
+        await asyncio.sleep(self.latency["embed"])
+        return self.corpus.embed(inputs)
+
+    async def _aquery(self, namespace: str, vector: List[float], top_k: int, **kwargs):
+        await asyncio.sleep(self.latency["query"])
+        return self.corpus.query(vector, top_k)
+
+    async def _arerank(self, model: str, query: str, documents: List[Dict], top_n: int, **kwargs):
+        await asyncio.sleep(self.latency["rerank"])
+        return self.corpus.rerank(query, documents, top_n)
+
+
+def install_fake_pinecone(client, sync: FakePinecone, asyncio_client: FakePineconeAsyncio) -> None:
+    """
+    Point an existing PineconeClient at the fakes.
+    """
+    client.pc = sync
+    client._index = sync.Index()
+    client._apc = asyncio_client
+    client._aindex = asyncio_client.Index()
+
+
+# -----------------------------
+# MongoDB
+# -----------------------------
+COMPARISONS = {"$lt": operator.lt, "$lte": operator.le, "$gt": operator.gt, "$gte": operator.ge}
+
+
+def _matches(doc: Dict, query: Dict) -> bool:
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(_matches(doc, sub) for sub in cond):
+                return False
+            continue
+
+        value = doc.get(key)
+        if isinstance(cond, dict) and cond and all(op.startswith("$") for op in cond):
+            for op, arg in cond.items():
+                if op == "$exists":
+                    ok = (key in doc) == arg
+                elif op == "$in":
+                    ok = value in arg
+                elif op in COMPARISONS:
+                    ok = value is not None and COMPARISONS[op](value, arg)
+                else:
+                    raise NotImplementedError(f"MemoryCollection does not support {op}")
+                if not ok:
+                    return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _project(doc: Dict, projection: Optional[Dict]) -> Dict:
+    if not projection:
+        return copy.deepcopy(doc)
+    included = {key for key, keep in projection.items() if keep}
+    if included:
+        keep = included | ({"_id"} if projection.get("_id", 1) else set())
+        return {key: copy.deepcopy(value) for key, value in doc.items() if key in keep}
+    return {key: copy.deepcopy(value) for key, value in doc.items() if key not in projection}
+
+
+def _evaluate(doc: Dict, expr: Any) -> Any:
+    # the aggregation expressions the update pipelines use
+    if isinstance(expr, str) and expr.startswith("$"):
+        return doc.get(expr[1:])
+    if not isinstance(expr, dict) or len(expr) != 1 or not next(iter(expr)).startswith("$"):
+        return expr
+
+    (op, args), = expr.items()
+    if op == "$ifNull":
+        value = _evaluate(doc, args[0])
+        return value if value is not None else _evaluate(doc, args[1])
+    if op == "$size":
+        return len(_evaluate(doc, args))
+    if op == "$add":
+        return sum(_evaluate(doc, arg) for arg in args)
+    raise NotImplementedError(f"MemoryCollection does not support {op}")
+
+
+class MemoryCursor:
+    def __init__(self, docs: List[Dict], projection: Optional[Dict]) -> None:
+        self._docs = docs
+        self._projection = projection
+
+    def sort(self, key, direction: int = 1) -> "MemoryCursor":
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self._docs.sort(key=lambda doc: doc.get(field), reverse=order == -1)
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        if count:
+            self._docs = self._docs[:count]
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict]:
+        return [_project(doc, self._projection) for doc in self._docs[:length]]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._docs:
+            yield _project(doc, self._projection)
+
+
+class MemoryCollection:
+    """
+    In-memory collection implementing the asyncio pymongo calls the handlers make.
+    Documents are copied in and out, like a round-trip through BSON.
+    """
+
+    def __init__(self) -> None:
+        self.docs: List[Dict] = []
+
+    async def find_one(self, query: Optional[Dict] = None, projection: Optional[Dict] = None, **kwargs):
+        for doc in self.docs:
+            if _matches(doc, query or {}):
+                return _project(doc, projection)
+        return None
+
+    def find(self, query: Optional[Dict] = None, projection: Optional[Dict] = None, **kwargs) -> MemoryCursor:
+        return MemoryCursor([doc for doc in self.docs if _matches(doc, query or {})], projection)
+
+    async def insert_one(self, doc: Dict):
+        doc.setdefault("_id", ObjectId())
+        self.docs.append(copy.deepcopy(doc))
+        return SimpleNamespace(inserted_id=doc["_id"], acknowledged=True)
+
+    async def insert_many(self, docs: List[Dict], ordered: bool = True):
+        ids = [(await self.insert_one(doc)).inserted_id for doc in docs]
+        return SimpleNamespace(inserted_ids=ids, acknowledged=True)
+
+    async def update_one(self, query: Dict, update: Dict, upsert: bool = False):
+        for doc in self.docs:
+            if _matches(doc, query):
+                self._apply(doc, update)
+                return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    async def find_one_and_update(
+        self, query: Dict, update: Dict, projection: Optional[Dict] = None, return_document: bool = False, **kwargs
+    ):
+        for doc in self.docs:
+            if _matches(doc, query):
+                before = _project(doc, projection)
+                self._apply(doc, update)
+                return _project(doc, projection) if return_document else before
+        return None
+
+    async def delete_one(self, query: Dict):
+        for i, doc in enumerate(self.docs):
+            if _matches(doc, query):
+                del self.docs[i]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, query: Dict):
+        kept = [doc for doc in self.docs if not _matches(doc, query)]
+        deleted, self.docs = len(self.docs) - len(kept), kept
+        return SimpleNamespace(deleted_count=deleted)
+
+    async def create_indexes(self, indexes: List[Any]) -> List[str]:
+        return [index.document["name"] for index in indexes]
+
+    @staticmethod
+    def _apply(doc: Dict, update: Any) -> None:
+        if isinstance(update, list):
+            # an update pipeline, the $set stages the handlers use
+            for stage in update:
+                for op, fields in stage.items():
+                    if op != "$set":
+                        raise NotImplementedError(f"MemoryCollection does not support the {op} stage")
+                    values = {key: _evaluate(doc, value) for key, value in fields.items()}
+                    doc.update(copy.deepcopy(values))
+            return
+
+        for op, fields in update.items():
+            for key, value in fields.items():
+                if op == "$set":
+                    doc[key] = copy.deepcopy(value)
+                elif op == "$unset":
+                    doc.pop(key, None)
+                elif op == "$inc":
+                    doc[key] = doc.get(key, 0) + value
+                elif op == "$push":
+                    items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                    doc.setdefault(key, []).extend(copy.deepcopy(items))
+                else:
+                    raise NotImplementedError(f"MemoryCollection does not support {op}")
+
+
+MONGO_COLLECTIONS = ("async_user_collection", "async_chat_collection", "async_message_collection")
+
+
+def install_memory_mongo() -> Dict[str, MemoryCollection]:
+    """
+    Replace the asyncio collections in src.database, and in every already imported
+    src module that holds a reference to them, with in-memory collections.
+    """
+    import src.database  # noqa: F401, make sure the collections exist before patching
+
+    collections = {name: MemoryCollection() for name in MONGO_COLLECTIONS}
+    for module_name, module in list(sys.modules.items()):
+        if module is not None and module_name.startswith("src."):
+            for name, collection in collections.items():
+                if hasattr(module, name):
+                    setattr(module, name, collection)
+    return collections
+
+
+# -----------------------------
+# Wiring
+# -----------------------------
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Latency and size knobs of the stand-ins, shared by the benchmark entry points.
+    """
+    parser.add_argument("--prefill-ms", type=float, default=30.0, help="fake Ollama time to first token")
+    parser.add_argument("--token-latency-ms", type=float, default=5.0, help="fake Ollama time per generated token")
+    parser.add_argument("--answer-tokens", type=int, default=40, help="tokens per fake Ollama answer")
+    parser.add_argument("--embed-ms", type=float, default=15.0, help="fake Pinecone embed latency")
+    parser.add_argument("--query-ms", type=float, default=20.0, help="fake Pinecone query latency")
+    parser.add_argument("--rerank-ms", type=float, default=25.0, help="fake Pinecone rerank latency")
+    parser.add_argument("--corpus-size", type=int, default=500, help="documents in the fake Pinecone index")
+    parser.add_argument("--mongo-url", help="use this MongoDB (its user_db database) instead of the in-memory one")
+
+
+def start_ollama(args: argparse.Namespace) -> FakeOllamaServer:
+    """
+    Start the fake Ollama server and point the app settings at it. Settings are read
+    when src is first imported, so this runs before any src import.
+    """
+    ollama = FakeOllamaServer(
+        prefill_ms=args.prefill_ms, token_latency_ms=args.token_latency_ms, answer_tokens=args.answer_tokens
+    ).start()
+
+    os.environ.update({
+        "SECRET_KEY": "benchmark-secret",
+        "PINECONE_API_KEY": "benchmark",
+        "PINECONE_INDEX_NAME": "benchmark",
+        "PINECONE_NAME_SPACE": "benchmark",
+        "OLLAMA_HOST": ollama.url,
+        "OLLAMA_MODEL": "benchmark",
+        "DATABASE_URL": args.mongo_url or "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=100",
+        # memory only, a warm cache file from an earlier run would skew the embedding stages
+        "EMBEDDING_CACHE_PATH": "",
+        "VECTOR_BACKEND": "pinecone",
+    })
+    return ollama
+
+
+def install(args: argparse.Namespace) -> None:
+    """
+    Swap the stand-ins into the imported app: Pinecone always, MongoDB unless --mongo-url.
+    """
+    from src.core.clients import pinecone_client
+
+    corpus = FakePineconeCorpus(size=args.corpus_size)
+    latency = dict(embed_ms=args.embed_ms, query_ms=args.query_ms, rerank_ms=args.rerank_ms)
+    install_fake_pinecone(pinecone_client, FakePinecone(corpus, **latency), FakePineconeAsyncio(corpus, **latency))
+
+    if not args.mongo_url:
+        install_memory_mongo()
+
@@ -0,0 +1,313 @@
+"""
+Closed-loop load generator for the chat API. Replays a JSONL corpus of chat sessions
+({"session", "user": "auth" | "guest", "prompt"} per turn, turns of a session in file
+order) with N virtual users at stepped concurrency levels. Every virtual user waits
+for each answer before sending the next turn. For each step it reports throughput,
+latency percentiles, error rate and queueing, and it marks the saturation knee.
+
+Against a running server (e.g. `python -m benchmarks.serve` for a network-free one):
+
+    python -m benchmarks.load --url http://127.0.0.1:8000 --concurrency 1 2 4 8 16 32 \\
+        --label baseline --save baseline-load.json
+
+Compare the capacity of several configurations:
+
+    python -m benchmarks.load --report baseline-load.json tuned-load.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "data", "load_corpus.jsonl")
+
+# a step is saturated once it reaches this share of the best throughput
+SATURATION_SHARE = 0.95
+
+
+def load_sessions(path: str) -> List[Dict]:
+    sessions: Dict[str, Dict] = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                session = sessions.setdefault(row["session"], {"user": row.get("user", "guest"), "turns": []})
+                session["turns"].append(row["prompt"])
+    return list(sessions.values())
+
+
+def _token_user_id(token: str) -> str:
+    # the payload is only read, the server verifies the token
+    payload = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))["_id"]
+
+
+async def sign_in(client: httpx.AsyncClient, count: int) -> List[Tuple[str, str]]:
+    """
+    Register (or log in) `count` load test accounts, returns (token, user_id) pairs.
+    """
+    accounts = []
+    for i in range(count):
+        credentials = {"name": f"load {i}", "email": f"load-{i}@example.com", "password": "load-test-pw"}
+        response = await client.post("/auth/register", json=credentials)
+        if response.status_code == 400:
+            response = await client.post("/auth/login", json=credentials)
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        accounts.append((token, _token_user_id(token)))
+    return accounts
+
+
+class LoadStep:
+    """
+    One concurrency level: `concurrency` virtual users replay sessions in a closed loop
+    for `ramp + duration` seconds; requests started during the ramp are not recorded.
+    """
+
+    def __init__(self, client, sessions, accounts, concurrency, duration, ramp, stream, vary_prompts=False) -> None:
+        self.client = client
+        self.sessions = sessions
+        self.accounts = accounts
+        self.concurrency = concurrency
+        self.duration = duration
+        self.ramp = ramp
+        self.stream = stream
+        self.vary_prompts = vary_prompts
+        self._sent = 0
+
+        self.latencies: List[float] = []
+        self.first_tokens: List[float] = []
+        self.statuses: Counter = Counter()
+        self.inflight_samples: List[int] = []
+        self._inflight = 0
+
+    async def run(self) -> Dict:
+        started = time.perf_counter()
+        self._measure_from = started + self.ramp
+        self._stop_at = self._measure_from + self.duration
+
+        sampler = asyncio.create_task(self._sample_inflight())
+        await asyncio.gather(*(self._virtual_user(k) for k in range(self.concurrency)))
+        sampler.cancel()
+
+        return self.summary()
+
+    async def _virtual_user(self, k: int) -> None:
+        i = k
+        while time.perf_counter() < self._stop_at:
+            session = self.sessions[i % len(self.sessions)]
+            i += self.concurrency
+
+            account = self.accounts[k % len(self.accounts)] if session["user"] == "auth" and self.accounts else None
+            chat_id = None
+            for prompt in session["turns"]:
+                if time.perf_counter() >= self._stop_at:
+                    return
+                chat_id = await self._turn(prompt, account, chat_id)
+
+    async def _turn(self, prompt: str, account: Optional[Tuple[str, str]], chat_id: Optional[str]) -> Optional[str]:
+        self._sent += 1
+        if self.vary_prompts:
+            # unique text per request, so neither the semantic answer cache nor request
+            # coalescing short-circuits
+            prompt = f"{prompt} (request {self._sent})"
+        body = {"prompt": prompt}
+        headers = {}
+        if account:
+            token, user_id = account
+            body.update(user_id=user_id, chat_id=chat_id)
+            headers["Authorization"] = f"Bearer {token}"
+
+        started = time.perf_counter()
+        first_token = None
+        self._inflight += 1
+        try:
+            if self.stream:
+                status, result, first_token = await self._stream(body, headers, started)
+            else:
+                response = await self.client.post("/chats/", json=body, headers=headers)
+                status, result = response.status_code, response.json() if response.status_code == 200 else {}
+        except httpx.TimeoutException:
+            status, result = "timeout", {}
+        except httpx.HTTPError as e:
+            status, result = type(e).__name__, {}
+        finally:
+            self._inflight -= 1
+
+        if self._measure_from <= started < self._stop_at:
+            self.statuses[str(status)] += 1
+            if status == 200:
+                self.latencies.append(time.perf_counter() - started)
+                if first_token is not None:
+                    self.first_tokens.append(first_token)
+
+        return result.get("chat_id") or chat_id
+
+    async def _stream(self, body: Dict, headers: Dict, started: float):
+        first_token = None
+        result: Dict = {}
+        async with self.client.stream("POST", "/chats/stream", json=body, headers=headers) as response:
+            if response.status_code != 200:
+                await response.aread()
+                return response.status_code, result, None
+
+            event = None
+            async for line in response.aiter_lines():
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    if event == "token" and first_token is None:
+                        first_token = time.perf_counter() - started
+                    elif event == "done":
+                        result = json.loads(line[len("data:"):])
+                    elif event == "error":
+                        return "stream_error", result, first_token
+        return 200, result, first_token
+
+    async def _sample_inflight(self) -> None:
+        while True:
+            await asyncio.sleep(0.1)
+            if self._measure_from <= time.perf_counter() <= self._stop_at:
+                self.inflight_samples.append(self._inflight)
+
+    def summary(self) -> Dict:
+        total = sum(self.statuses.values())
+        ok = len(self.latencies)
+        ms = np.asarray(self.latencies or [0.0]) * 1000
+        throughput = ok / self.duration
+
+        summary = {
+            "concurrency": self.concurrency,
+            "requests": total,
+            "throughput_rps": round(throughput, 3),
+            "error_rate": round((total - ok) / total, 4) if total else 0.0,
+            "statuses": dict(self.statuses),
+            "p50_ms": round(float(np.percentile(ms, 50)), 1),
+            "p95_ms": round(float(np.percentile(ms, 95)), 1),
+            "p99_ms": round(float(np.percentile(ms, 99)), 1),
+            "mean_ms": round(float(ms.mean()), 1),
+            # Little's law: requests the server was holding on average
+            "mean_inflight": round(float(np.mean(self.inflight_samples)) if self.inflight_samples else 0.0, 2),
+        }
+        if self.first_tokens:
+            summary["ttft_p50_ms"] = round(float(np.percentile(np.asarray(self.first_tokens) * 1000, 50)), 1)
+            summary["ttft_p95_ms"] = round(float(np.percentile(np.asarray(self.first_tokens) * 1000, 95)), 1)
+        return summary
+
+
+def find_knee(steps: List[Dict]) -> Dict:
+    """
+    The knee is the step with the highest power (throughput / mean latency), where
+    adding users stops buying throughput and only adds queueing. Saturation is the
+    first step within SATURATION_SHARE of the best throughput.
+    """
+    usable = [step for step in steps if step["throughput_rps"] > 0 and step["mean_ms"] > 0]
+    if not usable:
+        return {}
+
+    knee = max(usable, key=lambda step: step["throughput_rps"] / step["mean_ms"])
+    best = max(step["throughput_rps"] for step in usable)
+    saturated = next(step for step in usable if step["throughput_rps"] >= SATURATION_SHARE * best)
+    return {
+        "knee_concurrency": knee["concurrency"],
+        "knee_throughput_rps": knee["throughput_rps"],
+        "knee_p95_ms": knee["p95_ms"],
+        "saturation_concurrency": saturated["concurrency"],
+        "max_throughput_rps": best,
+    }
+
+
+def add_queueing(steps: List[Dict]) -> None:
+    """
+    Queueing per step: mean latency on top of the least loaded step's mean.
+    """
+    if steps:
+        base = steps[0]["mean_ms"]
+        for step in steps:
+            step["queueing_ms"] = round(max(step["mean_ms"] - base, 0.0), 1)
+
+
+def render(reports: List[Dict]) -> str:
+    lines = []
+    for report in reports:
+        lines.append(f"== {report['label']} ({report['url']}, {'stream' if report['stream'] else 'non-stream'})")
+        lines.append(f"{'users':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queue':>8} {'err%':>6} {'inflight':>9}")
+        knee = report.get("knee", {})
+        for step in report["steps"]:
+            mark = ""
+            if step["concurrency"] == knee.get("knee_concurrency"):
+                mark += "  <- knee"
+            if step["concurrency"] == knee.get("saturation_concurrency"):
+                mark += "  <- saturated"
+            lines.append(
+                f"{step['concurrency']:>6} {step['throughput_rps']:>8.2f} {step['p50_ms']:>8.0f} {step['p95_ms']:>8.0f} "
+                f"{step['p99_ms']:>8.0f} {step['queueing_ms']:>8.0f} {step['error_rate'] * 100:>6.1f} {step['mean_inflight']:>9.1f}{mark}"
+            )
+        if knee:
+            lines.append(
+                f"knee at {knee['knee_concurrency']} users ({knee['knee_throughput_rps']} rps, p95 {knee['knee_p95_ms']} ms), "
+                f"max {knee['max_throughput_rps']} rps"
+            )
+        lines.append("")
+    return "\n".join(lines)
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    sessions = load_sessions(args.corpus)
+    limits = httpx.Limits(max_connections=max(args.concurrency) + args.users, max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        accounts = await sign_in(client, args.users) if any(s["user"] == "auth" for s in sessions) else []
+
+        steps = []
+        for concurrency in args.concurrency:
+            step = await LoadStep(
+                client, sessions, accounts, concurrency, args.duration, args.ramp, args.stream, args.vary_prompts
+            ).run()
+            print(f"concurrency {concurrency}: {step}", file=sys.stderr)
+            steps.append(step)
+
+    add_queueing(steps)
+    return {"label": args.label, "url": args.url, "stream": args.stream, "steps": steps, "knee": find_knee(steps)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of the server under test")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL chat sessions to replay")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="virtual users per step")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds per step")
+    parser.add_argument("--ramp", type=float, default=5.0, help="unmeasured seconds at the start of each step")
+    parser.add_argument("--users", type=int, default=8, help="authenticated accounts shared by the virtual users")
+    parser.add_argument("--stream", action="store_true", help="use POST /chats/stream and report time to first token")
+    parser.add_argument("--vary-prompts", action="store_true", help="make every prompt unique to bypass the semantic answer cache and request coalescing")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--label", default="default", help="name of the configuration under test")
+    parser.add_argument("--save", help="write the JSON report to this file")
+    parser.add_argument("--report", nargs="+", help="render saved reports side by side instead of running")
+    args = parser.parse_args()
+
+    if args.report:
+        reports = []
+        for path in args.report:
+            with open(path) as f:
+                reports.append(json.load(f))
+        print(render(reports))
+        return
+
+    report = asyncio.run(run(args))
+    print(render([report]))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Offline latency and allocation benchmark of the chat pipeline, against the local
+stand-ins in benchmarks/fakes.py (Ollama HTTP server, Pinecone, in-memory MongoDB),
+so it runs on a laptop with no network. Drives login, InitChat (first turn and
+follow-ups), getChatHistory and the LangchainClient / PineconeClient methods, and
+reports per-stage and end-to-end p50/p95/p99 plus tracemalloc allocations.
+
+Run from the backend/ directory:
+
+    python -m benchmarks.pipeline [--iterations 50] [--save report.json]
+    python -m benchmarks.pipeline --baseline report.json   # exits 1 on a p95 regression
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import fakes
+
+# scenario name -> coroutine factory taking the iteration number
+Scenario = Callable[[int], Awaitable[None]]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ms = np.asarray(samples) * 1000
+    return {
+        "count": len(samples),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+    }
+
+
+class PipelineBenchmark:
+    """
+    Builds the app against the fakes and runs each scenario sequentially, so the
+    numbers are per-request latencies rather than throughput under load.
+    """
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.stage_samples: List[Dict[str, Tuple[float, float]]] = []
+
+    async def setup(self) -> None:
+        import httpx
+
+        from src.api import chat
+        from src.core.clients import chat_bot, pinecone_client
+        from src.main import app
+
+        fakes.install(self.args)
+
+        # collect the StageGraph timings of every chat request
+        log_timings = chat._log_timings
+
+        def capture(graph):
+            self.stage_samples.append(dict(graph.timings))
+            log_timings(graph)
+
+        chat._log_timings = capture
+
+        self.chat_bot = chat_bot
+        self.pinecone_client = pinecone_client
+        self.http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60)
+
+        email = f"bench-{time.time_ns()}@example.com"
+        response = await self.http.post("/auth/register", json={"name": "bench", "email": email, "password": "benchmark-pw"})
+        response.raise_for_status()
+        self.email = email
+        self.token = response.json()["access_token"]
+
+        import src.database as database
+
+        self.user_id = str((await database.async_user_collection.find_one({"email": email}))["_id"])
+        self.chat_id: Optional[str] = None
+
+    async def teardown(self) -> None:
+        from src.utils.jwt_handler import password_pool
+
+        await self.http.aclose()
+        await self.pinecone_client.aclose()
+        password_pool.shutdown()
+
+    # -----------------------------
+    # Scenarios
+    # -----------------------------
+    def scenarios(self) -> Dict[str, Scenario]:
+        return {
+            "login": self.login,
+            "chat_first_turn": self.chat_first_turn,
+            "chat_follow_up": self.chat_follow_up,
+            "chat_history": self.chat_history,
+            "llm_answer": self.llm_answer,
+            "pinecone_embed": self.pinecone_embed,
+            "pinecone_query": self.pinecone_query,
+            "pinecone_rerank": self.pinecone_rerank,
+        }
+
+    async def login(self, i: int) -> None:
+        response = await self.http.post("/auth/login", json={"email": self.email, "password": "benchmark-pw"})
+        response.raise_for_status()
+
+    async def chat_first_turn(self, i: int) -> None:
+        # distinct prompts, so the semantic answer cache does not short-circuit the pipeline
+        response = await self.http.post("/chats/", json={
+            "prompt": f"How can I update the card limit on account {i}?", "user_id": self.user_id,
+        })
+        response.raise_for_status()
+        self.chat_id = response.json().get("chat_id") or self.chat_id
+
+    async def chat_follow_up(self, i: int) -> None:
+        response = await self.http.post("/chats/", json={
+            "prompt": f"And what happens to pending payment {i}?", "user_id": self.user_id, "chat_id": self.chat_id,
+        })
+        response.raise_for_status()
+        # without a first turn the first call starts the chat
+        self.chat_id = self.chat_id or response.json().get("chat_id")
+
+    async def chat_history(self, i: int) -> None:
+        response = await self.http.get("/chats/history", headers={"Authorization": f"Bearer {self.token}"})
+        response.raise_for_status()
+
+    async def llm_answer(self, i: int) -> None:
+        docs = [{"id": "faq-1", "text": "Open the app settings and follow the steps shown."}]
+        await self.chat_bot.aanswer(f"How do I freeze card {i}?", docs, [])
+
+    async def pinecone_embed(self, i: int) -> None:
+        await self.pinecone_client.aembed_query(f"uncached query {i} {time.time_ns()}")
+
+    async def pinecone_query(self, i: int) -> None:
+        vector = await self.pinecone_client.aembed_query(f"query vector {i % 10}")
+        await self.pinecone_client.aquery_documents(vector, top_k=10)
+
+    async def pinecone_rerank(self, i: int) -> None:
+        vector = await self.pinecone_client.aembed_query(f"query vector {i % 10}")
+        docs = await self.pinecone_client.aquery_documents(vector, top_k=10)
+        await self.pinecone_client.arerank_results(f"query {i}", docs, top_n=3)
+
+    # -----------------------------
+    # Measurement
+    # -----------------------------
+    async def measure(self, name: str, scenario: Scenario) -> Dict:
+        for i in range(self.args.warmup):
+            await scenario(-i - 1)
+
+        self.stage_samples.clear()
+        latencies = []
+        for i in range(self.args.iterations):
+            started = time.perf_counter()
+            await scenario(i)
+            latencies.append(time.perf_counter() - started)
+
+        result = {"end_to_end": percentiles(latencies)}
+
+        stages: Dict[str, List[float]] = {}
+        for timings in self.stage_samples:
+            for stage, (start, end) in timings.items():
+                stages.setdefault(stage, []).append(end - start)
+        if stages:
+            result["stages"] = {stage: percentiles(samples) for stage, samples in stages.items()}
+
+        result["allocations"] = await self.allocations(scenario)
+        return result
+
+    async def allocations(self, scenario: Scenario) -> Dict:
+        """
+        Peak traced memory over a few extra iterations and what they left allocated,
+        with the top allocation sites. Separate from the timed pass, tracemalloc is slow.
+        """
+        iterations = self.args.alloc_iterations
+        if not iterations:
+            return {}
+
+        tracemalloc.start(10)
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+        for i in range(iterations):
+            await scenario(self.args.iterations + i)
+
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        diff = [stat for stat in after.compare_to(before, "lineno") if stat.size_diff > 0]
+        return {
+            "peak_kb": round((peak - baseline) / 1024, 1),
+            "retained_kb_per_iteration": round(sum(stat.size_diff for stat in diff) / iterations / 1024, 2),
+            "allocated_blocks_per_iteration": round(sum(stat.count_diff for stat in diff) / iterations, 1),
+            "top_sites": [
+                f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} +{stat.size_diff / 1024:.1f} KiB"
+                for stat in diff[:3]
+            ],
+        }
+
+    async def run(self) -> Dict:
+        await self.setup()
+        try:
+            selected = self.scenarios()
+            if self.args.only:
+                selected = {name: selected[name] for name in self.args.only}
+
+            report = {}
+            for name, scenario in selected.items():
+                report[name] = await self.measure(name, scenario)
+                print(f"{name}: {report[name]['end_to_end']}", file=sys.stderr)
+            return report
+        finally:
+            await self.teardown()
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Every end-to-end and stage p95 that got slower than the baseline by more than
+    `tolerance` (relative), ignoring sub-millisecond noise.
+    """
+    regressions = []
+    for name, result in report.items():
+        if name not in baseline:
+            continue
+        pairs = [("end_to_end", result["end_to_end"], baseline[name]["end_to_end"])]
+        for stage, stats in result.get("stages", {}).items():
+            if stage in baseline[name].get("stages", {}):
+                pairs.append((stage, stats, baseline[name]["stages"][stage]))
+
+        for label, current, previous in pairs:
+            if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance) and current["p95_ms"] - previous["p95_ms"] > 1.0:
+                regressions.append(f"{name}/{label}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50, help="timed iterations per scenario")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed iterations per scenario")
+    parser.add_argument("--alloc-iterations", type=int, default=10, help="iterations traced with tracemalloc, 0 to skip")
+    parser.add_argument("--only", nargs="+", help="scenarios to run (default: all)")
+    parser.add_argument("--save", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against, exits 1 on a p95 regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative p95 slowdown vs the baseline")
+    fakes.add_arguments(parser)
+    args = parser.parse_args()
+
+    ollama = fakes.start_ollama(args)
+    # per-request INFO logging would dominate the sub-millisecond stages
+    logging.getLogger("src").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    try:
+        report = asyncio.run(PipelineBenchmark(args).run())
+    finally:
+        ollama.stop()
+
+    print(json.dumps(report, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
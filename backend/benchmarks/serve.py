@@ -0,0 +1,36 @@
+"""
+Serve src.main:app on one uvicorn worker against the local stand-ins in
+benchmarks/fakes.py, as a network-free target for benchmarks.load. Run from the
+backend/ directory:
+
+    python -m benchmarks.serve [--port 8000] [--token-latency-ms 5]
+"""
+import argparse
+import logging
+
+import uvicorn
+
+from . import fakes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    fakes.add_arguments(parser)
+    args = parser.parse_args()
+
+    ollama = fakes.start_ollama(args)
+    try:
+        from src.main import app
+
+        fakes.install(args)
+        logging.getLogger("src").setLevel(logging.WARNING)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    finally:
+        ollama.stop()
+
+
+if __name__ == "__main__":
+    main()
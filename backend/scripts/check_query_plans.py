@@ -0,0 +1,84 @@
+"""
+Explain the hot MongoDB queries and exit non-zero when any of them is planned as a
+collection scan (COLLSCAN), e.g. because an index in database.INDEXES is missing or
+no longer matches the query shape. Runs against DATABASE_URL, a local mongod is
+enough (empty collections are fine, the planner still picks the index):
+
+    python -m scripts.check_query_plans [--ensure]
+"""
+import argparse
+import asyncio
+import sys
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from bson import ObjectId
+from pymongo.cursor import Cursor
+
+from src.database import chat_collection, ensure_indexes, message_collection, user_collection
+from src.logger import logging
+
+logger = logging.getLogger(__name__)
+
+# (name, cursor factory) for every query on the request path, in the shape the handlers issue it
+HOT_QUERIES: List[Tuple[str, Callable[[], Cursor]]] = [
+    ("users by email (login, register, token validation)",
+     lambda: user_collection.find({"email": "someone@example.com"}).limit(1)),
+    ("chat history of a user, newest first",
+     lambda: chat_collection.find(
+         {"user_id": ObjectId()}, projection={"title": 1, "created_at": 1}
+     ).sort("created_at", -1)),
+    ("chat by id",
+     lambda: chat_collection.find({"_id": ObjectId(), "user_id": ObjectId()}).limit(1)),
+    ("latest page of chat messages",
+     lambda: message_collection.find({"chat_id": ObjectId(), "seq": {"$gte": 0}}).sort("seq", -1).limit(50)),
+    ("older page of chat messages",
+     lambda: message_collection.find({"chat_id": ObjectId(), "seq": {"$gte": 0, "$lt": 50}}).sort("seq", -1).limit(50)),
+    ("messages of a deleted chat",
+     lambda: message_collection.find({"chat_id": ObjectId()})),
+]
+
+
+def plan_stages(plan: Dict) -> Iterator[str]:
+    """
+    Every stage of an explain() plan tree, depth first.
+    """
+    # 7.0+ slot based engine nests the classic tree under queryPlan
+    plan = plan.get("queryPlan", plan)
+    yield plan["stage"]
+    for child in [plan.get("inputStage"), *plan.get("inputStages", [])]:
+        if child:
+            yield from plan_stages(child)
+
+
+def check() -> List[str]:
+    failures = []
+    for name, query in HOT_QUERIES:
+        stages = list(plan_stages(query().explain()["queryPlanner"]["winningPlan"]))
+        logger.info(f"{name}: {' <- '.join(stages)}")
+
+        if "COLLSCAN" in stages:
+            failures.append(name)
+        elif "SORT" in stages:
+            logger.warning(f"{name}: sorted in memory, the index does not cover the sort order")
+
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ensure", action="store_true", help="create the declared indexes first, as the app does on startup")
+    args = parser.parse_args()
+
+    if args.ensure:
+        asyncio.run(ensure_indexes())
+
+    failures = check()
+    if failures:
+        logger.error(f"Collection scans in {len(failures)} hot queries: {failures}")
+        sys.exit(1)
+
+    logger.info(f"All {len(HOT_QUERIES)} hot queries use an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Export the configured Pinecone namespace into a local index snapshot, for
+VECTOR_BACKEND=local and hybrid search. scripts/ingest.py and scripts/sync_index.py
+re-export an existing snapshot themselves. Run from the backend/ directory:
+
+    python -m scripts.export_local_index [--out data/local_index]
+"""
+import argparse
+
+from src.config import settings
+from src.core.local_index_client import LocalIndexClient
+from src.core.pincone_client import PineconeClient
+from src.logger import logging
+
+logger = logging.getLogger(__name__)
+
+
+def iter_records(client: PineconeClient, batch_size: int):
+    for ids in client.index.list(namespace=client.namespace, limit=batch_size):
+        fetched = client.index.fetch(ids=list(ids), namespace=client.namespace)
+        for vector in fetched.vectors.values():
+            yield {"id": vector.id, "values": vector.values, "metadata": vector.metadata}
+
+
+def export_snapshot(client: PineconeClient, out: str, batch_size: int = 100) -> int:
+    count = LocalIndexClient.write_snapshot(out, iter_records(client, batch_size))
+    logger.info(f"Exported {count} vectors from {client.index_name}/{client.namespace} to {out}")
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=settings.LOCAL_INDEX_PATH, help="snapshot directory")
+    parser.add_argument("--batch-size", type=int, default=100, help="ids fetched per request")
+    args = parser.parse_args()
+
+    client = PineconeClient(
+        api_key=settings.PINECONE_API_KEY,
+        index_name=settings.PINECONE_INDEX_NAME,
+        namespace=settings.PINECONE_NAME_SPACE,
+    )
+
+    export_snapshot(client, args.out, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
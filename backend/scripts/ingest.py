@@ -0,0 +1,117 @@
+"""
+Load an FAQ corpus (CSV/TSV with a header row, or JSONL; `question` and `answer`
+fields, optional `id` and extra metadata) into the configured Pinecone namespace.
+The file is streamed through chunking, batched embedding and parallel upserts.
+Progress is checkpointed after every batch, so an interrupted run picks up where
+it stopped when started again with the same arguments. Every upserted chunk is
+recorded in the index manifest used by scripts/sync_index.py. An existing local
+snapshot (LOCAL_INDEX_PATH) is re-exported afterwards. Run from the backend/ directory:
+
+    python -m scripts.ingest data/faq.csv [--concurrency 4] [--restart]
+"""
+import argparse
+import asyncio
+import os
+
+from src.config import settings
+from src.core.index_version import bump_index_version
+from src.core.local_index_client import METADATA_FILE
+from src.core.pincone_client import PineconeClient
+from src.ingestion import Checkpoint, IngestionPipeline, Manifest, iter_records
+from src.logger import logging
+
+from .export_local_index import export_snapshot
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ingest")
+
+
+def open_client() -> PineconeClient:
+    return PineconeClient(
+        api_key=settings.PINECONE_API_KEY,
+        index_name=settings.PINECONE_INDEX_NAME,
+        namespace=settings.PINECONE_NAME_SPACE,
+    )
+
+
+def open_manifest(client: PineconeClient) -> Manifest:
+    return Manifest(settings.INDEX_MANIFEST_PATH, client.index_name, client.namespace, client.model)
+
+
+def publish(client: PineconeClient) -> None:
+    """
+    Make changed index content visible to the API processes: re-export the local
+    snapshot if there is one (local vector backend, BM25 of hybrid search), then bump
+    the index version they watch. Runs after the ingestion wrote to the index.
+    """
+    if os.path.exists(os.path.join(settings.LOCAL_INDEX_PATH, METADATA_FILE)):
+        try:
+            export_snapshot(client, settings.LOCAL_INDEX_PATH)
+        except Exception as e:
+            logger.error(f"Failed to re-export the snapshot at {settings.LOCAL_INDEX_PATH}, run scripts/export_local_index.py: {e}")
+    bump_index_version(settings.INDEX_VERSION_PATH)
+
+
+async def ingest(args: argparse.Namespace) -> None:
+    client = open_client()
+    manifest = open_manifest(client)
+    checkpoint = Checkpoint(
+        args.checkpoint or os.path.join(CHECKPOINT_DIR, os.path.basename(args.source) + ".checkpoint.json"),
+        key={
+            "source": os.path.abspath(args.source),
+            "index": client.index_name,
+            "namespace": client.namespace,
+            "model": client.model,
+            "max_chars": args.max_chars,
+            "overlap": args.overlap,
+        },
+    )
+    if args.restart:
+        checkpoint.clear()
+
+    pipeline = IngestionPipeline(
+        client,
+        concurrency=args.concurrency,
+        max_chars=args.max_chars,
+        overlap=args.overlap,
+        retries=args.retries,
+        checkpoint=checkpoint,
+        manifest=manifest,
+    )
+    start = pipeline.resume_position()
+    if start:
+        logger.info(f"Resuming {args.source} at row {start} from {checkpoint.path}")
+
+    try:
+        stats = await pipeline.run(iter_records(args.source, start=start), start=start)
+    finally:
+        await client.aclose()
+        manifest.close()
+        # even a partial load changed the index
+        publish(client)
+
+    # a finished load starts from the top next time
+    checkpoint.clear()
+    logger.info(
+        f"Ingested {stats.records} records ({stats.chunks} chunks, {stats.upserted} upserted) into "
+        f"{client.index_name}/{client.namespace} in {stats.elapsed_seconds}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="CSV, TSV or JSONL corpus")
+    parser.add_argument("--concurrency", type=int, default=4, help="batches embedded and upserted at the same time")
+    parser.add_argument("--max-chars", type=int, default=1500, help="longest chunk, longer answers are split")
+    parser.add_argument("--overlap", type=int, default=200, help="characters shared by consecutive chunks")
+    parser.add_argument("--retries", type=int, default=5, help="attempts per batch before the run stops")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: data/ingest/<source>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint and load from the top")
+    args = parser.parse_args()
+
+    asyncio.run(ingest(args))
+
+
+if __name__ == "__main__":
+    main()
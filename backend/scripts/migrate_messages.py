@@ -0,0 +1,58 @@
+"""
+Move the messages embedded in chat documents into the messages collection, one
+document per message keyed on (chat_id, seq). Safe to re-run: messages are upserted
+and the embedded array is only removed once they are stored. The embedded messages
+take seqs 0..n-1; messages the API appended before the migration already sit after
+them, so it can run while the API serves. Run from the backend/ directory:
+
+    python -m scripts.migrate_messages [--batch-size 100]
+"""
+import argparse
+
+from pymongo import UpdateOne
+
+from src.database import chat_collection, message_collection
+from src.logger import logging
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_chat(chat: dict) -> int:
+    messages = chat.get("messages") or []
+    if messages:
+        message_collection.bulk_write([
+            UpdateOne(
+                {"chat_id": chat["_id"], "seq": seq},
+                {"$set": {key: value for key, value in msg.items() if key != "_id"}},
+                upsert=True,
+            )
+            for seq, msg in enumerate(messages)
+        ], ordered=False)
+
+    update = {"$max": {"message_count": len(messages)}, "$unset": {"messages": ""}}
+    updated_at = (messages[-1].get("created_at") if messages else None) or chat.get("created_at")
+    if updated_at is not None:
+        # never moves back a chat the API already appended to
+        update["$max"]["updated_at"] = updated_at
+    chat_collection.update_one({"_id": chat["_id"]}, update)
+    return len(messages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=100, help="chats read per batch")
+    args = parser.parse_args()
+
+    chats = messages = 0
+    cursor = chat_collection.find({"messages": {"$exists": True}}).batch_size(args.batch_size)
+    for chat in cursor:
+        messages += migrate_chat(chat)
+        chats += 1
+        if chats % 1000 == 0:
+            logger.info(f"Migrated {chats} chats so far")
+
+    logger.info(f"Migrated {messages} messages out of {chats} chats")
+
+
+if __name__ == "__main__":
+    main()
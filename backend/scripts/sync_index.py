@@ -0,0 +1,71 @@
+"""
+Incrementally re-index an FAQ corpus (same formats as scripts/ingest.py) against the
+index manifest (INDEX_MANIFEST_PATH): only chunks that are new or whose content or
+embedding model changed are embedded and upserted, and chunks the corpus no longer
+has are deleted from the index. The corpus must be the full content of the
+namespace. An existing local snapshot (LOCAL_INDEX_PATH) is re-exported afterwards.
+Run from the backend/ directory:
+
+    python -m scripts.sync_index data/faq.csv --dry-run   # print the diff only
+    python -m scripts.sync_index data/faq.csv [--keep-removed]
+"""
+import argparse
+import asyncio
+
+from src.ingestion import IngestionPipeline, iter_records
+from src.logger import logging
+
+from .ingest import open_client, open_manifest, publish
+
+logger = logging.getLogger(__name__)
+
+
+async def sync(args: argparse.Namespace) -> None:
+    client = open_client()
+    manifest = open_manifest(client)
+    pipeline = IngestionPipeline(
+        client,
+        concurrency=args.concurrency,
+        max_chars=args.max_chars,
+        overlap=args.overlap,
+        retries=args.retries,
+        manifest=manifest,
+    )
+
+    stats = None
+    try:
+        if args.dry_run:
+            stats = pipeline.diff(iter_records(args.source))
+        else:
+            stats = await pipeline.sync(iter_records(args.source), delete_removed=not args.keep_removed)
+    finally:
+        await client.aclose()
+        manifest.close()
+        # a failed sync may have written part of the diff
+        if not args.dry_run and (stats is None or stats.upserted or stats.deleted):
+            publish(client)
+
+    logger.info(
+        f"{'Diff' if args.dry_run else 'Synced'} {args.source} against {client.index_name}/{client.namespace}: "
+        f"{stats.new} new, {stats.changed} changed, {stats.unchanged} unchanged, "
+        f"{stats.deleted} {'to delete' if args.dry_run or args.keep_removed else 'deleted'} "
+        f"({stats.upserted} upserted in {stats.elapsed_seconds}s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="CSV, TSV or JSONL corpus")
+    parser.add_argument("--dry-run", action="store_true", help="print what would change and exit")
+    parser.add_argument("--keep-removed", action="store_true", help="do not delete chunks missing from the corpus")
+    parser.add_argument("--concurrency", type=int, default=4, help="batches embedded and upserted at the same time")
+    parser.add_argument("--max-chars", type=int, default=1500, help="longest chunk, must match the ingest run")
+    parser.add_argument("--overlap", type=int, default=200, help="characters shared by consecutive chunks")
+    parser.add_argument("--retries", type=int, default=5, help="attempts per batch before the run stops")
+    args = parser.parse_args()
+
+    asyncio.run(sync(args))
+
+
+if __name__ == "__main__":
+    main()
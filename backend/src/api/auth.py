@@ -1,37 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from pymongo.errors import DuplicateKeyError
 
 from ..schemas.user import LoginUser, RegisterUser
-from ..database import user_collection
-from ..utils.jwt_handler import verify_password, create_access_token, decode_access_token, hash_password
+from ..database import async_user_collection
+from ..utils.jwt_handler import averify_password, create_access_token, ahash_password, password_pool
+from ..utils import get_current_user as get_user, get_token_payload
 from ..logger import logging
 from datetime import datetime
 from bson.objectid import ObjectId
 
 router = APIRouter(prefix="/auth", tags=["login"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 logger = logging.getLogger(__name__)
 
-# Dependency to get current user
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    logger.info(f"Decoding token for user... {payload}")
-
-    user = user_collection.find_one({"email": payload.get("email")})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
+# Dependency to get current user, returns the token payload
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    user: dict = Depends(get_user),
+):
     return payload
 
 @router.post("/login")
-def login(
+async def login(
     form_data: LoginUser
 ):
-    user = user_collection.find_one({"email": form_data.email})
-    if not user or not verify_password(form_data.password, user["password"]):
+    user = await async_user_collection.find_one({"email": form_data.email})
+    # bcrypt is CPU bound, it runs in the password hashing processes
+    if not user or not await averify_password(form_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     token = create_access_token(
@@ -45,12 +39,12 @@ def login(
     return {"access_token": token, "token_type": "bearer"}
 
 @router.post("/register")
-def register(
+async def register(
     form_data: RegisterUser
 ):
     logger.info("Registering user... %s", form_data)
     
-    existing_user = user_collection.find_one({"email": form_data.email})
+    existing_user = await async_user_collection.find_one({"email": form_data.email})
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -58,7 +52,7 @@ def register(
         )
 
     # Hash password
-    hashed_pw = hash_password(form_data.password)
+    hashed_pw = await ahash_password(form_data.password)
 
     # Create user document
     new_user = {
@@ -68,8 +62,14 @@ def register(
         "created_at": datetime.utcnow()
     }
 
-    # Insert into MongoDB
-    result = user_collection.insert_one(new_user)
+    # Insert into MongoDB, the unique email index settles concurrent registrations
+    try:
+        result = await async_user_collection.insert_one(new_user)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User already registered with this email"
+        )
 
     logger.info(f"User registered successfully: {new_user['email']}")
 
@@ -81,4 +81,9 @@ def register(
         }
     )
     
-    return {"access_token": token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": token, "token_type": "bearer"}
+
+
+@router.get("/pool/stats", summary="Password hashing pool statistics")
+async def getPasswordPoolStats():
+    return password_pool.stats()
@@ -1,141 +1,516 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+import time
+from contextlib import aclosing
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from bson.objectid import ObjectId
 from bson.errors import InvalidId
+from pymongo import ReturnDocument
 from datetime import datetime, timezone
 from ..logger import logging
 
-# from ..core.ollama_client import OllamaClient
-from ..core.langchain_client import LangchainClient
-from ..core.pincone_client import PineconeClient
-from ..config import settings
-from ..schemas.chat import ChatReq
-from ..models.chat import ChatModel
-from ..database import user_collection, chat_collection
+from ..core.clients import (
+    batch_answerer, category_classifier, chat_bot, chat_flights, conversation_window, index_version,
+    llm_admission, pinecone_client, retrieval_policy, semantic_cache
+)
+from ..core import metrics
+from ..core.admission import PRIORITY_BACKGROUND, PRIORITY_GUEST, PRIORITY_USER
+from ..core.history import HistoryWindow
+from ..core.pipeline import StageGraph
+from ..core.semantic_cache import make_fingerprint
+from ..config import ClassifierOption, settings
+from ..schemas.chat import BatchChatReq, ChatReq
+from ..models.chat import ChatModel, ChatSummaryModel, MessagePageModel
+from ..database import async_user_collection, async_chat_collection, async_message_collection
 from ..utils import get_current_user
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
 
 router = APIRouter(prefix="/chats", tags=["chat"])
 logger = logging.getLogger(__name__)
 
+# strong references to fire-and-forget tasks (summary updates) until they finish
+_background_tasks: Set[asyncio.Task] = set()
 
-# Initialize Pinecone client (do this once)
-API_KEY = settings.PINECONE_API_KEY
-INDEX_NAME = settings.PINECONE_INDEX_NAME
-NAMESPACE = settings.PINECONE_NAME_SPACE
-
-pinecone_client = PineconeClient(
-    api_key=API_KEY,
-    index_name=INDEX_NAME,
-    namespace=NAMESPACE,
-)
+MESSAGES_PAGE_SIZE = 50
+MAX_MESSAGES_PAGE_SIZE = 200
 
-OLLAMA_MODEL = settings.OLLAMA_MODEL
+# chat fields returned by the history list, the messages live in their own collection
+CHAT_SUMMARY_PROJECTION = {"user_id": 1, "title": 1, "message_count": 1, "created_at": 1, "updated_at": 1}
 
-chat_bot = LangchainClient(
-    model=OLLAMA_MODEL
-)
 
 def _now_utc_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
+
+def _chat_object_id(chat_id: str) -> ObjectId:
+    try:
+        return ObjectId(chat_id)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid chat ID format")
+
+
+async def _message_page(
+    chat_obj_id: ObjectId, before: Optional[int] = None, limit: int = MESSAGES_PAGE_SIZE, since: int = 0
+) -> Tuple[List[dict], Optional[int]]:
+    """
+    Load up to `limit` messages of a chat with seq in [since, before), oldest first.
+    Returns the messages and the cursor for the next (older) page, None on the last page.
+    """
+    seq_filter = {"$gte": since}
+    if before is not None:
+        seq_filter["$lt"] = before
+
+    cursor = async_message_collection.find(
+        {"chat_id": chat_obj_id, "seq": seq_filter},
+        projection={"_id": 0, "chat_id": 0}
+    ).sort("seq", -1).limit(limit)
+    messages = (await cursor.to_list())[::-1]
+
+    next_cursor = None
+    if len(messages) == limit and messages[0]["seq"] > since:
+        next_cursor = messages[0]["seq"]
+
+    return messages, next_cursor
+
+
+async def _append_messages(chat_obj_id: ObjectId, user_obj_id: ObjectId, messages: List[dict]) -> bool:
+    """
+    Reserve the next sequence numbers on the chat (owned by the user) and store the
+    messages under them. Returns False when the chat does not exist for this user.
+
+    A chat from before the messages collection has no message_count yet, its embedded
+    messages keep the first seqs (scripts/migrate_messages.py moves them there).
+    """
+    message_count = {"$ifNull": ["$message_count", {"$size": {"$ifNull": ["$messages", []]}}]}
+    chat = await async_chat_collection.find_one_and_update(
+        {"_id": chat_obj_id, "user_id": user_obj_id},
+        [{"$set": {"message_count": {"$add": [message_count, len(messages)]}, "updated_at": datetime.utcnow()}}],
+        projection={"message_count": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not chat:
+        return False
+
+    first_seq = chat["message_count"] - len(messages)
+    await async_message_collection.insert_many([
+        {**msg, "chat_id": chat_obj_id, "seq": first_seq + i}
+        for i, msg in enumerate(messages)
+    ])
+    return True
+
 @router.get(
     "/history",
     response_description="Get All chats",
-    response_model=List[ChatModel],
-    dependencies=[Depends(get_current_user)]
+    response_model=List[ChatSummaryModel],
 )
-def getChatHistory(current_user: str = Depends(get_current_user)):
+async def getChatHistory(current_user: dict = Depends(get_current_user)):
     try:
-        chats = chat_collection.find({ "user_id": current_user["_id"] }).sort("created_at", -1)
+        cursor = async_chat_collection.find(
+            { "user_id": current_user["_id"] },
+            projection=CHAT_SUMMARY_PROJECTION
+        ).sort("created_at", -1)
         
-        return chats
+        return await cursor.to_list()
     except Exception as e:
         logging.error(f"Failed to fetch chats for user {current_user['_id']}: {e}")
         return []
     
+@router.get(
+    "/cache/stats",
+    response_description="Semantic answer cache statistics",
+)
+async def getCacheStats():
+    return semantic_cache.stats()
+
+
+@router.get(
+    "/retrieval/stats",
+    response_description="Adaptive retrieval path statistics",
+)
+async def getRetrievalStats():
+    return retrieval_policy.stats()
+
+
+@router.get(
+    "/admission/stats",
+    response_description="LLM admission queue statistics",
+)
+async def getAdmissionStats():
+    return llm_admission.stats()
+
+
+@router.get(
+    "/coalescing/stats",
+    response_description="First-turn request coalescing statistics",
+)
+async def getCoalescingStats():
+    return chat_flights.stats()
+
+
+@router.post(
+    "/batch",
+    response_description="Answer many prompts, streamed as NDJSON",
+    dependencies=[Depends(get_current_user)]
+)
+async def batchChat(req: BatchChatReq, request: Request):
+    """
+    Answer independent first-turn prompts in bulk (offline evaluation, bulk answering).
+    Streams one JSON line per prompt as it completes, in completion order; `index` is
+    the position in `prompts`. The last line is {"summary": {...}}. Nothing is stored
+    and the semantic cache is not consulted.
+    """
+    if not req.prompts:
+        raise HTTPException(status_code=400, detail="No prompts given")
+    if len(req.prompts) > settings.BATCH_MAX_PROMPTS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.BATCH_MAX_PROMPTS} prompts per batch"
+        )
+
+    logger.info(f"Batch Chat Request Recieved: {len(req.prompts)} prompts")
+
+    async def lines():
+        started = time.perf_counter()
+        answered = failed = 0
+        results = batch_answerer.answer(req.prompts)
+        try:
+            async for result in results:
+                if await request.is_disconnected():
+                    logger.info("Client disconnected, cancelling batch")
+                    return
+
+                if result["error"]:
+                    failed += 1
+                else:
+                    answered += 1
+                yield json.dumps(result) + "\n"
+        finally:
+            await results.aclose()
+
+        yield json.dumps({"summary": {
+            "prompts": len(req.prompts),
+            "answered": answered,
+            "failed": failed,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }}) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     "/{chat_id}",
     response_description="Get a single chat",
     response_model=ChatModel,
     dependencies=[Depends(get_current_user)]
 )
-def getChat(chat_id: str):
-    try:
-        chat = chat_collection.find_one({"_id": ObjectId(chat_id) })
+async def getChat(
+    chat_id: str,
+    limit: int = Query(MESSAGES_PAGE_SIZE, ge=1, le=MAX_MESSAGES_PAGE_SIZE),
+):
+    """
+    The chat with its latest `limit` messages, older ones are paged in with
+    GET /chats/{chat_id}/messages?before=<next_cursor>.
+    """
+    chat_obj_id = _chat_object_id(chat_id)
 
-        if not chat:
-            raise HTTPException(status_code=404, detail="Chat not found")
-    except InvalidId:
-        raise HTTPException(status_code=400, detail="Invalid chat ID format")
+    chat, (messages, next_cursor) = await asyncio.gather(
+        async_chat_collection.find_one({"_id": chat_obj_id }, projection={"messages": 0}),
+        _message_page(chat_obj_id, limit=limit),
+    )
+
+    if not chat:
+        raise HTTPException(status_code=404, detail="Chat not found")
+
+    chat["messages"] = messages
+    chat["next_cursor"] = next_cursor
     
     return chat
 
 
+@router.get(
+    "/{chat_id}/messages",
+    response_description="Get a page of chat messages",
+    response_model=MessagePageModel,
+    dependencies=[Depends(get_current_user)]
+)
+async def getChatMessages(
+    chat_id: str,
+    before: Optional[int] = Query(None, ge=0, description="next_cursor of the previous page"),
+    limit: int = Query(MESSAGES_PAGE_SIZE, ge=1, le=MAX_MESSAGES_PAGE_SIZE),
+):
+    messages, next_cursor = await _message_page(_chat_object_id(chat_id), before=before, limit=limit)
+
+    return {"messages": messages, "next_cursor": next_cursor}
+
+
 @router.delete(
     "/{chat_id}",
     response_description="Delete a single chat",
     dependencies=[Depends(get_current_user)]
 )
-def deleteChat(chat_id: str):
+async def deleteChat(chat_id: str):
     try:
-        result = chat_collection.delete_one({"_id": ObjectId(chat_id)})
+        result = await async_chat_collection.delete_one({"_id": ObjectId(chat_id)})
     except InvalidId:
         raise HTTPException(status_code=400, detail="Invalid chat id")
 
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Chat not found")
 
+    await async_message_collection.delete_many({"chat_id": ObjectId(chat_id)})
+
     return {"message": "Chat deleted"}
 
 
-#  Can be improved to fetch user_id via JWT token
-@router.post(
-    "/",
-    response_description="Initiate chat",
-)
-def InitChat(req : ChatReq):
-    logger.info(f"Init Chat Request Recieved: {req}")
+async def _classify(prompt: str, prompt_vector: Optional[List[float]] = None) -> Optional[str]:
+    if settings.CLASSIFIER_MODE == ClassifierOption.EMBEDDING:
+        return await category_classifier.aclassify_category(prompt, query_vector=prompt_vector)
+
+    category = await chat_bot.aclassify_category(prompt)
+    metrics.CLASSIFICATIONS.labels("llm" if category is not None else "failed").inc()
+    return category
+
+
+async def _embed_query(prompt: str, category: Optional[str], prompt_vector: List[float]) -> List[float]:
+    if not category:
+        return prompt_vector
 
-    prompt: str = req.prompt
-    user_id: Optional[str] = getattr(req, "user_id", None)
-    chat_id: Optional[str] = getattr(req, "chat_id", None)
-    
-    category = chat_bot.classify_category(prompt)
-    
     # create query text for vector search
-    query_text = ("Category: " + category + " | Query: " if category else "") + prompt
+    query_text = "Category: " + category + " | Query: " + prompt
 
-    query_vector = pinecone_client.embed_query(query_text)
-    
-    # fetch relevent docs from pincone with cosine similarity
-    docs = pinecone_client.query_documents(
-        query_vector=query_vector
+    return await pinecone_client.aembed_query(query_text)
+
+
+async def _rerank(prompt: str, docs) -> list:
+    # rerank the relevent docs with ssimilarity with prompt, or take a clear top hit as is
+    reranked_docs = await retrieval_policy.arerank(pinecone_client, prompt, docs)
+    logger.info(f"Final Doc selected for LLm context: {reranked_docs}")
+
+    return reranked_docs
+
+
+def _start_pipeline(prompt: str, user_id: Optional[str], chat_id: Optional[str]) -> StageGraph:
+    """
+    Schedule every stage up to the LLM context as a dependency graph:
+
+        embed_prompt -> cache**, classify*, speculative_query
+        classify -> embed_query -> query -> rerank
+        history, user (independent)
+
+    The raw prompt is embedded once and retrieval on it starts speculatively while the
+    classifier runs; without a category the query text is the raw prompt, so the
+    speculative result is the final one. (*in LLM mode classify starts right away.
+    **first turns only, follow-ups depend on the chat history and are not cached.)
+    """
+    graph = StageGraph()
+
+    graph.add("embed_prompt", lambda: pinecone_client.aembed_query(prompt))
+    if not chat_id:
+        graph.add("cache", lambda vector: _cache_lookup(prompt, vector), "embed_prompt")
+    graph.add("history", lambda: _prev_messages(chat_id))
+    graph.add("user", lambda: _load_user(user_id))
+
+    if settings.CLASSIFIER_MODE == ClassifierOption.EMBEDDING:
+        graph.add("classify", lambda vector: _classify(prompt, vector), "embed_prompt")
+    else:
+        graph.add("classify", lambda: _classify(prompt))
+
+    graph.add(
+        "speculative_query",
+        lambda vector: pinecone_client.aquery_documents(
+            query_vector=vector, top_k=retrieval_policy.fetch_k, query_text=prompt
+        ),
+        "embed_prompt"
     )
-    
-    # rerank the relevent docs with ssimilarity with prompt
-    reranked_docs = pinecone_client.rerank_results(
-        query_vector=prompt,
-        documents=docs
+    graph.add(
+        "embed_query",
+        lambda category, vector: _embed_query(prompt, category, vector),
+        "classify", "embed_prompt"
     )
-    logger.info(f"Final Doc selected for LLm context: {reranked_docs}")
-    
-    messages= []
-    
-    # append old conversation if there is any
-    if chat_id:
-        chat = getChat(chat_id)
-        messages = chat["messages"]
-        
-    bot_answer = chat_bot.answer(
-        user_query=prompt,
-        docs=reranked_docs,
-        prev_messages=messages
+
+    async def query(category: Optional[str], query_vector: List[float]):
+        if not category:
+            return await graph.result("speculative_query")
+
+        graph.cancel("speculative_query")
+        # fetch relevent docs from pincone with cosine similarity
+        return await pinecone_client.aquery_documents(
+            query_vector=query_vector, top_k=retrieval_policy.fetch_k, query_text=prompt
+        )
+
+    graph.add("query", query, "classify", "embed_query")
+    graph.add("rerank", lambda docs: _rerank(prompt, docs), "query")
+
+    return graph
+
+
+def _priority(user_id: Optional[str], chat_id: Optional[str]) -> int:
+    # signed-in users (a user_id or an existing chat) go ahead of guests for the LLM
+    return PRIORITY_USER if user_id or chat_id else PRIORITY_GUEST
+
+
+async def _answer(prompt: str, docs: list, history: HistoryWindow, priority: int) -> str:
+    async with llm_admission.slot(priority):
+        return await chat_bot.aanswer(
+            user_query=prompt, docs=docs, prev_messages=history.messages, summary=history.summary
+        )
+
+
+def _flight_key(prompt: str, priority: int) -> Tuple[int, str]:
+    # prompts differing only in case and spacing get the same answer; users and guests
+    # coalesce apart, so a guest's run never sets a signed-in user's LLM priority
+    return priority, " ".join(prompt.lower().split())
+
+
+async def _first_turn_answer(prompt: str, priority: int) -> str:
+    """
+    Answer a first-turn prompt (cache, retrieval, generation) with nothing specific to
+    the user, so concurrent requests for the same prompt can share the run. The graph
+    is reported here, whether or not the request that started the run is still there.
+    """
+    started = time.perf_counter()
+    graph = _start_pipeline(prompt, None, None)
+    try:
+        cached_answer = await graph.result("cache")
+        if cached_answer is not None:
+            graph.cancel("classify", "speculative_query", "embed_query", "query", "rerank", "history")
+            return cached_answer
+
+        # a 429 now, before retrieval, if the LLM queue is too long to wait in
+        llm_admission.check(priority)
+        graph.add("answer", lambda docs, history: _answer(prompt, docs, history, priority), "rerank", "history")
+        bot_answer = await graph.result("answer")
+        _cache_store(await graph.result("embed_prompt"), prompt, bot_answer, None, started)
+        return bot_answer
+    except BaseException:
+        graph.cancel_pending()
+        raise
+    finally:
+        _log_timings(graph)
+
+
+def _log_timings(graph: StageGraph) -> None:
+    metrics.observe_stages(graph.timings)
+    logger.info("Chat pipeline timings: %s", graph.report())
+
+
+def _cache_fingerprint() -> str:
+    # the index version changes when scripts/ingest.py or sync_index.py rewrote the content
+    return make_fingerprint(
+        pinecone_client.index_name, pinecone_client.namespace, pinecone_client.model, chat_bot.config,
+        index_version.current(),
     )
-    
+
+
+async def _cache_lookup(prompt: str, prompt_vector: List[float]) -> Optional[str]:
+    """
+    Look a first-turn prompt up in the semantic cache.
+    """
+    if not semantic_cache.enabled:
+        return None
+
+    return semantic_cache.lookup(prompt_vector, _cache_fingerprint())
+
+
+def _cache_store(
+    prompt_vector: List[float], prompt: str, bot_answer: str, chat_id: Optional[str], started: float
+) -> None:
+    if semantic_cache.enabled and not chat_id and bot_answer:
+        semantic_cache.put(
+            prompt_vector, prompt, bot_answer, _cache_fingerprint(),
+            cost_seconds=time.perf_counter() - started
+        )
+
+
+async def _prev_messages(chat_id: Optional[str]) -> HistoryWindow:
+    # append old conversation if there is any, bounded by the conversation window
+    if chat_id:
+        chat_obj_id = _chat_object_id(chat_id)
+        chat = await async_chat_collection.find_one(
+            {"_id": chat_obj_id}, projection={"summary": 1, "summarized_count": 1}
+        )
+        if not chat:
+            raise HTTPException(status_code=404, detail="Chat not found")
+
+        # only the unsummarized tail is read: the verbatim window plus some overflow
+        # that is still waiting to be summarized; an older backlog is skipped
+        summarized_count = chat.get("summarized_count", 0)
+        pending, _ = await _message_page(
+            chat_obj_id, limit=conversation_window.max_turns * 4, since=summarized_count
+        )
+        if pending:
+            summarized_count = pending[0]["seq"]
+
+        return conversation_window.select(pending, chat.get("summary"), summarized_count)
+
+    return HistoryWindow()
+
+
+def _schedule_summary(
+    chat_id: Optional[str], user_id: Optional[str], history: HistoryWindow, prompt: str, bot_answer: str
+) -> None:
+    """
+    Once a stored turn pushes messages out of the verbatim window, fold them into the
+    chat summary in the background, off the request's critical path.
+    """
+    if not chat_id or user_id is None:
+        return
+
+    turn = [{"role": "user", "text": prompt}, {"role": "system", "text": bot_answer}]
+    window = conversation_window.select(history.overflow + history.messages + turn, history.summary)
+    if not window.overflow:
+        return
+
+    task = asyncio.create_task(_update_summary(chat_id, history, window.overflow))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _update_summary(chat_id: str, history: HistoryWindow, overflow: List[dict]) -> None:
+    try:
+        async with llm_admission.slot(PRIORITY_BACKGROUND):
+            summary = await chat_bot.asummarize(history.summary, overflow)
+        if not summary:
+            return
+
+        # summaries only move forward: a concurrent turn may already have stored one
+        # covering more messages
+        summarized_count = history.summarized_count + len(overflow)
+        await async_chat_collection.update_one(
+            {
+                "_id": ObjectId(chat_id),
+                "$or": [
+                    {"summarized_count": {"$lt": summarized_count}},
+                    {"summarized_count": {"$exists": False}},
+                ],
+            },
+            {"$set": {"summary": summary, "summarized_count": summarized_count}}
+        )
+        logger.info(f"Summarized {len(overflow)} messages of chat {chat_id}")
+    except Exception as e:
+        logger.error(f"Failed to update summary of chat {chat_id}: {e}")
+
+
+async def _load_user(user_id: Optional[str]):
+    if user_id is None:
+        return None
+
+    return await async_user_collection.find_one({"_id": ObjectId(user_id) })
+
+
+async def _save_chat(
+    prompt: str, bot_answer: str, user_id: Optional[str], chat_id: Optional[str], user: Optional[dict]
+) -> dict:
+    """
+    Persist the user prompt and bot answer for a logged in user.
+    Returns the response body sent back to the client.
+    """
     if user_id is not None:
         logger.info(f"Storing chat message for user_id: {user_id}")
-        
-        user = user_collection.find_one({"_id": ObjectId(user_id) })
 
         user_msg = {
             "role": "user",
@@ -152,23 +527,177 @@ def InitChat(req : ChatReq):
         if chat_id:
             try:
                 chat_obj_id = ObjectId(chat_id)
-                chat_collection.update_one(
-                    {"_id": chat_obj_id, "user_id": ObjectId(user_id)},
-                    {"$push": {"messages": {"$each": [user_msg, system_msg]}}}
-                )
+                await _append_messages(chat_obj_id, ObjectId(user_id), [user_msg, system_msg])
                 
                 return { "response": bot_answer }
             except InvalidId:
                 logger.error(f"Invalid chat_id provided: {chat_id}")
                 
         elif (user):
-            result = chat_collection.insert_one({
+            result = await async_chat_collection.insert_one({
                 "user_id": ObjectId(user_id),
                 "title": prompt,
-                "messages": [user_msg, system_msg],
+                "message_count": 0,
                 "created_at": datetime.utcnow(),
             })
+            await _append_messages(result.inserted_id, ObjectId(user_id), [user_msg, system_msg])
             
             return { "response": bot_answer, "title": prompt, "chat_id": str(result.inserted_id) }
 
     return { "response": bot_answer }
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post(
+    "/stream",
+    response_description="Initiate chat and stream the answer as Server-Sent Events",
+)
+async def InitChatStream(req: ChatReq, request: Request):
+    """
+    Streaming variant of `InitChat`. Emits one `token` event per generated token and a
+    final `done` event carrying the same body `InitChat` returns. The chat is stored
+    once the stream completes; a client disconnect stops generation and nothing is stored.
+    """
+    logger.info(f"Init Chat Stream Request Recieved: {req}")
+
+    prompt: str = req.prompt
+    user_id: Optional[str] = getattr(req, "user_id", None)
+    chat_id: Optional[str] = getattr(req, "chat_id", None)
+
+    priority = _priority(user_id, chat_id)
+
+    started = time.perf_counter()
+    graph = _start_pipeline(prompt, user_id, chat_id)
+    try:
+        cached_answer = None if chat_id else await graph.result("cache")
+        if cached_answer is not None:
+            graph.cancel("classify", "speculative_query", "embed_query", "query", "rerank", "history")
+        else:
+            # a 429 now, before retrieval, if the LLM queue is too long to wait in
+            llm_admission.check(priority)
+            prompt_vector = await graph.result("embed_prompt")
+            reranked_docs = await graph.result("rerank")
+            history = await graph.result("history")
+        user = await graph.result("user")
+    except BaseException:
+        graph.cancel_pending()
+        _log_timings(graph)
+        raise
+
+    async def event_stream():
+        # the answer and persist stages run here, the graph is reported once the stream ends
+        try:
+            if cached_answer is not None:
+                yield _sse_event("token", {"token": cached_answer})
+                with graph.timed("persist", "user"):
+                    body = await _save_chat(prompt, cached_answer, user_id, chat_id, user)
+                yield _sse_event("done", body)
+                return
+
+            tokens: List[str] = []
+            disconnected = False
+            try:
+                with graph.timed("answer", "rerank", "history"):
+                    async with llm_admission.slot(priority):
+                        # closing the generator aborts the Ollama request right away, not at GC
+                        async with aclosing(chat_bot.answer_stream(
+                            user_query=prompt,
+                            docs=reranked_docs,
+                            prev_messages=history.messages,
+                            summary=history.summary
+                        )) as answer_tokens:
+                            async for token in answer_tokens:
+                                if await request.is_disconnected():
+                                    logger.info("Client disconnected, cancelling chat generation")
+                                    disconnected = True
+                                    break
+
+                                tokens.append(token)
+                                yield _sse_event("token", {"token": token})
+            except HTTPException as e:
+                # shed while waiting for an LLM slot, the 200 was already sent
+                yield _sse_event("error", {"detail": e.detail, "retry_after": int(e.headers["Retry-After"])})
+                return
+            except Exception as e:
+                logger.error(f"Streaming generation failed: {e}")
+                yield _sse_event("error", {"detail": "Failed to generate answer"})
+                return
+
+            if disconnected:
+                # a cut-off answer is neither reported as a finished stage nor stored
+                graph.discard("answer")
+                return
+
+            bot_answer = "".join(tokens)
+            _cache_store(prompt_vector, prompt, bot_answer, chat_id, started)
+
+            with graph.timed("persist", "answer", "user"):
+                body = await _save_chat(prompt, bot_answer, user_id, chat_id, user)
+            _schedule_summary(chat_id, user_id, history, prompt, bot_answer)
+            yield _sse_event("done", body)
+        finally:
+            _log_timings(graph)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+#  Can be improved to fetch user_id via JWT token
+@router.post(
+    "/",
+    response_description="Initiate chat",
+)
+async def InitChat(req : ChatReq):
+    logger.info(f"Init Chat Request Recieved: {req}")
+
+    prompt: str = req.prompt
+    user_id: Optional[str] = getattr(req, "user_id", None)
+    chat_id: Optional[str] = getattr(req, "chat_id", None)
+    priority = _priority(user_id, chat_id)
+
+    if not chat_id:
+        # identical first-turn prompts in flight share one pipeline run, every request
+        # still stores its own chat
+        user_task = asyncio.ensure_future(_load_user(user_id))
+        try:
+            bot_answer, joined = await chat_flights.run(
+                _flight_key(prompt, priority), lambda: _first_turn_answer(prompt, priority)
+            )
+            user = await user_task
+        except BaseException:
+            user_task.cancel()
+            raise
+        metrics.COALESCED_REQUESTS.labels("joined" if joined else "started").inc()
+
+        # the shared run reported its graph, the chat each request stores is timed apart
+        persist_started = time.perf_counter()
+        body = await _save_chat(prompt, bot_answer, user_id, chat_id, user)
+        metrics.CHAT_STAGE_SECONDS.labels("persist").observe(time.perf_counter() - persist_started)
+        return body
+
+    # a follow-up turn, never cached nor coalesced: the answer depends on the chat history
+    graph = _start_pipeline(prompt, user_id, chat_id)
+    try:
+        # a 429 now, before retrieval, if the LLM queue is too long to wait in
+        llm_admission.check(priority)
+        graph.add("answer", lambda docs, history: _answer(prompt, docs, history, priority), "rerank", "history")
+        graph.add(
+            "persist",
+            lambda bot_answer, user: _save_chat(prompt, bot_answer, user_id, chat_id, user),
+            "answer", "user"
+        )
+        body = await graph.result("persist")
+        _schedule_summary(chat_id, user_id, await graph.result("history"), prompt, body["response"])
+
+        return body
+    except BaseException:
+        graph.cancel_pending()
+        raise
+    finally:
+        _log_timings(graph)
@@ -10,7 +10,7 @@ logger = logging.getLogger(__name__)
 
 
 @router.get("/", summary="Health Check Endpoint")
-def health():
+async def health():
     logger.info("Health check endpoint called.")
     
     return JSONResponse(
@@ -14,17 +14,142 @@ class CryptSettings(BaseSettings):
     SECRET_KEY: SecretStr = config("SECRET_KEY", cast=SecretStr)
     ALGORITHM: str = config("ALGORITHM", default="HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = config("ACCESS_TOKEN_EXPIRE_MINUTES", default=30)
+    # verified tokens kept until their own `exp`, see utils/auth_cache.py
+    AUTH_TOKEN_CACHE_SIZE: int = config("AUTH_TOKEN_CACHE_SIZE", cast=int, default=10000)
+    # how long a user looked up for a token is trusted without going back to MongoDB, also
+    # how long a user changed outside the API is served stale
+    AUTH_USER_CACHE_TTL_SECONDS: int = config("AUTH_USER_CACHE_TTL_SECONDS", cast=int, default=60)
+    AUTH_USER_CACHE_SIZE: int = config("AUTH_USER_CACHE_SIZE", cast=int, default=10000)
+    # bcrypt runs in its own processes, see utils/password_pool.py
+    PASSWORD_HASH_WORKERS: int = config("PASSWORD_HASH_WORKERS", cast=int, default=2)
+    PASSWORD_HASH_MAX_QUEUE: int = config("PASSWORD_HASH_MAX_QUEUE", cast=int, default=64)
 
 class OpenAISettings(BaseSettings):
     OPENAI_API_KEY: str = config("OPENAI_API_KEY", default="")
 
+class VectorBackendOption(Enum):
+    PINECONE = "pinecone"
+    LOCAL = "local"
+
 class PineconeSettings(BaseSettings):
     PINECONE_API_KEY: str = config("PINECONE_API_KEY", default="")
     PINECONE_INDEX_NAME: str = config("PINECONE_INDEX_NAME", default="")
     PINECONE_NAME_SPACE: str = config("PINECONE_NAME_SPACE", default="")
+    VECTOR_BACKEND: VectorBackendOption = config("VECTOR_BACKEND", cast=VectorBackendOption, default=VectorBackendOption.PINECONE)
+    # snapshot directory written by scripts/export_local_index.py, used when VECTOR_BACKEND=local
+    LOCAL_INDEX_PATH: str = config("LOCAL_INDEX_PATH", default=os.path.join(current_file_dir, "..", "data", "local_index"))
+    LOCAL_INDEX_HNSW_THRESHOLD: int = config("LOCAL_INDEX_HNSW_THRESHOLD", cast=int, default=50000)
+    LOCAL_INDEX_HNSW_EF: int = config("LOCAL_INDEX_HNSW_EF", cast=int, default=64)
+    # vectors kept in each worker's LRU, float32: ~4 KB apiece at 1024 dims (~40 MB by default)
+    EMBEDDING_CACHE_SIZE: int = config("EMBEDDING_CACHE_SIZE", cast=int, default=10000)
+    # SQLite file shared by the workers on this host, empty to keep the cache in memory only
+    EMBEDDING_CACHE_PATH: str = config(
+        "EMBEDDING_CACHE_PATH", default=os.path.join(current_file_dir, "..", "data", "embedding_cache.sqlite3")
+    )
+    # chunk id -> content hash -> embedding model of what scripts/ingest.py and sync_index.py wrote
+    INDEX_MANIFEST_PATH: str = config(
+        "INDEX_MANIFEST_PATH", default=os.path.join(current_file_dir, "..", "data", "index_manifest.sqlite3")
+    )
+    # stamp rewritten by the ingestion scripts, part of the semantic cache fingerprint
+    INDEX_VERSION_PATH: str = config(
+        "INDEX_VERSION_PATH", default=os.path.join(current_file_dir, "..", "data", "index_version")
+    )
+
+class HybridSearchSettings(BaseSettings):
+    # BM25 over the LOCAL_INDEX_PATH snapshot metadata, fused with the dense hits (core/sparse_index.py)
+    HYBRID_SEARCH_ENABLED: bool = config("HYBRID_SEARCH_ENABLED", cast=bool, default=False)
+    HYBRID_RRF_K: int = config("HYBRID_RRF_K", cast=int, default=60)
+    BM25_K1: float = config("BM25_K1", cast=float, default=1.2)
+    BM25_B: float = config("BM25_B", cast=float, default=0.75)
+
+class RerankerOption(Enum):
+    PINECONE = "pinecone"
+    LEXICAL = "lexical"
+    ONNX = "onnx"
+
+class RerankerSettings(BaseSettings):
+    # "pinecone" calls the hosted bge-reranker-v2-m3, the others rerank in process (core/reranker.py)
+    RERANKER_BACKEND: RerankerOption = config("RERANKER_BACKEND", cast=RerankerOption, default=RerankerOption.PINECONE)
+    # directory with model.onnx and tokenizer.json, for RERANKER_BACKEND=onnx
+    RERANKER_ONNX_PATH: str = config("RERANKER_ONNX_PATH", default=os.path.join(current_file_dir, "..", "data", "reranker"))
+    RERANKER_THREADS: int = config("RERANKER_THREADS", cast=int, default=2)
+
+class RetrievalSettings(BaseSettings):
+    # adaptive rerank depth from the dense similarity scores (core/retrieval_policy.py)
+    RETRIEVAL_ADAPTIVE_ENABLED: bool = config("RETRIEVAL_ADAPTIVE_ENABLED", cast=bool, default=True)
+    RETRIEVAL_TOP_K: int = config("RETRIEVAL_TOP_K", cast=int, default=5)
+    RETRIEVAL_WIDE_TOP_K: int = config("RETRIEVAL_WIDE_TOP_K", cast=int, default=15)
+    RETRIEVAL_SKIP_SCORE: float = config("RETRIEVAL_SKIP_SCORE", cast=float, default=0.9)
+    RETRIEVAL_SKIP_MARGIN: float = config("RETRIEVAL_SKIP_MARGIN", cast=float, default=0.1)
+    RETRIEVAL_FLAT_SPREAD: float = config("RETRIEVAL_FLAT_SPREAD", cast=float, default=0.02)
 
 class OllamaSettings(BaseSettings):
     OLLAMA_MODEL: str = config("OLLAMA_MODEL", default="llama3.2:3b")
+    # how long Ollama keeps the model loaded after a call, -1 pins it while Ollama runs
+    OLLAMA_KEEP_ALIVE: str = config("OLLAMA_KEEP_ALIVE", default="30m")
+    # load the model and prefill the system prompt on startup
+    OLLAMA_WARMUP_ENABLED: bool = config("OLLAMA_WARMUP_ENABLED", cast=bool, default=True)
+    # ...and again after this many idle seconds, 0 for startup only
+    OLLAMA_KEEP_WARM_SECONDS: int = config("OLLAMA_KEEP_WARM_SECONDS", cast=int, default=240)
+    # small, fast model for category classification, empty to use OLLAMA_MODEL
+    OLLAMA_CLASSIFIER_MODEL: str = config("OLLAMA_CLASSIFIER_MODEL", default="")
+    OLLAMA_CLASSIFIER_NUM_PREDICT: int = config("OLLAMA_CLASSIFIER_NUM_PREDICT", cast=int, default=16)
+    # comma separated, backslash escapes like \n are decoded
+    OLLAMA_CLASSIFIER_STOP: str = config("OLLAMA_CLASSIFIER_STOP", default="\\n")
+    # classification calls in flight, answers/summaries are limited by LLM_MAX_CONCURRENCY
+    OLLAMA_CLASSIFIER_CONCURRENCY: int = config("OLLAMA_CLASSIFIER_CONCURRENCY", cast=int, default=8)
+
+
+class AdmissionSettings(BaseSettings):
+    # answer LLM calls in flight and queued, signed-in users ahead of guests (core/admission.py)
+    LLM_ADMISSION_ENABLED: bool = config("LLM_ADMISSION_ENABLED", cast=bool, default=True)
+    LLM_MAX_CONCURRENCY: int = config("LLM_MAX_CONCURRENCY", cast=int, default=4)
+    LLM_MAX_QUEUE: int = config("LLM_MAX_QUEUE", cast=int, default=64)
+    # requests expected to wait longer for a slot get a 429 with Retry-After
+    LLM_MAX_QUEUE_WAIT_SECONDS: float = config("LLM_MAX_QUEUE_WAIT_SECONDS", cast=float, default=15.0)
+
+
+class ClassifierOption(Enum):
+    LLM = "llm"
+    EMBEDDING = "embedding"
+
+class ClassifierSettings(BaseSettings):
+    CLASSIFIER_MODE: ClassifierOption = config("CLASSIFIER_MODE", cast=ClassifierOption, default=ClassifierOption.EMBEDDING)
+    CLASSIFIER_MIN_CONFIDENCE: float = config("CLASSIFIER_MIN_CONFIDENCE", cast=float, default=0.35)
+    CLASSIFIER_MIN_MARGIN: float = config("CLASSIFIER_MIN_MARGIN", cast=float, default=0.02)
+    CLASSIFIER_MEMO_SIZE: int = config("CLASSIFIER_MEMO_SIZE", cast=int, default=4096)
+
+
+class HistorySettings(BaseSettings):
+    # turns (user + assistant message) kept verbatim in the prompt, older ones are summarized
+    HISTORY_MAX_TURNS: int = config("HISTORY_MAX_TURNS", cast=int, default=6)
+    HISTORY_TOKEN_BUDGET: int = config("HISTORY_TOKEN_BUDGET", cast=int, default=1500)
+
+
+class SemanticCacheSettings(BaseSettings):
+    SEMANTIC_CACHE_ENABLED: bool = config("SEMANTIC_CACHE_ENABLED", cast=bool, default=True)
+    SEMANTIC_CACHE_THRESHOLD: float = config("SEMANTIC_CACHE_THRESHOLD", cast=float, default=0.95)
+    SEMANTIC_CACHE_TTL_SECONDS: int = config("SEMANTIC_CACHE_TTL_SECONDS", cast=int, default=3600)
+    SEMANTIC_CACHE_MAX_ENTRIES: int = config("SEMANTIC_CACHE_MAX_ENTRIES", cast=int, default=2048)
+    SEMANTIC_CACHE_MAX_BYTES: int = config("SEMANTIC_CACHE_MAX_BYTES", cast=int, default=32 * 1024 * 1024)
+
+
+class CoalescingSettings(BaseSettings):
+    # identical first-turn prompts in flight at the same time share one pipeline run (core/single_flight.py)
+    CHAT_COALESCING_ENABLED: bool = config("CHAT_COALESCING_ENABLED", cast=bool, default=True)
+
+
+class BatchSettings(BaseSettings):
+    # POST /chats/batch, see core/batch.py
+    BATCH_MAX_PROMPTS: int = config("BATCH_MAX_PROMPTS", cast=int, default=1000)
+    BATCH_LLM_CONCURRENCY: int = config("BATCH_LLM_CONCURRENCY", cast=int, default=4)
+    BATCH_RETRIEVAL_CONCURRENCY: int = config("BATCH_RETRIEVAL_CONCURRENCY", cast=int, default=16)
+
+
+class MetricsSettings(BaseSettings):
+    # Prometheus exposition of the pipeline metrics in core/metrics.py
+    METRICS_ENABLED: bool = config("METRICS_ENABLED", cast=bool, default=True)
+    METRICS_PATH: str = config("METRICS_PATH", default="/metrics")
 
 
 class DatabaseSettings(BaseSettings):
@@ -45,7 +170,17 @@ class Settings(
     EnvironmentSettings,
     OpenAISettings,
     PineconeSettings,
-    OllamaSettings
+    RerankerSettings,
+    HybridSearchSettings,
+    RetrievalSettings,
+    OllamaSettings,
+    AdmissionSettings,
+    SemanticCacheSettings,
+    CoalescingSettings,
+    ClassifierSettings,
+    HistorySettings,
+    BatchSettings,
+    MetricsSettings
 ):
     pass
 
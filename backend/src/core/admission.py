@@ -0,0 +1,229 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, List
+
+import numpy as np
+from fastapi import HTTPException, status
+
+from . import metrics
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+# lower goes first
+PRIORITY_USER = 0
+PRIORITY_GUEST = 1
+# never shed, they wait as long as it takes
+PRIORITY_BACKGROUND = 2
+PRIORITY_BATCH = 3
+PRIORITY_NAMES = {
+    PRIORITY_USER: "user",
+    PRIORITY_GUEST: "guest",
+    PRIORITY_BACKGROUND: "background",
+    PRIORITY_BATCH: "batch",
+}
+
+
+class LLMAdmission:
+    """
+    Admission control in front of every call to the answer model: chat answers,
+    conversation summaries and batch answers. At most `max_concurrency` calls run; the
+    rest wait in a priority queue where signed-in users go ahead of guests, guests
+    ahead of summaries and summaries ahead of batch answers (FIFO within a priority).
+
+    Chat requests are shed with a 429 and a Retry-After instead of piling up: when the
+    estimated wait (requests ahead / max_concurrency * recent service time) exceeds
+    `max_wait_seconds`, when the queue is full (a guest waiting is evicted for a user),
+    or when a request actually waited that long. Background and batch calls are never
+    shed and do not count towards `max_queue`; they only get the slots chat requests
+    leave free.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        max_queue: int = 64,
+        max_wait_seconds: float = 15.0,
+        enabled: bool = True,
+        window: int = 200,
+    ) -> None:
+        """
+        Args:
+            max_concurrency: LLM calls running at once.
+            max_queue: Chat requests allowed to wait for a slot.
+            max_wait_seconds: Longest a request may (be expected to) wait for a slot.
+            enabled: Off, every call runs right away.
+            window: Number of recent calls the wait and service time stats cover.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.enabled = enabled
+
+        self._active = 0
+        # [priority, seq, future] entries, a heap
+        self._queue: List[list] = []
+        self._seq = itertools.count()
+        self._waits: Deque[float] = deque(maxlen=window)
+        self._services: Deque[float] = deque(maxlen=window)
+
+        self.admitted = 0
+        self.rejected = 0
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def check(self, priority: int) -> None:
+        """
+        Raise the 429 right away if a request of this priority would not get a slot in
+        time, so it is shed before the work leading up to the LLM call.
+        """
+        if not self.enabled or not _sheddable(priority) or (self._active < self.max_concurrency and not self._queue):
+            return
+
+        wait = self.estimate_wait(priority)
+        if wait > self.max_wait_seconds:
+            self._reject(priority, "deadline", wait)
+        if self._sheddable_queued() >= self.max_queue and not self._evictable(priority):
+            self._reject(priority, "queue_full", wait)
+
+    @asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        """
+        Hold one of the LLM slots for the body of the `async with`.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        await self._acquire(priority)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._services.append(time.perf_counter() - started)
+            self._release()
+
+    def estimate_wait(self, priority: int) -> float:
+        """
+        Seconds a request of this priority arriving now is expected to wait for a slot.
+        """
+        if self._active < self.max_concurrency and not self._queue:
+            return 0.0
+        ahead = sum(1 for entry in self._queue if entry[0] <= priority)
+        return (ahead + 1) * self._service_seconds() / self.max_concurrency
+
+    def stats(self) -> dict:
+        waits = np.asarray(self._waits) * 1000
+        return {
+            "enabled": self.enabled,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait_seconds,
+            "active": self._active,
+            "queued": {name: sum(1 for entry in self._queue if entry[0] == p) for p, name in PRIORITY_NAMES.items()},
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_p50_ms": round(float(np.percentile(waits, 50)), 2) if len(waits) else 0.0,
+            "wait_p95_ms": round(float(np.percentile(waits, 95)), 2) if len(waits) else 0.0,
+            "service_mean_ms": round(self._service_seconds() * 1000, 2),
+        }
+
+    # -----------------------------
+    # Internal helpers
+    # -----------------------------
+    async def _acquire(self, priority: int) -> None:
+        submitted = time.perf_counter()
+        if self._active < self.max_concurrency and not self._queue:
+            self._active += 1
+            self._observe_depth()
+            self._admit(priority, 0.0)
+            return
+
+        sheddable = _sheddable(priority)
+        if sheddable:
+            self.check(priority)
+            if self._sheddable_queued() >= self.max_queue:
+                self._evict(priority)
+
+        entry = [priority, next(self._seq), asyncio.get_running_loop().create_future()]
+        heapq.heappush(self._queue, entry)
+        self._observe_depth()
+        try:
+            await asyncio.wait_for(entry[2], self.max_wait_seconds if sheddable else None)
+        except BaseException as e:
+            future = entry[2]
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # the slot was handed over just as the wait ended, pass it on
+                self._release()
+            elif entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._observe_depth()
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject(priority, "timeout", time.perf_counter() - submitted)
+            raise
+
+        self._admit(priority, time.perf_counter() - submitted)
+
+    def _release(self) -> None:
+        self._active -= 1
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                # hand the slot over directly, a newcomer cannot take it in between
+                self._active += 1
+                future.set_result(None)
+                break
+        self._observe_depth()
+
+    def _evict(self, priority: int) -> None:
+        # the most recent of the lowest priority waiters makes room
+        victim = max(self._evictable(priority), key=lambda entry: (entry[0], entry[1]))
+        self._queue.remove(victim)
+        heapq.heapify(self._queue)
+        victim[2].set_exception(self._too_many_requests(victim[0], "evicted", self.estimate_wait(victim[0])))
+
+    def _sheddable_queued(self) -> int:
+        return sum(1 for entry in self._queue if _sheddable(entry[0]))
+
+    def _evictable(self, priority: int) -> List[list]:
+        return [entry for entry in self._queue if priority < entry[0] and _sheddable(entry[0])]
+
+    def _admit(self, priority: int, wait: float) -> None:
+        self.admitted += 1
+        self._waits.append(wait)
+        metrics.LLM_ADMISSIONS.labels(PRIORITY_NAMES[priority], "admitted").inc()
+        metrics.LLM_QUEUE_WAIT_SECONDS.labels(PRIORITY_NAMES[priority]).observe(wait)
+
+    def _reject(self, priority: int, reason: str, wait: float) -> None:
+        raise self._too_many_requests(priority, reason, wait)
+
+    def _too_many_requests(self, priority: int, reason: str, wait: float) -> HTTPException:
+        self.rejected += 1
+        metrics.LLM_ADMISSIONS.labels(PRIORITY_NAMES[priority], reason).inc()
+        logger.warning(f"Shedding a {PRIORITY_NAMES[priority]} chat request ({reason}, ~{wait:.1f}s wait)")
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many chats in progress, retry shortly",
+            headers={"Retry-After": str(max(1, math.ceil(min(wait, self.max_wait_seconds))))},
+        )
+
+    def _service_seconds(self) -> float:
+        # no estimate before the first call, until then only the queue bound and the real wait shed
+        return float(np.mean(self._services)) if self._services else 0.0
+
+    def _observe_depth(self) -> None:
+        metrics.LLM_ACTIVE.set(self._active)
+        for p, name in PRIORITY_NAMES.items():
+            metrics.LLM_QUEUE_DEPTH.labels(name).set(sum(1 for entry in self._queue if entry[0] == p))
+
+
+def _sheddable(priority: int) -> bool:
+    return priority < PRIORITY_BACKGROUND
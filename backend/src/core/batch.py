@@ -0,0 +1,206 @@
+from __future__ import annotations
+import asyncio
+import time
+from contextlib import nullcontext
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from . import metrics
+from .admission import PRIORITY_BATCH, LLMAdmission
+from .retrieval_policy import AdaptiveRetrieval
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BatchAnswerer:
+    """
+    Answers many independent first-turn prompts at once, for offline evaluation and
+    bulk jobs. Prompts are processed in chunks of `batch_size`: the prompts and then the
+    category query texts of a chunk are embedded in one call each, retrieval (query +
+    rerank) fans out concurrently, and generation runs through at most `llm_concurrency`
+    LLM calls, each admitted at batch priority when an `admission` limiter is given.
+    Results are yielded as they complete, not in input order.
+
+    Nothing is persisted and the semantic answer cache is bypassed, so every prompt is
+    answered by the pipeline itself. The limits hold for the instance: concurrent
+    answer() calls share them.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        llm,
+        classifier=None,
+        retrieval: Optional[AdaptiveRetrieval] = None,
+        admission: Optional[LLMAdmission] = None,
+        *,
+        llm_concurrency: int = 4,
+        retrieval_concurrency: int = 16,
+        batch_size: int = 96,
+        max_pending: int = 256,
+    ) -> None:
+        """
+        Args:
+            embedder: PineconeClient-like object exposing aembed_texts(), aquery_documents()
+                and arerank_results().
+            llm: LangchainClient-like object exposing aanswer() and aclassify_category().
+            classifier: EmbeddingCategoryClassifier-like object; None classifies with the LLM.
+            retrieval: Policy deciding the candidates reranked per prompt; None reranks
+                the top 5 hits of every prompt.
+            admission: Limiter shared with the chat answers, generation only gets the
+                slots they leave free; None limits by `llm_concurrency` alone.
+            llm_concurrency: LLM calls in flight at once, for generation and for LLM
+                classification each, so classifications never queue behind generations.
+            retrieval_concurrency: Index queries and reranks in flight at once.
+            batch_size: Prompts embedded per call.
+            max_pending: Prompts started but not yet yielded, bounds memory on large inputs.
+        """
+        self.embedder = embedder
+        self.llm = llm
+        self.classifier = classifier
+        self.retrieval = retrieval or AdaptiveRetrieval(enabled=False)
+        self.admission = admission
+        self.llm_concurrency = llm_concurrency
+        self.retrieval_concurrency = retrieval_concurrency
+        self.batch_size = batch_size
+        self.max_pending = max(max_pending, batch_size)
+
+        self._llm_slots = asyncio.Semaphore(llm_concurrency)
+        self._classify_slots = asyncio.Semaphore(llm_concurrency)
+        self._retrieval_slots = asyncio.Semaphore(retrieval_concurrency)
+        self._pending_slots = asyncio.Semaphore(self.max_pending)
+        # a chunk reserves its pending slots in one go, two calls each holding part of
+        # the slots they need could otherwise wait on each other forever
+        self._reserve_lock = asyncio.Lock()
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    async def answer(self, prompts: Sequence[str]) -> AsyncIterator[Dict]:
+        """
+        Yield one result per prompt as soon as it is answered:
+        {"index", "prompt", "category", "response", "docs", "error", "elapsed_ms"}.
+        A failing prompt yields its error instead of failing the batch. Closing the
+        iterator early cancels the prompts still in flight.
+        """
+        results: asyncio.Queue = asyncio.Queue()
+        tasks: List[asyncio.Task] = []
+        started = time.perf_counter()
+        # pending slots this call holds, handed back when it ends early
+        held = 0
+
+        def emit(index: int, prompt: str, **fields) -> None:
+            result = {
+                "index": index,
+                "prompt": prompt,
+                "category": None,
+                "response": None,
+                "docs": [],
+                "error": None,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+            result.update(fields)
+            metrics.BATCH_PROMPTS.labels("failed" if result["error"] else "answered").inc()
+            results.put_nowait(result)
+
+        async def answer_one(index: int, prompt: str, category: Optional[str], query_vector: List[float]) -> None:
+            try:
+                async with self._retrieval_slots:
+                    docs = await self.embedder.aquery_documents(
+                        query_vector=query_vector, top_k=self.retrieval.fetch_k, query_text=prompt
+                    )
+                    docs = await self.retrieval.arerank(self.embedder, prompt, docs)
+                async with self._llm_slots, self._admitted():
+                    response = await self.llm.aanswer(user_query=prompt, docs=docs, prev_messages=[])
+            except Exception as e:
+                logger.error(f"Batch prompt {index} failed: {e}")
+                emit(index, prompt, category=category, error=str(e) or type(e).__name__)
+                return
+            emit(index, prompt, category=category, response=response, docs=docs)
+
+        async def produce() -> None:
+            nonlocal held
+            for start in range(0, len(prompts), self.batch_size):
+                chunk = list(prompts[start:start + self.batch_size])
+                async with self._reserve_lock:
+                    for _ in chunk:
+                        await self._pending_slots.acquire()
+                        held += 1
+                try:
+                    prepared = await self._prepare(chunk)
+                except Exception as e:
+                    logger.error(f"Batch chunk at {start} failed: {e}")
+                    for offset, prompt in enumerate(chunk):
+                        emit(start + offset, prompt, error=str(e) or type(e).__name__)
+                    continue
+                for offset, (prompt, (category, query_vector)) in enumerate(zip(chunk, prepared)):
+                    tasks.append(asyncio.create_task(answer_one(start + offset, prompt, category, query_vector)))
+
+        producer = asyncio.create_task(produce())
+        try:
+            # every prompt emits exactly one result, failures included
+            for _ in range(len(prompts)):
+                result = await results.get()
+                self._pending_slots.release()
+                held -= 1
+                yield result
+        finally:
+            producer.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(producer, *tasks, return_exceptions=True)
+            for _ in range(held):
+                self._pending_slots.release()
+
+    # -----------------------------
+    # Internal helpers
+    # -----------------------------
+    def _admitted(self):
+        return self.admission.slot(PRIORITY_BATCH) if self.admission is not None else nullcontext()
+
+    async def _prepare(self, prompts: List[str]) -> List[tuple]:
+        """
+        Category and retrieval vector of every prompt of a chunk, with two embed calls
+        for the whole chunk: the raw prompts, then the category query texts.
+        """
+        prompt_vectors = await self.embedder.aembed_texts(prompts, input_type="query")
+        categories = await asyncio.gather(*(
+            self._classify(prompt, vector) for prompt, vector in zip(prompts, prompt_vectors)
+        ))
+
+        # same query text as the interactive pipeline, see api/chat.py _embed_query
+        query_texts = {
+            i: "Category: " + category + " | Query: " + prompt
+            for i, (prompt, category) in enumerate(zip(prompts, categories)) if category
+        }
+        query_vectors = list(prompt_vectors)
+        if query_texts:
+            embedded = await self.embedder.aembed_texts(list(query_texts.values()), input_type="query")
+            for i, vector in zip(query_texts, embedded):
+                query_vectors[i] = vector
+
+        return list(zip(categories, query_vectors))
+
+    async def _classify(self, prompt: str, vector: List[float]) -> Optional[str]:
+        llm = _BoundedClassifier(self.llm, self._classify_slots)
+        if self.classifier is not None:
+            # low confidence fallbacks are bounded too, in their own slots
+            return await self.classifier.aclassify_category(prompt, query_vector=vector, fallback=llm)
+
+        category = await llm.aclassify_category(prompt)
+        metrics.CLASSIFICATIONS.labels("llm" if category is not None else "failed").inc()
+        return category
+
+
+class _BoundedClassifier:
+    """
+    LLM classifier whose calls wait for one of the batcher's classification slots.
+    """
+
+    def __init__(self, llm, slots: asyncio.Semaphore) -> None:
+        self.llm = llm
+        self.slots = slots
+
+    async def aclassify_category(self, user_query: str) -> Optional[str]:
+        async with self.slots:
+            return await self.llm.aclassify_category(user_query)
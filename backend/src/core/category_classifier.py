@@ -0,0 +1,223 @@
+from __future__ import annotations
+import asyncio
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..logger import logging
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Labelled examples per category, named exactly like PromptConfig.classifier_template
+# (lowercased, as the LLM classifier returns them). Each category centroid is the
+# normalized mean of its example embeddings.
+CATEGORY_EXAMPLES: Dict[str, List[str]] = {
+    "account & registration": [
+        "How do I open a new account?",
+        "I can't finish signing up, the registration form keeps failing",
+        "How can I change the email address on my profile?",
+        "What documents do I need to verify my identity when registering?",
+        "How do I close my account?",
+        "I forgot my username, how do I recover it?",
+        "Can I have a joint account with my partner?",
+        "How long does account verification take?",
+    ],
+    "payments & transactions": [
+        "Why was my card declined?",
+        "How long does a bank transfer take to arrive?",
+        "I was charged twice for the same purchase",
+        "How do I send money abroad with an IBAN?",
+        "What are the fees for international payments?",
+        "Can I cancel a pending transaction?",
+        "My direct debit failed, what should I do?",
+        "What is my daily card spending limit?",
+    ],
+    "technical support & troubleshooting": [
+        "The mobile app keeps crashing when I open it",
+        "I am not receiving the SMS verification code",
+        "The website shows an error when I try to log in",
+        "How do I update the app to the latest version?",
+        "Push notifications stopped working on my phone",
+        "The app is stuck on the loading screen",
+        "I can't upload my documents, the page freezes",
+        "Face ID login no longer works after the update",
+    ],
+    "regulations & compliance": [
+        "Are my deposits protected by a deposit guarantee scheme?",
+        "Why do you need my tax identification number?",
+        "What are your anti money laundering requirements?",
+        "How do you handle my personal data under GDPR?",
+        "Is NeonBank a licensed and regulated bank?",
+        "Why are you asking about the source of my funds?",
+        "Do you report account information to tax authorities?",
+        "What are the KYC rules for opening a business account?",
+    ],
+    "security & fraud prevention": [
+        "I think someone has access to my account",
+        "I received a suspicious phishing email pretending to be NeonBank",
+        "How do I freeze my card if it was stolen?",
+        "There is a transaction I don't recognise on my statement",
+        "How do I enable two-factor authentication?",
+        "Someone called me asking for my PIN, is that you?",
+        "How do I report fraud on my account?",
+        "My card was lost, how do I block it?",
+    ],
+}
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class EmbeddingCategoryClassifier:
+    """
+    Fast category classifier that compares the query embedding against precomputed
+    category centroids, falling back to the LLM classifier only when the best match
+    is not confident enough. Results are memoized per normalized query.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        fallback,
+        *,
+        examples: Dict[str, List[str]] = CATEGORY_EXAMPLES,
+        min_confidence: float = 0.35,
+        min_margin: float = 0.02,
+        memo_size: int = 4096,
+    ) -> None:
+        """
+        Args:
+            embedder: PineconeClient-like object exposing aembed_texts().
+            fallback: LLM client exposing aclassify_category(), used on low confidence.
+            examples: Labelled example queries per category.
+            min_confidence: Minimum cosine similarity to the best centroid.
+            min_margin: Minimum gap between the best and the runner-up centroid.
+            memo_size: Number of normalized queries whose category is remembered.
+        """
+        self.embedder = embedder
+        self.fallback = fallback
+        self.examples = examples
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+        self.memo_size = memo_size
+
+        self.categories: List[str] = list(examples)
+        self._centroids: Optional[np.ndarray] = None
+        self._centroids_lock = asyncio.Lock()
+        self._memo: "OrderedDict[str, Optional[str]]" = OrderedDict()
+
+        self.memo_hits = 0
+        self.centroid_hits = 0
+        self.fallbacks = 0
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    async def aclassify_category(
+        self,
+        user_query: str,
+        query_vector: Optional[List[float]] = None,
+        fallback=None,
+    ) -> Optional[str]:
+        """
+        Classify the user query into a predefined category. Pass `query_vector` when the
+        raw query was already embedded (input_type="query") to skip the embed call, and
+        `fallback` to use another LLM classifier than the default for this call.
+        Return value matches the LLM classifier: Optional[str] (None on failure).
+        """
+        key = normalize_query(user_query)
+        if key in self._memo:
+            self._memo.move_to_end(key)
+            self.memo_hits += 1
+            metrics.CLASSIFICATIONS.labels("memo").inc()
+            return self._memo[key]
+
+        if query_vector is None:
+            query_vector = (await self.embedder.aembed_texts([user_query], input_type="query"))[0]
+
+        category, best, margin = self.score(await self.centroids(), query_vector)
+
+        if best >= self.min_confidence and margin >= self.min_margin:
+            self.centroid_hits += 1
+            metrics.CLASSIFICATIONS.labels("centroid").inc()
+            logger.info("Classified Category: %s (similarity %.3f, margin %.3f)", category, best, margin)
+        else:
+            self.fallbacks += 1
+            logger.info(
+                "Low confidence centroid match (%s, similarity %.3f, margin %.3f), falling back to LLM",
+                category, best, margin
+            )
+            category = await (fallback or self.fallback).aclassify_category(user_query)
+            metrics.CLASSIFICATIONS.labels("llm" if category is not None else "failed").inc()
+
+        # a failed LLM fallback may be transient, so only successes are memoized
+        if category is not None:
+            self._remember(key, category)
+        return category
+
+    async def centroids(self) -> np.ndarray:
+        """
+        Embed the labelled examples in one batched call and build the centroid matrix.
+        Computed once per process.
+        """
+        if self._centroids is None:
+            async with self._centroids_lock:
+                if self._centroids is None:
+                    texts = [text for category in self.categories for text in self.examples[category]]
+                    vectors = await self.embedder.aembed_texts(texts, input_type="query")
+                    self._centroids = self.build_centroids(self.categories, self.examples, vectors)
+        return self._centroids
+
+    def score(self, centroids: np.ndarray, query_vector: List[float]):
+        """
+        Return (best category, best cosine similarity, margin over the runner-up).
+        """
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        sims = centroids @ query
+        order = np.argsort(sims)[::-1]
+        best = float(sims[order[0]])
+        runner_up = float(sims[order[1]]) if len(order) > 1 else -1.0
+
+        return self.categories[order[0]], best, best - runner_up
+
+    def stats(self) -> dict:
+        return {
+            "memo_hits": self.memo_hits,
+            "centroid_hits": self.centroid_hits,
+            "fallbacks": self.fallbacks,
+        }
+
+    # -----------------------------
+    # Internal helpers
+    # -----------------------------
+    @staticmethod
+    def build_centroids(
+        categories: List[str],
+        examples: Dict[str, List[str]],
+        vectors: List[List[float]],
+    ) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+        centroids = []
+        start = 0
+        for category in categories:
+            end = start + len(examples[category])
+            centroids.append(matrix[start:end].mean(axis=0))
+            start = end
+
+        centroids = np.stack(centroids)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+        return centroids
+
+    def _remember(self, key: str, category: Optional[str]) -> None:
+        self._memo[key] = category
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
@@ -0,0 +1,126 @@
+from ..config import ClassifierOption, VectorBackendOption, settings
+from .admission import LLMAdmission
+from .batch import BatchAnswerer
+from .category_classifier import EmbeddingCategoryClassifier
+from .embedding_cache import EmbeddingCache
+from .history import ConversationWindow
+from .index_version import IndexVersion
+from .langchain_client import LangchainClient
+from .local_index_client import LocalIndexClient
+from .pincone_client import PineconeClient
+from .reranker import make_reranker
+from .retrieval_policy import AdaptiveRetrieval
+from .sparse_index import BM25Index, BM25Reloader
+from .semantic_cache import SemanticCache
+from .single_flight import SingleFlight
+
+# Shared client instances, created once per process and closed by the app lifespan
+
+embedding_cache = EmbeddingCache(
+    path=settings.EMBEDDING_CACHE_PATH or None,
+    max_entries=settings.EMBEDDING_CACHE_SIZE,
+)
+
+reranker = make_reranker(
+    settings.RERANKER_BACKEND.value,
+    onnx_model_dir=settings.RERANKER_ONNX_PATH,
+    threads=settings.RERANKER_THREADS,
+)
+
+index_version = IndexVersion(settings.INDEX_VERSION_PATH)
+
+sparse_index = BM25Index.from_snapshot(
+    settings.LOCAL_INDEX_PATH, k1=settings.BM25_K1, b=settings.BM25_B
+) if settings.HYBRID_SEARCH_ENABLED else None
+
+if settings.VECTOR_BACKEND == VectorBackendOption.LOCAL:
+    pinecone_client = LocalIndexClient(
+        settings.LOCAL_INDEX_PATH,
+        api_key=settings.PINECONE_API_KEY,
+        index_name=settings.PINECONE_INDEX_NAME,
+        namespace=settings.PINECONE_NAME_SPACE,
+        embedding_cache=embedding_cache,
+        reranker=reranker,
+        sparse_index=sparse_index,
+        rrf_k=settings.HYBRID_RRF_K,
+        hnsw_threshold=settings.LOCAL_INDEX_HNSW_THRESHOLD,
+        hnsw_ef=settings.LOCAL_INDEX_HNSW_EF,
+    )
+else:
+    pinecone_client = PineconeClient(
+        api_key=settings.PINECONE_API_KEY,
+        index_name=settings.PINECONE_INDEX_NAME,
+        namespace=settings.PINECONE_NAME_SPACE,
+        embedding_cache=embedding_cache,
+        reranker=reranker,
+        sparse_index=sparse_index,
+        rrf_k=settings.HYBRID_RRF_K,
+    )
+
+chat_bot = LangchainClient(
+    model=settings.OLLAMA_MODEL,
+    keep_alive=settings.OLLAMA_KEEP_ALIVE,
+    classifier_model=settings.OLLAMA_CLASSIFIER_MODEL or None,
+    classifier_options={
+        "num_predict": settings.OLLAMA_CLASSIFIER_NUM_PREDICT,
+        "stop": [
+            stop.encode().decode("unicode_escape") for stop in settings.OLLAMA_CLASSIFIER_STOP.split(",") if stop
+        ] or None,
+    },
+    classifier_concurrency=settings.OLLAMA_CLASSIFIER_CONCURRENCY,
+)
+
+llm_admission = LLMAdmission(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+    max_wait_seconds=settings.LLM_MAX_QUEUE_WAIT_SECONDS,
+    enabled=settings.LLM_ADMISSION_ENABLED,
+)
+
+category_classifier = EmbeddingCategoryClassifier(
+    embedder=pinecone_client,
+    fallback=chat_bot,
+    min_confidence=settings.CLASSIFIER_MIN_CONFIDENCE,
+    min_margin=settings.CLASSIFIER_MIN_MARGIN,
+    memo_size=settings.CLASSIFIER_MEMO_SIZE,
+)
+
+# rebuilt once the ingestion scripts rewrote the snapshot, started by the app lifespan
+sparse_reloader = BM25Reloader(
+    pinecone_client, settings.LOCAL_INDEX_PATH, index_version, k1=settings.BM25_K1, b=settings.BM25_B
+) if settings.HYBRID_SEARCH_ENABLED else None
+
+semantic_cache = SemanticCache(
+    threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+    ttl_seconds=settings.SEMANTIC_CACHE_TTL_SECONDS,
+    max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+    max_bytes=settings.SEMANTIC_CACHE_MAX_BYTES,
+    enabled=settings.SEMANTIC_CACHE_ENABLED,
+)
+
+chat_flights = SingleFlight(enabled=settings.CHAT_COALESCING_ENABLED)
+
+conversation_window = ConversationWindow(
+    max_turns=settings.HISTORY_MAX_TURNS,
+    token_budget=settings.HISTORY_TOKEN_BUDGET,
+)
+
+retrieval_policy = AdaptiveRetrieval(
+    enabled=settings.RETRIEVAL_ADAPTIVE_ENABLED,
+    top_k=settings.RETRIEVAL_TOP_K,
+    wide_top_k=settings.RETRIEVAL_WIDE_TOP_K,
+    skip_score=settings.RETRIEVAL_SKIP_SCORE,
+    skip_margin=settings.RETRIEVAL_SKIP_MARGIN,
+    flat_spread=settings.RETRIEVAL_FLAT_SPREAD,
+)
+
+batch_answerer = BatchAnswerer(
+    embedder=pinecone_client,
+    llm=chat_bot,
+    classifier=category_classifier if settings.CLASSIFIER_MODE == ClassifierOption.EMBEDDING else None,
+    retrieval=retrieval_policy,
+    admission=llm_admission,
+    llm_concurrency=settings.BATCH_LLM_CONCURRENCY,
+    retrieval_concurrency=settings.BATCH_RETRIEVAL_CONCURRENCY,
+    batch_size=pinecone_client.EMBED_BATCH_SIZE,
+)
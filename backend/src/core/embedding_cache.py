@@ -0,0 +1,224 @@
+from __future__ import annotations
+import asyncio
+import atexit
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed on (model, input_type, text hash).
+
+    Tier 1 is an in-process LRU. Tier 2 is an optional SQLite file in WAL mode, which
+    survives restarts and is shared by every worker on the same host. Both tiers keep
+    vectors as float32, the precision the embedding API returns: about 4 KB per
+    1024-dim vector in the LRU (a list of Python floats would take eight times that),
+    converted to lists only when handed out.
+
+    Only the LRU is touched on the calling thread. aget_many() reads the SQLite tier in
+    a worker thread, and writes to it are handed to a background writer thread that
+    batches them into one transaction; close() flushes what is still queued.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10000) -> None:
+        """
+        Args:
+            path: SQLite file for the persistent tier, or None for memory only.
+            max_entries: Capacity of the in-process LRU tier, about dimension * 4 bytes each.
+        """
+        self.path = path
+        self.max_entries = max_entries
+
+        self._memory: "OrderedDict[str, array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        # the connection is shared by the reader and writer threads
+        self._db_lock = threading.Lock()
+        self._writes: "queue.Queue[Optional[Dict[str, array]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path:
+            try:
+                self._db = self._connect(path)
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache at {path} unavailable ({e}). Using the in-process tier only.")
+
+        if self._db is not None:
+            self._writer = threading.Thread(target=self._write_behind, name="embedding-cache-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    @staticmethod
+    def key(model: str, input_type: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\x1f{input_type}\x1f{text}".encode()).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        Return the cached vectors for the given keys. Missing keys are left out.
+        Disk hits are promoted to the in-process tier.
+        """
+        found, pending = self._from_memory(keys)
+        if pending and self._db is not None:
+            self._promote(self._select(pending), found)
+        return self._count_misses(pending, found)
+
+    async def aget_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        Async variant of get_many(), the SQLite tier is read in a worker thread.
+        """
+        found, pending = self._from_memory(keys)
+        if pending and self._db is not None:
+            self._promote(await asyncio.to_thread(self._select, pending), found)
+        return self._count_misses(pending, found)
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """
+        Add the vectors to the in-process tier now and to the SQLite tier in the background.
+        """
+        if not items:
+            return
+
+        packed = {key: array("f", vector) for key, vector in items.items()}
+        with self._lock:
+            for key, vector in packed.items():
+                self._remember(key, vector)
+
+        if self._writer is not None:
+            self._writes.put(packed)
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+    def close(self) -> None:
+        """
+        Flush the queued writes and close the SQLite tier. Safe to call twice.
+        """
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+
+    # -----------------------------
+    # Internal helpers
+    # -----------------------------
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL) WITHOUT ROWID"
+        )
+        return db
+
+    def _from_memory(self, keys: Iterable[str]) -> Tuple[Dict[str, List[float]], List[str]]:
+        found: Dict[str, List[float]] = {}
+        pending: List[str] = []
+
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector.tolist()
+                    self.memory_hits += 1
+                else:
+                    pending.append(key)
+
+        return found, pending
+
+    def _promote(self, rows: List[Tuple[str, bytes]], found: Dict[str, List[float]]) -> None:
+        with self._lock:
+            for key, blob in rows:
+                vector = array("f", blob)
+                found[key] = vector.tolist()
+                self._remember(key, vector)
+                self.disk_hits += 1
+
+    def _count_misses(self, pending: List[str], found: Dict[str, List[float]]) -> Dict[str, List[float]]:
+        with self._lock:
+            self.misses += sum(1 for key in pending if key not in found)
+        return found
+
+    def _select(self, keys: List[str]) -> List[Tuple[str, bytes]]:
+        rows = []
+        with self._db_lock:
+            if self._db is None:
+                return rows
+            try:
+                # stay well below SQLITE_MAX_VARIABLE_NUMBER
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows.extend(self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                    ))
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache lookup failed: {e}")
+        return rows
+
+    def _write_behind(self) -> None:
+        done = False
+        while not done:
+            items = self._writes.get()
+            if items is None:
+                break
+            # fold whatever queued up meanwhile into the same transaction
+            while True:
+                try:
+                    more = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    done = True
+                    break
+                items.update(more)
+            self._insert(items)
+
+    def _insert(self, items: Dict[str, array]) -> None:
+        with self._db_lock:
+            if self._db is None:
+                return
+            try:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        [(key, vector.tobytes()) for key, vector in items.items()],
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to persist {len(items)} embeddings: {e}")
+
+    def _remember(self, key: str, vector: array) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
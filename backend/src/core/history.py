@@ -0,0 +1,68 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English with Llama tokenizers).
+    Good enough to bound the prompt without running a tokenizer on the hot path.
+    """
+    return len(text) // 4 + 1
+
+
+@dataclass
+class HistoryWindow:
+    """
+    The part of a conversation sent to the LLM.
+    """
+    # rolling summary of every message before `summarized_count`
+    summary: Optional[str] = None
+    summarized_count: int = 0
+    # most recent messages, sent verbatim
+    messages: List[Dict] = field(default_factory=list)
+    # unsummarized messages that fell out of the verbatim window
+    overflow: List[Dict] = field(default_factory=list)
+
+
+class ConversationWindow:
+    """
+    Keeps the prompt size bounded however long a chat runs: the last `max_turns`
+    turns are kept verbatim as long as they fit `token_budget` (summary included),
+    everything older is folded into an incrementally updated summary.
+    """
+
+    def __init__(self, max_turns: int = 6, token_budget: int = 1500) -> None:
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+
+    def select(
+        self,
+        pending: List[Dict],
+        summary: Optional[str] = None,
+        summarized_count: int = 0,
+    ) -> HistoryWindow:
+        """
+        Split the messages not covered by the summary yet (`pending`, oldest first,
+        starting at message `summarized_count`) into the verbatim window and the
+        overflow that still has to be summarized.
+        """
+        budget = self.token_budget - (estimate_tokens(summary) if summary else 0)
+
+        kept = 0
+        for msg in reversed(pending):
+            if kept >= self.max_turns * 2:
+                break
+            cost = estimate_tokens(msg["text"])
+            if cost > budget:
+                break
+            budget -= cost
+            kept += 1
+
+        split = len(pending) - kept
+        return HistoryWindow(
+            summary=summary,
+            summarized_count=summarized_count,
+            messages=pending[split:],
+            overflow=pending[:split],
+        )
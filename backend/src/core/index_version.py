@@ -0,0 +1,56 @@
+from __future__ import annotations
+import os
+import time
+from typing import Optional
+
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+
+def bump_index_version(path: str) -> None:
+    """
+    Mark the indexed content as changed, for the API processes reading the stamp.
+    Called by the ingestion scripts after they wrote to the index.
+    """
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"{time.time_ns()}\n")
+    except OSError as e:
+        logger.warning(f"Failed to bump the index version at {path}: {e}")
+
+
+class IndexVersion:
+    """
+    Version of the indexed content, read from a stamp file that bump_index_version()
+    (or a plain `touch`) rewrites whenever the index changes. The version is the
+    file's modification time and size, so reading it is a stat() and never a read;
+    it is checked at most every `check_seconds`.
+    """
+
+    def __init__(self, path: str, check_seconds: float = 5.0) -> None:
+        """
+        Args:
+            path: Stamp file, its absence is a version too.
+            check_seconds: Longest a change goes unnoticed.
+        """
+        self.path = path
+        self.check_seconds = check_seconds
+
+        self._version: Optional[str] = None
+        self._checked_at: Optional[float] = None
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def current(self) -> Optional[str]:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_seconds:
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+                self._version = f"{stat.st_mtime_ns}:{stat.st_size}"
+            except OSError:
+                self._version = None
+        return self._version
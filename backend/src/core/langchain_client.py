@@ -1,8 +1,10 @@
 from __future__ import annotations
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Union
 from ..models.chat import MessageModel
+import asyncio
 import time
 from ..utils.data_classes import PromptConfig, Doc
+from . import metrics
 from ..logger import logging
 
 from langchain_ollama import ChatOllama
@@ -10,27 +12,73 @@ from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
 logger = logging.getLogger(__name__)
 
+# classification answers with a category name on one line
+CLASSIFIER_OPTIONS = {"num_predict": 16, "stop": ["\n"]}
+
+
 class LangchainClient:
     """
     Class-based wrapper for a customer support RAG flow using LangChain + Ollama.
+
+    Calls are routed per task: classification goes to `classifier_model` with a short
+    generation budget and its own concurrency limit, so it never waits behind long
+    generations in this process; answers and summaries go to `model`, their callers
+    admit them through the LLMAdmission limiter (core/admission.py).
     """
 
     def __init__(self, 
             model: str,
             *,
-            options: Optional[Dict] = None
+            options: Optional[Dict] = None,
+            keep_alive: Optional[Union[int, str]] = None,
+            classifier_model: Optional[str] = None,
+            classifier_options: Optional[Dict] = None,
+            classifier_concurrency: int = 8,
         ):
+        """
+        Args:
+            model: Ollama model name for answers and summaries.
+            options: ChatOllama runtime args (temperature, num_ctx, top_p, ...).
+            keep_alive: How long Ollama keeps the model loaded after a call ("30m",
+                seconds, -1 for as long as Ollama runs); None for the server default.
+            classifier_model: Ollama model name for classification, None for `model`.
+            classifier_options: ChatOllama runtime args of the classifier, by default
+                CLASSIFIER_OPTIONS (a few tokens, stop at the end of the line).
+            classifier_concurrency: Classification calls in flight at once.
+        """
+        # Ollama takes seconds as a number ("-1" only works as one) or a duration like "30m"
+        if isinstance(keep_alive, str) and keep_alive.lstrip("-").isdigit():
+            keep_alive = int(keep_alive)
+
         try:
             if options:
                 # Many Ollama runtime args (temperature, num_ctx, top_p, etc.) are accepted directly
-                self.llm = ChatOllama(model=model, **options)
+                self.llm = ChatOllama(model=model, keep_alive=keep_alive, **options)
             else:
-                self.llm = ChatOllama(model=model)
+                self.llm = ChatOllama(model=model, keep_alive=keep_alive)
         except Exception as e:
             logger.warning(f"Failed to apply options to ChatOllama ({e}). Falling back to defaults.")
-            self.llm = ChatOllama(model=model)
-            
+            self.llm = ChatOllama(model=model, keep_alive=keep_alive)
+
+        self.classifier_llm = ChatOllama(
+            model=classifier_model or model,
+            keep_alive=keep_alive,
+            **(CLASSIFIER_OPTIONS if classifier_options is None else classifier_options),
+        )
+
+        self._classifier_slots = asyncio.Semaphore(classifier_concurrency)
+
+        # same model, options and client, so a warm-up loads exactly what the calls use
+        self._warm_llm = self.llm.model_copy(update={"num_predict": 1})
+        self._warm_classifier_llm = self.classifier_llm.model_copy(update={"num_predict": 1})
+        self.last_used = 0.0
+
         self.config = PromptConfig()
+        # formatted once: every chat starts with these exact bytes, which Ollama can
+        # serve from its prompt cache instead of prefilling them again
+        self.system_prompt = self.config.system_template.format(
+            brand=self.config.brand, tone=self.config.tone, max_tokens=self.config.max_tokens_hint
+        )
 
     # -----------------------------
     # Public API
@@ -47,10 +95,14 @@ class LangchainClient:
         prompt = self.config.classifier_template.format(query=user_query)
 
         for attempt in range(1, max_retries + 1):
+            if attempt > 1:
+                metrics.CLASSIFIER_RETRIES.inc()
             try:
                 
                 # Single-turn prompt; expect plain text category in the response
-                resp = self.llm.invoke(prompt)
+                started = time.perf_counter()
+                resp = self.classifier_llm.invoke(prompt)
+                self._observe("classify", resp, started)
                 category = (resp.content or "").strip().lower()
 
                 if category not in ("unknown", ""):
@@ -65,41 +117,183 @@ class LangchainClient:
         logger.info("All 5 attempts failed to classify. Returning 'unknown'.")
         return None
 
+    async def aclassify_category(self, user_query: str) -> Optional[str]:
+        """
+        Async variant of classify_category(). Backs off with asyncio.sleep so retries
+        never hold a worker thread.
+        """
+        max_retries = 5
+        wait_seconds = 1
+
+        prompt = self.config.classifier_template.format(query=user_query)
+
+        for attempt in range(1, max_retries + 1):
+            if attempt > 1:
+                metrics.CLASSIFIER_RETRIES.inc()
+            try:
+                async with self._classifier_slots:
+                    started = time.perf_counter()
+                    resp = await self.classifier_llm.ainvoke(prompt)
+                self._observe("classify", resp, started)
+                category = (resp.content or "").strip().lower()
+
+                if category not in ("unknown", ""):
+                    logger.info("Classified Category: %s", category)
+                    return category
+                else:
+                    await asyncio.sleep(wait_seconds)
+            except Exception as e:
+                logger.error(f"[Attempt {attempt}] Error while classifying: {e}")
+                await asyncio.sleep(wait_seconds)
+
+        logger.info("All 5 attempts failed to classify. Returning 'unknown'.")
+        return None
+
     def answer(
         self,
         user_query: str,
         docs: List[Doc],
         prev_messages=List[MessageModel],
+        summary: Optional[str] = None,
     ) -> str:
         """
         Non-streaming answer. Returns the assistant message text unchanged: str.
         Mirrors previous behavior but routes through LangChain's ChatOllama.
         """
-        messages_dicts = self._make_messages(user_query, docs, prev_messages)
+        messages_dicts = self._make_messages(user_query, docs, prev_messages, summary)
         logger.info("Messages sent to LangChain/Ollama: %s", messages_dicts)
 
 
         lc_messages = self._to_langchain_messages(messages_dicts)
+        started = time.perf_counter()
         resp = self.llm.invoke(lc_messages)
+        self._observe("answer", resp, started)
 
         # Match previous return type exactly (string content)
         return getattr(resp, "content", "") or ""
 
+    async def aanswer(
+        self,
+        user_query: str,
+        docs: List[Doc],
+        prev_messages=List[MessageModel],
+        summary: Optional[str] = None,
+    ) -> str:
+        """
+        Async variant of answer().
+        """
+        messages_dicts = self._make_messages(user_query, docs, prev_messages, summary)
+        logger.info("Messages sent to LangChain/Ollama: %s", messages_dicts)
+
+        lc_messages = self._to_langchain_messages(messages_dicts)
+        started = time.perf_counter()
+        resp = await self.llm.ainvoke(lc_messages)
+        self._observe("answer", resp, started)
+
+        return getattr(resp, "content", "") or ""
+
+    async def answer_stream(
+        self,
+        user_query: str,
+        docs: List[Doc],
+        prev_messages=List[MessageModel],
+        summary: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Streaming answer. Yields the assistant message text token by token as ChatOllama
+        produces it. Closing the generator aborts the underlying Ollama request.
+        """
+        messages_dicts = self._make_messages(user_query, docs, prev_messages, summary)
+        logger.info("Messages streamed to LangChain/Ollama: %s", messages_dicts)
+
+        lc_messages = self._to_langchain_messages(messages_dicts)
+        started = time.perf_counter()
+        # the final chunk carries the token counts of the whole generation
+        final = None
+        try:
+            async for chunk in self.llm.astream(lc_messages):
+                if getattr(chunk, "usage_metadata", None):
+                    final = chunk
+                token = getattr(chunk, "content", "") or ""
+                if token:
+                    yield token
+        finally:
+            self._observe("answer", final, started)
+
+    async def asummarize(self, summary: Optional[str], messages: List[MessageModel]) -> str:
+        """
+        Fold `messages` into the running conversation summary and return the new summary.
+        """
+        prompt = self.config.summary_template.format(
+            summary=summary or "(none)",
+            messages=self._format_transcript(messages),
+            max_words=self.config.summary_max_words,
+        )
+        started = time.perf_counter()
+        resp = await self.llm.ainvoke(prompt)
+        self._observe("summary", resp, started)
+
+        return (getattr(resp, "content", "") or "").strip()
+
+    async def warm_up(self) -> None:
+        """
+        Load the model (pinned for keep_alive) and prefill the system prompt with a
+        one-token chat, so the next real chat finds both ready. A separate classifier
+        model is loaded the same way.
+        """
+        started = time.perf_counter()
+        resp = await self._warm_llm.ainvoke([SystemMessage(content=self.system_prompt)])
+        self._observe("warmup", resp, started)
+
+        # on the answer model the classifier prompt would push the system prompt out of the cache
+        if self.classifier_llm.model != self.llm.model:
+            started = time.perf_counter()
+            resp = await self._warm_classifier_llm.ainvoke(self.config.classifier_template.format(query=""))
+            self._observe("warmup", resp, started)
+
+    async def keep_warm(self, interval: float) -> None:
+        """
+        Warm up now, then again whenever no call was made for `interval` seconds. Runs
+        until cancelled; a failed ping is logged and retried on the next tick. An
+        interval of 0 warms up once.
+        """
+        while True:
+            idle = time.monotonic() - self.last_used
+            if idle >= interval:
+                try:
+                    await self.warm_up()
+                    logger.info("Warmed up Ollama model %s", self.llm.model)
+                except Exception as e:
+                    logger.warning(f"Ollama warm-up failed: {e}")
+                    self.last_used = time.monotonic()
+                idle = 0.0
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval - idle)
+
     # -----------------------------
     # Internal helpers
     # -----------------------------
-    def _make_messages(self, user_query: str, docs: List[Doc], prev_messages: List[MessageModel] = []) -> List[Dict[str, str]]:
-        system = self.config.system_template.format(
-            brand=self.config.brand, tone=self.config.tone, max_tokens=self.config.max_tokens_hint
-        )
-
+    def _make_messages(
+        self,
+        user_query: str,
+        docs: List[Doc],
+        prev_messages: List[MessageModel] = [],
+        summary: Optional[str] = None,
+    ) -> List[Dict[str, str]]:
         context_block = self._build_context_block(docs)
 
         user_prompt = self.config.user_template.format(
             user_query=user_query, k=len(docs), context_block=context_block
         )
 
-        messages = [{"role": "system", "content": system}]
+        # static first, then what changes per conversation and per turn, so the cached
+        # prefix of the previous call stays valid as far as possible
+        messages = [{"role": "system", "content": self.system_prompt}]
+
+        # Older turns are folded into a rolling summary
+        if summary:
+            messages.append({"role": "system", "content": self.config.summary_block_template.format(summary=summary)})
 
         # Add previous conversation messages
         for msg in prev_messages:
@@ -110,6 +304,27 @@ class LangchainClient:
 
         return messages
 
+    def _observe(self, task: str, resp, started: float) -> None:
+        self.last_used = time.monotonic()
+        usage = getattr(resp, "usage_metadata", None) or {}
+        response_metadata = getattr(resp, "response_metadata", None) or {}
+        eval_ns = response_metadata.get("eval_duration")
+        load_ns = response_metadata.get("load_duration")
+        prefill_ns = response_metadata.get("prompt_eval_duration")
+        metrics.observe_llm(
+            task,
+            time.perf_counter() - started,
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens"),
+            generation_seconds=eval_ns / 1e9 if eval_ns else None,
+            load_seconds=load_ns / 1e9 if load_ns is not None else None,
+            prefill_seconds=prefill_ns / 1e9 if prefill_ns is not None else None,
+        )
+
+    @staticmethod
+    def _format_transcript(messages: List[MessageModel]) -> str:
+        return "\n".join(f"{m['role']}: {m['text']}" for m in messages)
+
     @staticmethod
     def _build_context_block(docs: List[Doc]) -> str:
         lines: List[str] = []
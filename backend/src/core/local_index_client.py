@@ -0,0 +1,183 @@
+from __future__ import annotations
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ..logger import logging
+from ..utils.data_classes import Doc
+from .pincone_client import PineconeClient
+
+try:
+    import hnswlib
+except ImportError:  # optional dependency, only needed for large corpora
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.npy"
+METADATA_FILE = "metadata.jsonl"
+HNSW_FILE = "hnsw.bin"
+
+
+class LocalIndexClient(PineconeClient):
+    """
+    Drop-in replacement for PineconeClient that serves query_documents() from an
+    in-process vector index instead of the hosted Pinecone index.
+
+    The index is loaded from a snapshot directory holding L2-normalized float32 vectors
+    (memory-mapped) and one JSON metadata line per vector. Small corpora are searched
+    exactly with a NumPy matrix-vector product; from `hnsw_threshold` vectors up an HNSW
+    graph is used when hnswlib is installed. Embedding and reranking still go through
+    Pinecone Inference, inherited from PineconeClient.
+    """
+
+    def __init__(
+        self,
+        snapshot_path: str,
+        *args,
+        hnsw_threshold: int = 50000,
+        hnsw_ef: int = 64,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            snapshot_path: Directory written by write_snapshot().
+            hnsw_threshold: Corpus size from which the HNSW graph is used.
+            hnsw_ef: HNSW search breadth, higher is more accurate and slower.
+            *args, **kwargs: Passed on to PineconeClient.
+        """
+        super().__init__(*args, **kwargs)
+        self.snapshot_path = snapshot_path
+        self.hnsw_threshold = hnsw_threshold
+        self.hnsw_ef = hnsw_ef
+
+        self.vectors: Optional[np.ndarray] = None
+        self.metadata: List[Dict] = []
+        self._hnsw = None
+
+        self.reload()
+
+    # -----------------------------
+    # Query the local index
+    # -----------------------------
+    def _query_dense(self, query_vector: List[float], top_k: int) -> List[Doc]:
+        """
+        Similarity search on the local index, in the same shape as the Pinecone hits.
+        query_documents() and the sparse fusion are inherited.
+        """
+        if self.vectors is None or not len(self.metadata):
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        top_k = min(top_k, len(self.metadata))
+
+        if self._hnsw is not None:
+            if top_k > self.hnsw_ef:
+                self.hnsw_ef = top_k
+                self._hnsw.set_ef(top_k)
+            labels, distances = self._hnsw.knn_query(query, k=top_k)
+            rows = labels[0]
+            # inner product space: distance = 1 - cosine similarity
+            row_scores = 1.0 - distances[0]
+        else:
+            scores = self.vectors @ query
+            rows = np.argpartition(-scores, top_k - 1)[:top_k]
+            rows = rows[np.argsort(-scores[rows])]
+            row_scores = scores[rows]
+
+        return self._to_documents({
+            "matches": [
+                {"id": self.metadata[row]["id"], "score": float(score), "metadata": self.metadata[row]}
+                for row, score in zip(rows, row_scores)
+            ]
+        })
+
+    async def _aquery_dense(self, query_vector: List[float], top_k: int) -> List[Doc]:
+        # sub-millisecond CPU work, cheaper inline than a thread hop
+        return self._query_dense(query_vector, top_k)
+
+    def reload(self) -> None:
+        """
+        (Re)load the snapshot from disk, e.g. after it was rewritten by an export.
+        """
+        vectors_path = os.path.join(self.snapshot_path, VECTORS_FILE)
+        metadata_path = os.path.join(self.snapshot_path, METADATA_FILE)
+
+        if not os.path.exists(vectors_path):
+            logger.warning(f"No local index snapshot at {self.snapshot_path}, queries will return nothing.")
+            return
+
+        self.vectors = np.load(vectors_path, mmap_mode="r")
+        with open(metadata_path) as f:
+            self.metadata = [json.loads(line) for line in f]
+
+        self._hnsw = None
+        if len(self.metadata) >= self.hnsw_threshold:
+            self._hnsw = self._load_hnsw()
+
+        logger.info(
+            "Loaded local index snapshot: %d vectors, %s search",
+            len(self.metadata), "hnsw" if self._hnsw is not None else "exact"
+        )
+
+    # -----------------------------
+    # Snapshots
+    # -----------------------------
+    @staticmethod
+    def write_snapshot(path: str, records: Iterable[Dict]) -> int:
+        """
+        Write a snapshot from records shaped like {"id", "values", "metadata"}.
+        Returns the number of vectors written.
+        """
+        vectors: List[List[float]] = []
+        metadata: List[Dict] = []
+        for record in records:
+            vectors.append(record["values"])
+            metadata.append({**(record.get("metadata") or {}), "id": record["id"]})
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if len(matrix):
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-12)
+
+        # written aside and renamed into place: a running process keeps its memory-mapped
+        # copy of the old files and never reads a half-written one
+        os.makedirs(path, exist_ok=True)
+        vectors_path = os.path.join(path, VECTORS_FILE)
+        with open(vectors_path + ".tmp", "wb") as f:
+            np.save(f, matrix)
+        metadata_path = os.path.join(path, METADATA_FILE)
+        with open(metadata_path + ".tmp", "w") as f:
+            for meta in metadata:
+                f.write(json.dumps(meta) + "\n")
+        os.replace(vectors_path + ".tmp", vectors_path)
+        os.replace(metadata_path + ".tmp", metadata_path)
+
+        # the graph is rebuilt for the new vectors on next load
+        hnsw_path = os.path.join(path, HNSW_FILE)
+        if os.path.exists(hnsw_path):
+            os.remove(hnsw_path)
+
+        return len(metadata)
+
+    def _load_hnsw(self):
+        if hnswlib is None:
+            logger.warning("hnswlib is not installed, falling back to exact search.")
+            return None
+
+        count, dim = self.vectors.shape
+        graph = hnswlib.Index(space="ip", dim=dim)
+        hnsw_path = os.path.join(self.snapshot_path, HNSW_FILE)
+
+        if os.path.exists(hnsw_path):
+            graph.load_index(hnsw_path, max_elements=count)
+        else:
+            logger.info("Building HNSW graph for %d vectors", count)
+            graph.init_index(max_elements=count, ef_construction=200, M=16)
+            graph.add_items(np.asarray(self.vectors), np.arange(count))
+            graph.save_index(hnsw_path)
+
+        graph.set_ef(max(self.hnsw_ef, 1))
+        return graph
@@ -0,0 +1,149 @@
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# seconds, from sub-millisecond local stages up to slow LLM generations
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# model load time above which an LLM call counts as a cold start
+COLD_START_SECONDS = 0.5
+
+CHAT_STAGE_SECONDS = Histogram(
+    "chat_stage_seconds",
+    "Duration of each chat pipeline stage (classify, embed_query, query, rerank, history, answer, persist, ...)",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+CHAT_PIPELINE_SECONDS = Histogram(
+    "chat_pipeline_seconds",
+    "Wall time of the chat pipeline up to the persisted answer",
+    buckets=LATENCY_BUCKETS,
+)
+
+CLASSIFICATIONS = Counter(
+    "chat_classifications_total",
+    "Category classifications by how they were resolved (memo, centroid, llm, failed)",
+    ["method"],
+)
+CLASSIFIER_RETRIES = Counter(
+    "chat_classifier_retries_total",
+    "LLM classification attempts beyond the first",
+)
+
+COALESCED_REQUESTS = Counter(
+    "chat_coalesced_requests_total",
+    "First-turn chat requests by whether they started a pipeline run or joined one in flight",
+    ["role"],
+)
+
+RETRIEVAL_PATHS = Counter(
+    "chat_retrieval_paths_total",
+    "Retrievals by adaptive rerank path (skip, rerank, widen)",
+    ["path"],
+)
+RERANK_SAVED_SECONDS = Counter(
+    "chat_rerank_saved_seconds_total",
+    "Estimated rerank time saved by skipped reranks",
+)
+
+BATCH_PROMPTS = Counter(
+    "chat_batch_prompts_total",
+    "Prompts processed by POST /chats/batch, by outcome (answered, failed)",
+    ["outcome"],
+)
+
+LLM_ACTIVE = Gauge(
+    "llm_admission_active",
+    "Answer LLM calls holding an admission slot",
+)
+LLM_QUEUE_DEPTH = Gauge(
+    "llm_admission_queue_depth",
+    "Chat requests waiting for an answer LLM slot, by priority (user, guest)",
+    ["priority"],
+)
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "llm_admission_wait_seconds",
+    "Time admitted chat requests waited for an answer LLM slot",
+    ["priority"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_ADMISSIONS = Counter(
+    "llm_admissions_total",
+    "Answer LLM admission decisions by priority and outcome (admitted, deadline, queue_full, timeout, evicted)",
+    ["priority", "outcome"],
+)
+
+LLM_SECONDS = Histogram(
+    "llm_request_seconds",
+    "Duration of LLM calls",
+    ["task"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens processed by the LLM",
+    ["task", "direction"],
+)
+LLM_LOAD_SECONDS = Histogram(
+    "llm_load_seconds",
+    "Time Ollama spent loading the model for an LLM call, near zero when it is resident",
+    ["task"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_COLD_STARTS = Counter(
+    "llm_cold_starts_total",
+    "LLM calls that had to wait for the model to load",
+    ["task"],
+)
+LLM_PREFILL_SECONDS = Histogram(
+    "llm_prefill_seconds",
+    "Prompt evaluation time of LLM calls, shorter when Ollama reuses a cached prompt prefix",
+    ["task"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS_PER_SECOND = Histogram(
+    "llm_output_tokens_per_second",
+    "Generation throughput of LLM calls",
+    ["task"],
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250),
+)
+
+
+def observe_stages(timings: Dict[str, Tuple[float, float]]) -> None:
+    """
+    Record the stage timings of a StageGraph, as (start, end) offsets in seconds.
+    """
+    for stage, (start, end) in timings.items():
+        CHAT_STAGE_SECONDS.labels(stage).observe(end - start)
+    if timings:
+        CHAT_PIPELINE_SECONDS.observe(max(end for _, end in timings.values()))
+
+
+def observe_llm(
+    task: str,
+    seconds: float,
+    input_tokens: Optional[int] = None,
+    output_tokens: Optional[int] = None,
+    generation_seconds: Optional[float] = None,
+    load_seconds: Optional[float] = None,
+    prefill_seconds: Optional[float] = None,
+) -> None:
+    """
+    Record one LLM call. Throughput uses the generation time reported by Ollama when
+    available, otherwise the wall time of the call.
+    """
+    LLM_SECONDS.labels(task).observe(seconds)
+    if load_seconds is not None:
+        LLM_LOAD_SECONDS.labels(task).observe(load_seconds)
+        if load_seconds >= COLD_START_SECONDS:
+            LLM_COLD_STARTS.labels(task).inc()
+    if prefill_seconds is not None:
+        LLM_PREFILL_SECONDS.labels(task).observe(prefill_seconds)
+    if input_tokens:
+        LLM_TOKENS.labels(task, "input").inc(input_tokens)
+    if output_tokens:
+        LLM_TOKENS.labels(task, "output").inc(output_tokens)
+        duration = generation_seconds or seconds
+        if duration > 0:
+            LLM_TOKENS_PER_SECOND.labels(task).observe(output_tokens / duration)
@@ -1,9 +1,11 @@
 from __future__ import annotations
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
 from ..models.chat import MessageModel
 import ollama
+import asyncio
 import time
 from ..utils.data_classes import PromptConfig, Doc
+from . import metrics
 from ..logger import logging
 
 logger = logging.getLogger(__name__)
@@ -48,18 +50,49 @@ class OllamaClient:
         logger.info("All 5 attempts failed to classify. Returning 'unknown'.")
         return None
     
+    async def aclassify_category(self, user_query: str) -> str:
+        """
+        Async variant of classify_category().
+        """
+        max_retries = 5
+        wait_seconds = 1
+
+        for attempt in range(1, max_retries + 1):
+            if attempt > 1:
+                metrics.CLASSIFIER_RETRIES.inc()
+            prompt = self.config.classifier_template.format(query=user_query)
+
+            try:
+                started = time.perf_counter()
+                resp = await ollama.AsyncClient().generate(model=self.model, prompt=prompt)
+                self._observe("classify", resp, started)
+                category = resp["response"].strip().lower()
+
+                if category != "unknown" and category != "":
+                    return category
+                else:
+                    await asyncio.sleep(wait_seconds)
+
+            except Exception as e:
+                logger.error(f"[Attempt {attempt}] Error while classifying: {e}")
+                await asyncio.sleep(wait_seconds)
+
+        logger.info("All 5 attempts failed to classify. Returning 'unknown'.")
+        return None
+
     def answer(
         self,
         user_query: str,
         docs: List[Doc],
         prev_messages=List[MessageModel],
+        summary: Optional[str] = None,
         *,
         options: Optional[Dict] = None,
     ) -> str:
         """
         Non-streaming answer. Returns the system message text.
         """
-        messages = self._make_messages(user_query, docs, prev_messages)
+        messages = self._make_messages(user_query, docs, prev_messages, summary)
         
         logger.info("Messages sent to Ollama: %s", messages)  # Debug print
         
@@ -71,10 +104,92 @@ class OllamaClient:
 
         return resp["message"]["content"]
 
+    async def aanswer(
+        self,
+        user_query: str,
+        docs: List[Doc],
+        prev_messages=List[MessageModel],
+        summary: Optional[str] = None,
+        *,
+        options: Optional[Dict] = None,
+    ) -> str:
+        """
+        Async variant of answer().
+        """
+        messages = self._make_messages(user_query, docs, prev_messages, summary)
+
+        logger.info("Messages sent to Ollama: %s", messages)
+
+        kwargs: Dict = {}
+        if options:
+            kwargs["options"] = options
+
+        started = time.perf_counter()
+        resp = await ollama.AsyncClient().chat(model=self.model, messages=messages, **kwargs)
+        self._observe("answer", resp, started)
+
+        return resp["message"]["content"]
+
+    async def answer_stream(
+        self,
+        user_query: str,
+        docs: List[Doc],
+        prev_messages=List[MessageModel],
+        summary: Optional[str] = None,
+        *,
+        options: Optional[Dict] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Streaming answer. Yields the system message text token by token.
+        Closing the generator aborts the underlying Ollama request.
+        """
+        messages = self._make_messages(user_query, docs, prev_messages, summary)
+
+        logger.info("Messages streamed to Ollama: %s", messages)
+
+        kwargs: Dict = {}
+        if options:
+            kwargs["options"] = options
+
+        started = time.perf_counter()
+        # the final part carries the token counts of the whole generation
+        final = None
+        stream = await ollama.AsyncClient().chat(model=self.model, messages=messages, stream=True, **kwargs)
+        try:
+            async for part in stream:
+                if part.get("done"):
+                    final = part
+                token = part["message"]["content"]
+                if token:
+                    yield token
+        finally:
+            self._observe("answer", final, started)
+
+    async def asummarize(self, summary: Optional[str], messages: List[MessageModel]) -> str:
+        """
+        Fold `messages` into the running conversation summary and return the new summary.
+        """
+        prompt = self.config.summary_template.format(
+            summary=summary or "(none)",
+            messages=self._format_transcript(messages),
+            max_words=self.config.summary_max_words,
+        )
+        started = time.perf_counter()
+        resp = await ollama.AsyncClient().generate(model=self.model, prompt=prompt)
+        self._observe("summary", resp, started)
+
+        return resp["response"].strip()
+
     # -----------------------------
     # Internal helpers
     # -----------------------------
-    def _make_messages(self, user_query: str, docs: List[Doc], prev_messages: List[MessageModel]=[]) -> List[Dict[str, str]]:
+    def _make_messages(
+        self,
+        user_query: str,
+        docs: List[Doc],
+        prev_messages: List[MessageModel]=[],
+        summary: Optional[str] = None,
+    ) -> List[Dict[str, str]]:
         system = self.config.system_template.format(
             brand=self.config.brand, tone=self.config.tone, max_tokens=self.config.max_tokens_hint
         )
@@ -86,6 +201,10 @@ class OllamaClient:
         )
         
         messages = [{"role": "system", "content": system}]
+
+        # Older turns are folded into a rolling summary
+        if summary:
+            messages.append({"role": "system", "content": self.config.summary_block_template.format(summary=summary)})
         
         # Add previous conversation messages
         for msg in prev_messages:
@@ -96,6 +215,26 @@ class OllamaClient:
         
         return messages
 
+    @staticmethod
+    def _observe(task: str, resp, started: float) -> None:
+        resp = resp or {}
+        eval_ns = resp.get("eval_duration")
+        load_ns = resp.get("load_duration")
+        prefill_ns = resp.get("prompt_eval_duration")
+        metrics.observe_llm(
+            task,
+            time.perf_counter() - started,
+            input_tokens=resp.get("prompt_eval_count"),
+            output_tokens=resp.get("eval_count"),
+            generation_seconds=eval_ns / 1e9 if eval_ns else None,
+            load_seconds=load_ns / 1e9 if load_ns is not None else None,
+            prefill_seconds=prefill_ns / 1e9 if prefill_ns is not None else None,
+        )
+
+    @staticmethod
+    def _format_transcript(messages: List[MessageModel]) -> str:
+        return "\n".join(f"{m['role']}: {m['text']}" for m in messages)
+
     @staticmethod
     def _build_context_block(docs: List[Doc]) -> str:
         
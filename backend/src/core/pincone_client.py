@@ -1,7 +1,10 @@
-from typing import List, Literal
-from pinecone import Pinecone
+import asyncio
+from typing import Dict, List, Literal, Optional, Tuple
+from pinecone import Pinecone, PineconeAsyncio
 from dataclasses import dataclass
 from ..logger import logging
+from .embedding_cache import EmbeddingCache
+from .sparse_index import reciprocal_rank_fusion
 from ..utils.data_classes import Doc
 
 logger = logging.getLogger(__name__)
@@ -11,12 +14,22 @@ class PineconeClient:
     Class-based Minimal wrapper around Pinecone Inference.
     """
 
+    # most inputs Pinecone Inference embeds in one request (llama-text-embed-v2)
+    EMBED_BATCH_SIZE = 96
+    # Pinecone recommends upserts of at most 100 vectors (and 2 MB) per request
+    UPSERT_BATCH_SIZE = 100
+    DELETE_BATCH_SIZE = 1000
+
     def __init__(
         self,
         api_key: str,
         index_name: str,
         namespace: str,
         model: str = "llama-text-embed-v2",
+        embedding_cache: Optional[EmbeddingCache] = None,
+        reranker=None,
+        sparse_index=None,
+        rrf_k: int = 60,
     ) -> None:
         """
         Initialize the Pinecone client.
@@ -26,11 +39,70 @@ class PineconeClient:
             index_name: Name of your Pinecone index.
             namespace: Namespace for this dataset.
             model: Embedding model to use for queries.
+            embedding_cache: Optional cache consulted before calling the embedding API.
+            reranker: Optional local reranker (core/reranker.py) used instead of the
+                hosted reranker model.
+            sparse_index: Optional BM25Index (core/sparse_index.py) searched next to the
+                dense index when the query text is passed, fused with reciprocal rank fusion.
+            rrf_k: Rank offset of the fusion, higher flattens the rank weights.
         """        
         self.pc = Pinecone(api_key=api_key)
         self.model = model
-        self.index = self.pc.Index(index_name)
+        self.embedding_cache = embedding_cache
+        self.reranker = reranker
+        self.sparse_index = sparse_index
+        self.rrf_k = rrf_k
+        self.index_name = index_name
         self.namespace = namespace
+        self._index = None
+
+        # asyncio clients own an aiohttp session, so they are created lazily
+        # inside the running event loop and released with aclose()
+        self._api_key = api_key
+        self._apc: Optional[PineconeAsyncio] = None
+        self._aindex = None
+        self._host: Optional[str] = None
+        self._aindex_lock = asyncio.Lock()
+
+    @property
+    def index(self):
+        # resolving the index host is a network call, so it happens on first use
+        if self._index is None:
+            self._index = self.pc.Index(self.index_name)
+        return self._index
+
+    @property
+    def apc(self) -> PineconeAsyncio:
+        if self._apc is None:
+            self._apc = PineconeAsyncio(api_key=self._api_key)
+        return self._apc
+
+    async def aconnect(self):
+        """
+        The asyncio index client. On first use the index host is resolved with the
+        asyncio describe_index(), so no blocking HTTP call runs on the event loop; the
+        app lifespan calls it on startup.
+        """
+        if self._aindex is None:
+            async with self._aindex_lock:
+                if self._aindex is None:
+                    if self._host is None:
+                        self._host = (await self.apc.describe_index(self.index_name)).host
+                    self._aindex = self.pc.IndexAsyncio(host=self._host)
+        return self._aindex
+
+    async def aclose(self) -> None:
+        """
+        Close the asyncio Pinecone sessions, if they were opened, and the local reranker.
+        """
+        if self.reranker is not None:
+            self.reranker.close()
+        if self._aindex is not None:
+            await self._aindex.close()
+            self._aindex = None
+        if self._apc is not None:
+            await self._apc.close()
+            self._apc = None
 
     def embed_query(self, query: str) -> List[float]:
         """
@@ -54,17 +126,61 @@ class PineconeClient:
         input_type: Literal["query", "document"] = "document",
     ) -> List[List[float]]:
         """
-        Embed multiple texts in one call. Use input_type="document" for corpus chunks.
+        Embed multiple texts, EMBED_BATCH_SIZE per API call. Use input_type="document" for
+        corpus chunks. Only the texts missing from the embedding cache are sent to the API.
 
         Returns:
             A list of embedding vectors, one per input text.
         """
-        embed_out = self.pc.inference.embed(
-            model=self.model,
-            inputs=texts,
-            parameters={"input_type": input_type},
+        keys, found, misses = self._cache_lookup(texts, input_type)
+
+        for start in range(0, len(misses), self.EMBED_BATCH_SIZE):
+            batch = misses[start:start + self.EMBED_BATCH_SIZE]
+            embed_out = self.pc.inference.embed(
+                model=self.model,
+                inputs=batch,
+                parameters={"input_type": input_type},
+            )
+            self._cache_store(batch, input_type, [d.values for d in embed_out.data], found)
+
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, query: str) -> List[float]:
+        """
+        Async variant of embed_query().
+        """
+        embed_out = await self.aembed_texts(
+            texts=[query],
+            input_type="query"
         )
-        return [d.values for d in embed_out.data]
+
+        return embed_out[0]
+
+    async def aembed_texts(
+        self,
+        texts: List[str],
+        input_type: Literal["query", "document"] = "document",
+    ) -> List[List[float]]:
+        """
+        Async variant of embed_texts().
+        """
+        keys = self._cache_keys(texts, input_type)
+        found = await self.embedding_cache.aget_many(keys) if self.embedding_cache else {}
+        misses = self._cache_misses(keys, texts, found)
+
+        batches = [misses[start:start + self.EMBED_BATCH_SIZE] for start in range(0, len(misses), self.EMBED_BATCH_SIZE)]
+        outputs = await asyncio.gather(*(
+            self.apc.inference.embed(
+                model=self.model,
+                inputs=batch,
+                parameters={"input_type": input_type},
+            )
+            for batch in batches
+        ))
+        for batch, embed_out in zip(batches, outputs):
+            self._cache_store(batch, input_type, [d.values for d in embed_out.data], found)
+
+        return [found[key] for key in keys]
 
     # -----------------------------
     # Query Pinecone
@@ -74,6 +190,7 @@ class PineconeClient:
         query_vector: List[float],
         # category: Optional[str] = None,
         top_k: int = 5,
+        query_text: Optional[str] = None,
     ) -> List[Doc]:
         """
         Run similarity search on the Pinecone index and return a list of matched documents.
@@ -82,10 +199,42 @@ class PineconeClient:
             query_vector: Embedding vector from embed_query().
             category: Optional category filter.
             top_k: Number of top documents to retrieve.
+            query_text: Raw query, searched in the sparse index (when there is one) and
+                fused with the dense hits.
 
         Returns:
-            List of Docs: [{"id": ..., "chunk_text": ...}, ...]
+            List of Docs: [{"id", "question", "answer", "score"}, ...], best first. `score`
+            is the dense similarity of the hit; hits only the sparse index found have none.
+        """
+        docs = self._query_dense(query_vector, top_k)
+        if self.sparse_index is None or not query_text:
+            return docs
+        return reciprocal_rank_fusion([docs, self.sparse_index.search(query_text, top_k)], top_k, k=self.rrf_k)
+
+    async def aquery_documents(
+        self,
+        query_vector: List[float],
+        top_k: int = 5,
+        query_text: Optional[str] = None,
+    ) -> List[Doc]:
         """
+        Async variant of query_documents(). The sparse search runs while the dense
+        query is in flight.
+        """
+        if self.sparse_index is None or not query_text:
+            return await self._aquery_dense(query_vector, top_k)
+
+        dense = asyncio.ensure_future(self._aquery_dense(query_vector, top_k))
+        # let the dense query send its request before the CPU-bound sparse search
+        await asyncio.sleep(0)
+        try:
+            sparse = self.sparse_index.search(query_text, top_k)
+        except BaseException:
+            dense.cancel()
+            raise
+        return reciprocal_rank_fusion([await dense, sparse], top_k, k=self.rrf_k)
+
+    def _query_dense(self, query_vector: List[float], top_k: int) -> List[Doc]:
         # filter_clause = {"category": {"$eq": category}} if category else None
 
         results = self.index.query(
@@ -97,17 +246,19 @@ class PineconeClient:
             # filter=filter_clause,
         )
         
-        documents = [
-            {
-                "id": hit["id"],
-                "question": hit["metadata"].get("question", ""),
-                "answer": hit["metadata"].get("answer", "")
-            }
-            for hit in results.get("matches", [])
-        ]
-        
-        
-        return documents
+        return self._to_documents(results)
+
+    async def _aquery_dense(self, query_vector: List[float], top_k: int) -> List[Doc]:
+        index = await self.aconnect()
+        results = await index.query(
+            namespace=self.namespace,
+            vector=query_vector,
+            top_k=top_k,
+            include_metadata=True,
+            include_values=False,
+        )
+
+        return self._to_documents(results)
 
     def rerank_results(self, 
             query_vector: str, 
@@ -122,12 +273,14 @@ class PineconeClient:
             pinecone_results: list of Pinecone matches (with metadata)
             top_n: number of reranked results to return
         """
+        if self.reranker is not None:
+            return self.reranker.rerank(query_vector, documents, top_n)
 
         # Call Pinecone inference reranker
         reranked = self.pc.inference.rerank(
             model=model,
             query=query_vector,
-            documents=documents,
+            documents=self._rerank_documents(documents),
             top_n=top_n,
             rank_fields=["question"],
             return_documents=True,
@@ -135,13 +288,134 @@ class PineconeClient:
         )
 
         logger.info("Reranked results: %s", reranked)
-        
-        documents = [
+
+        return self._to_reranked(reranked)
+
+    async def arerank_results(self,
+            query_vector: str,
+            documents: list,
+            top_n: int = 1,
+            model: str="bge-reranker-v2-m3"
+        ):
+        """
+        Async variant of rerank_results().
+        """
+        if self.reranker is not None:
+            return await self.reranker.arerank(query_vector, documents, top_n)
+        reranked = await self.apc.inference.rerank(
+            model=model,
+            query=query_vector,
+            documents=self._rerank_documents(documents),
+            top_n=top_n,
+            rank_fields=["question"],
+            return_documents=True,
+            parameters={"truncate": "END"}
+        )
+
+        logger.info("Reranked results: %s", reranked)
+
+        return self._to_reranked(reranked)
+
+    # -----------------------------
+    # Index writes
+    # -----------------------------
+    def upsert(self, vectors: List[Dict], batch_size: int = UPSERT_BATCH_SIZE) -> int:
+        """
+        Upsert records shaped like {"id", "values", "metadata"} into the namespace,
+        `batch_size` per request. Returns the number of vectors upserted.
+        """
+        upserted = 0
+        for start in range(0, len(vectors), batch_size):
+            response = self.index.upsert(vectors=vectors[start:start + batch_size], namespace=self.namespace)
+            upserted += response.upserted_count
+        return upserted
+
+    async def aupsert(self, vectors: List[Dict], batch_size: int = UPSERT_BATCH_SIZE) -> int:
+        """
+        Async variant of upsert(), the batches are sent one after another.
+        """
+        index = await self.aconnect()
+        upserted = 0
+        for start in range(0, len(vectors), batch_size):
+            response = await index.upsert(vectors=vectors[start:start + batch_size], namespace=self.namespace)
+            upserted += response.upserted_count
+        return upserted
+
+    def delete(self, ids: List[str], batch_size: int = DELETE_BATCH_SIZE) -> None:
+        """
+        Delete vectors by id from the namespace, `batch_size` ids per request.
+        """
+        for start in range(0, len(ids), batch_size):
+            self.index.delete(ids=ids[start:start + batch_size], namespace=self.namespace)
+
+    async def adelete(self, ids: List[str], batch_size: int = DELETE_BATCH_SIZE) -> None:
+        """
+        Async variant of delete().
+        """
+        index = await self.aconnect()
+        for start in range(0, len(ids), batch_size):
+            await index.delete(ids=ids[start:start + batch_size], namespace=self.namespace)
+
+    # -----------------------------
+    # Internal helpers
+    # -----------------------------
+    def _cache_lookup(
+        self, texts: List[str], input_type: str
+    ) -> Tuple[List[str], Dict[str, List[float]], List[str]]:
+        """
+        Return the cache key of every text, the vectors already cached and the
+        distinct texts that still have to be embedded.
+        """
+        keys = self._cache_keys(texts, input_type)
+        found = self.embedding_cache.get_many(keys) if self.embedding_cache else {}
+        return keys, found, self._cache_misses(keys, texts, found)
+
+    def _cache_keys(self, texts: List[str], input_type: str) -> List[str]:
+        return [EmbeddingCache.key(self.model, input_type, text) for text in texts]
+
+    @staticmethod
+    def _cache_misses(keys: List[str], texts: List[str], found: Dict[str, List[float]]) -> List[str]:
+        misses: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                misses.setdefault(key, text)
+        return list(misses.values())
+
+    def _cache_store(
+        self, texts: List[str], input_type: str, vectors: List[List[float]], found: Dict[str, List[float]]
+    ) -> None:
+        fresh = {
+            EmbeddingCache.key(self.model, input_type, text): vector
+            for text, vector in zip(texts, vectors)
+        }
+        found.update(fresh)
+
+        if self.embedding_cache:
+            self.embedding_cache.put_many(fresh)
+
+    @staticmethod
+    def _to_documents(results) -> List[Doc]:
+        return [
+            {
+                "id": hit["id"],
+                "question": hit["metadata"].get("question", ""),
+                "answer": hit["metadata"].get("answer", ""),
+                "score": hit.get("score"),
+            }
+            for hit in results.get("matches", [])
+        ]
+
+    @staticmethod
+    def _rerank_documents(documents: list) -> list:
+        # the hosted reranker only needs the text fields, the similarity score stays behind
+        return [{key: value for key, value in doc.items() if key != "score"} for doc in documents]
+
+    @staticmethod
+    def _to_reranked(reranked) -> List[Doc]:
+        return [
             {
                 "id": hit["document"].get("id", ""),
                 "text": hit["document"].get("answer", "")
             }
             for hit in reranked.get("data", [])
         ]
-
-        return documents
\ No newline at end of file
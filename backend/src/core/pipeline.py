@@ -0,0 +1,130 @@
+from __future__ import annotations
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Tuple
+
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StageGraph:
+    """
+    Runs async pipeline stages as a dependency graph: each stage starts as soon as the
+    stages it depends on have finished and receives their results as arguments, so
+    independent stages overlap. Start/end offsets of every stage are recorded to report
+    the critical path against the sequential cost.
+    """
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._deps: Dict[str, Tuple[str, ...]] = {}
+        self.timings: Dict[str, Tuple[float, float]] = {}
+
+    def add(self, name: str, fn: Callable[..., Awaitable[Any]], *deps: str) -> asyncio.Task:
+        """
+        Schedule `fn(*results of deps)` as stage `name`. Dependencies must already be added.
+        """
+        dep_tasks = [self._tasks[dep] for dep in deps]
+
+        async def run():
+            results = [await task for task in dep_tasks]
+            start = time.perf_counter()
+            try:
+                result = await fn(*results)
+            except asyncio.CancelledError:
+                # cancelled stages did not run to completion, keep them out of the report
+                raise
+            except BaseException:
+                self.timings[name] = (start - self._started, time.perf_counter() - self._started)
+                raise
+
+            self.timings[name] = (start - self._started, time.perf_counter() - self._started)
+            return result
+
+        self._deps[name] = deps
+        self._tasks[name] = asyncio.ensure_future(run())
+        return self._tasks[name]
+
+    @contextmanager
+    def timed(self, name: str, *deps: str) -> Iterator[None]:
+        """
+        Record the body of the `with` as stage `name`, for a step that runs inline
+        instead of as a task (e.g. an answer streamed to the client).
+        """
+        self._deps[name] = deps
+        start = time.perf_counter()
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            # interrupted, like a cancelled stage it stays out of the report
+            raise
+        except BaseException:
+            self.timings[name] = (start - self._started, time.perf_counter() - self._started)
+            raise
+
+        self.timings[name] = (start - self._started, time.perf_counter() - self._started)
+
+    def discard(self, name: str) -> None:
+        """
+        Leave a stage out of the report, e.g. an answer cut off by a client disconnect.
+        """
+        self.timings.pop(name, None)
+
+    async def result(self, name: str) -> Any:
+        return await self._tasks[name]
+
+    def cancel(self, *names: str) -> None:
+        for name in names:
+            task = self._tasks.get(name)
+            if task is not None and not task.done():
+                task.cancel()
+
+    def cancel_pending(self) -> None:
+        """
+        Cancel the stages still running, e.g. once the request failed or short-circuited.
+        """
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # mark failures of stages nobody awaited as retrieved
+                task.exception()
+
+    def report(self) -> dict:
+        """
+        Per-stage durations, the critical path through the finished stages and how the
+        wall time compares with running the same stages one after another.
+        """
+        durations = {name: end - start for name, (start, end) in self.timings.items()}
+
+        # longest chain of dependent stages, walking the stages in insertion (topological) order
+        path_cost: Dict[str, float] = {}
+        path_prev: Dict[str, str] = {}
+        for name in self._deps:
+            if name not in durations:
+                continue
+            best_dep = max(
+                (dep for dep in self._deps[name] if dep in path_cost),
+                key=lambda dep: path_cost[dep],
+                default=None,
+            )
+            path_cost[name] = durations[name] + (path_cost[best_dep] if best_dep else 0.0)
+            if best_dep:
+                path_prev[name] = best_dep
+
+        critical_path: List[str] = []
+        node = max(path_cost, key=lambda n: path_cost[n], default=None)
+        while node is not None:
+            critical_path.append(node)
+            node = path_prev.get(node)
+
+        return {
+            "stages_ms": {name: round(d * 1000, 2) for name, d in durations.items()},
+            "critical_path": critical_path[::-1],
+            "critical_path_ms": round(path_cost.get(critical_path[0], 0.0) * 1000, 2) if critical_path else 0.0,
+            "sequential_ms": round(sum(durations.values()) * 1000, 2),
+            "wall_ms": round(max((end for _, end in self.timings.values()), default=0.0) * 1000, 2),
+        }
@@ -0,0 +1,172 @@
+from __future__ import annotations
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..logger import logging
+from ..utils.data_classes import Doc
+from .sparse_index import tokenize
+
+try:
+    import onnxruntime
+    from tokenizers import Tokenizer
+except ImportError:  # optional dependencies, only needed for the ONNX cross-encoder
+    onnxruntime = None
+    Tokenizer = None
+
+logger = logging.getLogger(__name__)
+
+
+def _trigrams(text: str) -> set:
+    text = " ".join(tokenize(text))
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class LocalReranker(ABC):
+    """
+    Reranks query_documents() hits in process, returning the same shape as
+    PineconeClient.arerank_results(): [{"id", "text"}] best first. Subclasses provide
+    score(); documents are scored on their `question`, the field the hosted reranker
+    ranks on.
+    """
+
+    @abstractmethod
+    def score(self, query: str, documents: Sequence[Dict]) -> np.ndarray:
+        """
+        One relevance score per document, higher is better.
+        """
+
+    def rerank(self, query: str, documents: Sequence[Dict], top_n: int = 1) -> List[Doc]:
+        if not documents:
+            return []
+        scores = self.score(query, documents)
+        # stable sort, ties keep the dense retrieval order
+        order = np.argsort(-scores, kind="stable")[:top_n]
+        return [{"id": documents[i].get("id", ""), "text": documents[i].get("answer", "")} for i in order]
+
+    async def arerank(self, query: str, documents: Sequence[Dict], top_n: int = 1) -> List[Doc]:
+        return self.rerank(query, documents, top_n)
+
+    def close(self) -> None:
+        pass
+
+
+class LexicalReranker(LocalReranker):
+    """
+    Feature scoring with no model: query token coverage and precision against the
+    question, character trigram overlap (robust to inflections and typos), a little
+    answer coverage, and a prior on the dense retrieval rank. Microseconds per call,
+    so it runs inline on the event loop.
+    """
+
+    def __init__(
+        self,
+        coverage_weight: float = 0.45,
+        precision_weight: float = 0.15,
+        trigram_weight: float = 0.25,
+        answer_weight: float = 0.05,
+        rank_weight: float = 0.10,
+    ) -> None:
+        self.coverage_weight = coverage_weight
+        self.precision_weight = precision_weight
+        self.trigram_weight = trigram_weight
+        self.answer_weight = answer_weight
+        self.rank_weight = rank_weight
+
+    def score(self, query: str, documents: Sequence[Dict]) -> np.ndarray:
+        query_tokens = set(tokenize(query))
+        query_trigrams = _trigrams(query)
+
+        scores = np.zeros(len(documents))
+        for rank, doc in enumerate(documents):
+            question_tokens = set(tokenize(doc.get("question", "")))
+            answer_tokens = set(tokenize(doc.get("answer", "")))
+            question_trigrams = _trigrams(doc.get("question", ""))
+
+            shared = len(query_tokens & question_tokens)
+            coverage = shared / len(query_tokens) if query_tokens else 0.0
+            precision = shared / len(question_tokens) if question_tokens else 0.0
+            union = len(query_trigrams | question_trigrams)
+            trigram = len(query_trigrams & question_trigrams) / union if union else 0.0
+            answer = len(query_tokens & answer_tokens) / len(query_tokens) if query_tokens else 0.0
+
+            scores[rank] = (
+                self.coverage_weight * coverage
+                + self.precision_weight * precision
+                + self.trigram_weight * trigram
+                + self.answer_weight * answer
+                + self.rank_weight / (rank + 1)
+            )
+        return scores
+
+
+class OnnxCrossEncoderReranker(LocalReranker):
+    """
+    Small cross-encoder (e.g. an ONNX export of ms-marco-MiniLM-L-6-v2) scoring every
+    (query, question) pair of a call in one batch. Inference runs in a thread pool so
+    the event loop keeps serving while the CPU works.
+
+    `model_dir` holds `model.onnx` and the Hugging Face `tokenizer.json`. Needs the
+    optional `onnxruntime` and `tokenizers` packages.
+    """
+
+    def __init__(self, model_dir: str, max_length: int = 256, threads: int = 2, workers: int = 1) -> None:
+        """
+        Args:
+            model_dir: Directory with model.onnx and tokenizer.json.
+            max_length: Tokens per (query, question) pair, longer pairs are truncated.
+            threads: Intra-op threads of one inference.
+            workers: Inferences running at the same time.
+        """
+        if onnxruntime is None or Tokenizer is None:
+            raise RuntimeError("The ONNX reranker needs `pip install onnxruntime tokenizers`")
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, "model.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reranker")
+
+    def score(self, query: str, documents: Sequence[Dict]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch([(query, doc.get("question", "")) for doc in documents])
+        feeds = {
+            "input_ids": np.asarray([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.asarray([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.asarray([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        logits = self.session.run(None, {name: value for name, value in feeds.items() if name in self.input_names})[0]
+        # one relevance logit per pair
+        return np.asarray(logits, dtype=np.float32).reshape(len(documents), -1)[:, 0]
+
+    async def arerank(self, query: str, documents: Sequence[Dict], top_n: int = 1) -> List[Doc]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.rerank, query, documents, top_n)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def make_reranker(backend: str, onnx_model_dir: Optional[str] = None, threads: int = 2) -> Optional[LocalReranker]:
+    """
+    Local reranker for RERANKER_BACKEND, None for the hosted Pinecone reranker. An ONNX
+    backend that cannot be loaded falls back to the lexical one.
+    """
+    if backend == "lexical":
+        return LexicalReranker()
+    if backend == "onnx":
+        try:
+            return OnnxCrossEncoderReranker(onnx_model_dir or "", threads=threads)
+        except Exception as e:
+            logger.warning(f"ONNX reranker unavailable ({e}), falling back to the lexical reranker.")
+            return LexicalReranker()
+    return None
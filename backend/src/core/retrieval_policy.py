@@ -0,0 +1,135 @@
+from __future__ import annotations
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..logger import logging
+from ..utils.data_classes import Doc
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+SKIP = "skip"
+RERANK = "rerank"
+WIDEN = "widen"
+PATHS = (SKIP, RERANK, WIDEN)
+
+
+class AdaptiveRetrieval:
+    """
+    Decides per query how much of the retrieval hits goes to the reranker, from the
+    dense similarity scores of query_documents():
+
+    - skip: the top hit clears `skip_score` and leads every other hit by `skip_margin`,
+      it is the answer context and the rerank round-trip is not made.
+    - widen: the top `top_k` scores lie within `flat_spread` of each other, dense
+      retrieval cannot tell them apart and all `wide_top_k` hits are reranked.
+    - rerank: everything else, the top `top_k` hits are reranked as before.
+
+    query_documents() is asked for `fetch_k` hits once, so widening costs no second
+    query. Skipped reranks are credited with the moving average of the measured rerank
+    time in `saved_seconds`.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        top_k: int = 5,
+        wide_top_k: int = 15,
+        skip_score: float = 0.9,
+        skip_margin: float = 0.1,
+        flat_spread: float = 0.02,
+    ) -> None:
+        """
+        Args:
+            enabled: Off, every query reranks its top `top_k` hits.
+            top_k: Hits reranked on the default path.
+            wide_top_k: Hits reranked when the scores are flat.
+            skip_score: Minimum similarity of the top hit to skip the rerank.
+            skip_margin: Minimum lead of the top hit over the next best one to skip.
+            flat_spread: Largest similarity spread over the top `top_k` hits that counts as flat.
+        """
+        self.enabled = enabled
+        self.top_k = top_k
+        self.wide_top_k = max(wide_top_k, top_k)
+        self.skip_score = skip_score
+        self.skip_margin = skip_margin
+        self.flat_spread = flat_spread
+
+        self.paths: Dict[str, int] = {path: 0 for path in PATHS}
+        self.saved_seconds = 0.0
+        self._rerank_seconds: Optional[float] = None
+
+    @property
+    def fetch_k(self) -> int:
+        """
+        Hits to ask query_documents() for.
+        """
+        return self.wide_top_k if self.enabled else self.top_k
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def choose(self, docs: Sequence[Doc]) -> Tuple[str, List[Doc]]:
+        """
+        The path for these hits and the candidates it reranks (for SKIP, the top hit).
+        """
+        if not self.enabled or not docs:
+            return RERANK, list(docs[:self.top_k])
+
+        top = docs[0].get("score")
+        others = [doc["score"] for doc in docs[1:] if doc.get("score") is not None]
+        # the top hit may be a sparse-only one after fusion, it has no score to trust
+        if top is not None and top >= self.skip_score and (not others or top - max(others) >= self.skip_margin):
+            return SKIP, [docs[0]]
+
+        scores = sorted((doc["score"] for doc in docs if doc.get("score") is not None), reverse=True)
+        if len(scores) >= self.top_k and len(docs) > self.top_k and scores[0] - scores[self.top_k - 1] <= self.flat_spread:
+            return WIDEN, list(docs[:self.wide_top_k])
+
+        return RERANK, list(docs[:self.top_k])
+
+    async def arerank(self, client, prompt: str, docs: Sequence[Doc]) -> List[Doc]:
+        """
+        Rerank `docs` with client.arerank_results() along the chosen path, in the
+        reranked shape [{"id", "text"}].
+        """
+        path, candidates = self.choose(docs)
+        self.paths[path] += 1
+        metrics.RETRIEVAL_PATHS.labels(path).inc()
+
+        if path == SKIP:
+            if self._rerank_seconds is not None:
+                self.saved_seconds += self._rerank_seconds
+                metrics.RERANK_SAVED_SECONDS.inc(self._rerank_seconds)
+            return [{"id": doc.get("id", ""), "text": doc.get("answer", "")} for doc in candidates]
+
+        started = time.perf_counter()
+        reranked = await client.arerank_results(query_vector=prompt, documents=candidates)
+        if path == RERANK:
+            self._observe_rerank(time.perf_counter() - started)
+        return reranked
+
+    def stats(self) -> dict:
+        total = sum(self.paths.values())
+        return {
+            "enabled": self.enabled,
+            "top_k": self.top_k,
+            "wide_top_k": self.wide_top_k,
+            "skip_score": self.skip_score,
+            "skip_margin": self.skip_margin,
+            "flat_spread": self.flat_spread,
+            "paths": dict(self.paths),
+            "path_rates": {path: count / total if total else 0.0 for path, count in self.paths.items()},
+            "rerank_ms": round(self._rerank_seconds * 1000, 3) if self._rerank_seconds is not None else None,
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+    # -----------------------------
+    # Internal helpers
+    # -----------------------------
+    def _observe_rerank(self, seconds: float) -> None:
+        # moving average of a default-path rerank, what a skip is credited with
+        if self._rerank_seconds is None:
+            self._rerank_seconds = seconds
+        else:
+            self._rerank_seconds += 0.1 * (seconds - self._rerank_seconds)
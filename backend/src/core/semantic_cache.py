@@ -0,0 +1,237 @@
+from __future__ import annotations
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, is_dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper edges of the best-similarity histogram reported in stats(), used to tune the threshold
+SIMILARITY_BUCKETS = (0.80, 0.85, 0.90, 0.93, 0.95, 0.97, 0.99, 1.0)
+
+
+def make_fingerprint(*parts) -> str:
+    """
+    Hash everything an answer depends on besides the prompt (index, namespace, embedding
+    model, PromptConfig, ...). A different fingerprint invalidates the cache.
+    """
+    payload = json.dumps(
+        [asdict(p) if is_dataclass(p) else p for p in parts], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached answer and the bookkeeping needed to evict it.
+    """
+    slot: int
+    prompt: str
+    answer: str
+    expires_at: float
+    cost_seconds: float
+    nbytes: int
+
+
+class SemanticCache:
+    """
+    In-process semantic response cache keyed by the prompt embedding.
+
+    Vectors are kept L2-normalized in a preallocated matrix so a lookup is a single
+    matrix-vector product. Entries are evicted LRU-first when `max_entries` or
+    `max_bytes` is exceeded, and lazily once their TTL has passed. The cache is
+    cleared whenever the fingerprint of the retrieval/prompt setup changes.
+
+    Not thread-safe: it is meant to be used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries: int = 2048,
+        max_bytes: int = 32 * 1024 * 1024,
+        enabled: bool = True,
+    ) -> None:
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+        self._fingerprint: Optional[str] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._free: List[int] = list(range(max_entries - 1, -1, -1))
+        self._slots: Dict[int, str] = {}
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+        self._similarity_histogram = [0] * len(SIMILARITY_BUCKETS)
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def lookup(self, vector: List[float], fingerprint: str) -> Optional[str]:
+        """
+        Return the cached answer of the closest stored prompt if its cosine similarity
+        clears the threshold, otherwise None.
+        """
+        self._check_fingerprint(fingerprint)
+
+        query = self._normalize(vector)
+        if query is None or not self._entries or query.shape[0] != self._matrix.shape[1]:
+            self.misses += 1
+            return None
+
+        now = time.monotonic()
+        while self._entries:
+            sims = self._matrix @ query
+            sims[~self._valid] = -1.0
+            slot = int(np.argmax(sims))
+            best = float(sims[slot])
+            entry = self._entries[self._slots[slot]]
+
+            if entry.expires_at > now:
+                break
+            self._evict(self._slots[slot])
+        else:
+            self.misses += 1
+            return None
+
+        self._observe_similarity(best)
+
+        if best < self.threshold:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(self._slots[slot])
+        self.hits += 1
+        self.saved_seconds += entry.cost_seconds
+        logger.info("Semantic cache hit (similarity %.4f) for prompt: %s", best, entry.prompt)
+
+        return entry.answer
+
+    def put(
+        self,
+        vector: List[float],
+        prompt: str,
+        answer: str,
+        fingerprint: str,
+        *,
+        cost_seconds: float = 0.0,
+    ) -> None:
+        """
+        Store an answer under the prompt embedding. `cost_seconds` is the pipeline time the
+        answer took to produce and is credited to `saved_seconds` on every hit.
+        """
+        self._check_fingerprint(fingerprint)
+
+        query = self._normalize(vector)
+        if query is None:
+            return
+
+        key = prompt.strip().lower()
+        if key in self._entries:
+            self._evict(key)
+
+        nbytes = query.nbytes + len(prompt.encode()) + len(answer.encode())
+        if nbytes > self.max_bytes:
+            return
+
+        while self._entries and (not self._free or self._bytes + nbytes > self.max_bytes):
+            self._evict(next(iter(self._entries)))
+
+        if self._matrix is not None and self._matrix.shape[1] != query.shape[0]:
+            self.invalidate()
+            self._matrix = None
+
+        if self._matrix is None:
+            self._matrix = np.zeros((self.max_entries, query.shape[0]), dtype=np.float32)
+
+        slot = self._free.pop()
+        self._matrix[slot] = query
+        self._valid[slot] = True
+        self._slots[slot] = key
+        self._entries[key] = CacheEntry(
+            slot=slot,
+            prompt=prompt,
+            answer=answer,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            cost_seconds=cost_seconds,
+            nbytes=nbytes,
+        )
+        self._bytes += nbytes
+
+    def invalidate(self) -> None:
+        """
+        Drop every cached answer, e.g. after the knowledge base was re-indexed.
+        """
+        for key in list(self._entries):
+            self._evict(key, count=False)
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "best_similarity_histogram": {
+                f"le_{edge}": count for edge, count in zip(SIMILARITY_BUCKETS, self._similarity_histogram)
+            },
+        }
+
+    # -----------------------------
+    # Internal helpers
+    # -----------------------------
+    def _check_fingerprint(self, fingerprint: str) -> None:
+        if fingerprint != self._fingerprint:
+            if self._entries:
+                logger.info("Semantic cache fingerprint changed, invalidating %d entries", len(self._entries))
+                self.invalidate()
+            self._fingerprint = fingerprint
+
+    def _evict(self, key: str, *, count: bool = True) -> None:
+        entry = self._entries.pop(key)
+        self._valid[entry.slot] = False
+        del self._slots[entry.slot]
+        self._free.append(entry.slot)
+        self._bytes -= entry.nbytes
+        if count:
+            self.evictions += 1
+
+    def _observe_similarity(self, similarity: float) -> None:
+        for i, edge in enumerate(SIMILARITY_BUCKETS):
+            if similarity <= edge:
+                self._similarity_histogram[i] += 1
+                return
+        self._similarity_histogram[-1] += 1
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> Optional[np.ndarray]:
+        arr = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(arr))
+        if norm == 0.0:
+            return None
+        return arr / norm
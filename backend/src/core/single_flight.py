@@ -0,0 +1,77 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller starts the work,
+    callers arriving while it is in flight await the same result (or exception).
+    Nothing is kept once the work finished, the next call with the key starts afresh.
+
+    The work runs as its own task, so a caller that goes away does not cancel it for
+    the others; it is cancelled only when every caller is gone.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._flights: Dict[Hashable, _Flight] = {}
+
+        self.started = 0
+        self.joined = 0
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Result of `fn()`, shared with concurrent callers of the same key, and whether
+        this caller joined a flight another caller started.
+        """
+        if not self.enabled:
+            return await fn(), False
+
+        flight = self._flights.get(key)
+        joined = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._land(key, flight))
+            self.started += 1
+        else:
+            self.joined += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), joined
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # forget it right away, a caller arriving before the task has wound down
+                # must start afresh instead of joining a cancelled flight
+                self._land(key, flight)
+                flight.task.cancel()
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "joined": self.joined,
+        }
+
+    # -----------------------------
+    # Internal helpers
+    # -----------------------------
+    def _land(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
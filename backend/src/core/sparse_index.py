@@ -0,0 +1,207 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..logger import logging
+from ..utils.data_classes import Doc
+from .index_version import IndexVersion
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it me my of on or "
+    "the to was what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased alphanumeric runs without stopwords, so "IBAN", error codes and
+    product names stay single tokens.
+    """
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    In-memory BM25 index over the question/answer metadata of the corpus, for exact
+    token matches dense retrieval misses. Question terms count `question_boost` times.
+
+    Postings are stored CSR style: one int64 offsets array over the vocabulary, and
+    per posting a uint32 row and a uint16 term frequency, so a posting costs 6 bytes
+    instead of the ~100 of a Python (int, int) tuple in a list.
+    """
+
+    def __init__(
+        self,
+        docs: Iterable[Dict],
+        k1: float = 1.2,
+        b: float = 0.75,
+        question_boost: int = 2,
+    ) -> None:
+        """
+        Args:
+            docs: Records with "id", "question" and "answer", e.g. snapshot metadata.
+            k1: Term frequency saturation.
+            b: Document length normalization.
+            question_boost: Weight of a question term against an answer term.
+        """
+        self.k1 = k1
+        self.b = b
+
+        self.docs: List[Doc] = []
+        vocabulary: Dict[str, int] = {}
+        rows: List[List[int]] = []
+        freqs: List[List[int]] = []
+        lengths: List[int] = []
+
+        for doc in docs:
+            row = len(self.docs)
+            self.docs.append({
+                "id": doc.get("id", ""), "question": doc.get("question", ""), "answer": doc.get("answer", "")
+            })
+
+            counts = Counter(tokenize(doc.get("answer", "")))
+            for token in tokenize(doc.get("question", "")):
+                counts[token] += question_boost
+            lengths.append(sum(counts.values()))
+
+            for token, count in counts.items():
+                term = vocabulary.setdefault(token, len(vocabulary))
+                if term == len(rows):
+                    rows.append([])
+                    freqs.append([])
+                rows[term].append(row)
+                freqs[term].append(count)
+
+        self.vocabulary = vocabulary
+        self.offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum([len(postings) for postings in rows])
+        self.rows = np.fromiter((r for postings in rows for r in postings), dtype=np.uint32, count=int(self.offsets[-1]))
+        self.freqs = np.fromiter(
+            (min(f, 65535) for postings in freqs for f in postings), dtype=np.uint16, count=int(self.offsets[-1])
+        )
+        lengths = np.asarray(lengths, dtype=np.float32)
+        avg_length = float(lengths.mean()) if len(lengths) else 0.0
+        # per document part of the BM25 denominator, fixed once the index is built
+        self.norm = (self.k1 * (1 - self.b + self.b * lengths / max(avg_length, 1e-9))).astype(np.float32)
+
+        doc_freq = np.diff(self.offsets).astype(np.float32)
+        self.idf = np.log1p((len(self.docs) - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+    @classmethod
+    def from_snapshot(cls, path: str, **kwargs) -> Optional["BM25Index"]:
+        """
+        Build from the metadata of a local index snapshot (scripts/export_local_index.py),
+        None when there is no snapshot.
+        """
+        metadata_path = os.path.join(path, "metadata.jsonl")
+        if not os.path.exists(metadata_path):
+            logger.warning(f"No index snapshot at {path}, hybrid search is disabled. Run scripts/export_local_index.py.")
+            return None
+
+        with open(metadata_path) as f:
+            index = cls((json.loads(line) for line in f if line.strip()), **kwargs)
+        logger.info(f"BM25 index built over {len(index)} documents, {index.nbytes() / 1024:.0f} KiB of postings")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + self.rows.nbytes + self.freqs.nbytes + self.norm.nbytes + self.idf.nbytes
+
+    def search(self, query: str, top_k: int = 5) -> List[Doc]:
+        """
+        Top `top_k` documents for the query text, best first, shaped like
+        PineconeClient.query_documents() hits. Documents sharing no term are left out.
+        """
+        terms = {self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary}
+        if not terms or not self.docs:
+            return []
+
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        for term in terms:
+            start, end = self.offsets[term], self.offsets[term + 1]
+            rows = self.rows[start:end]
+            tf = self.freqs[start:end].astype(np.float32)
+            scores[rows] += self.idf[term] * tf * (self.k1 + 1) / (tf + self.norm[rows])
+
+        top_k = min(top_k, int(np.count_nonzero(scores)))
+        if top_k <= 0:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [self.docs[row] for row in best]
+
+
+class BM25Reloader:
+    """
+    Keeps a client's BM25 index in step with the snapshot it was built from: once the
+    index version changes (the ingestion scripts rewrite the snapshot first), the index
+    is rebuilt in a worker thread and swapped in. Queries use the previous index until then.
+    """
+
+    def __init__(self, client, snapshot_path: str, version: IndexVersion, **kwargs) -> None:
+        """
+        Args:
+            client: PineconeClient-like object whose `sparse_index` is replaced.
+            snapshot_path: Snapshot directory, as for BM25Index.from_snapshot().
+            version: Version of the indexed content, the client's index is built from
+                the current one.
+            **kwargs: Passed on to BM25Index.
+        """
+        self.client = client
+        self.snapshot_path = snapshot_path
+        self.version = version
+        self.kwargs = kwargs
+
+        self._loaded = version.current()
+        self.reloads = 0
+
+    async def refresh(self) -> bool:
+        """
+        Rebuild the index if the version moved on, returns whether it did.
+        """
+        current = self.version.current()
+        if current == self._loaded:
+            return False
+
+        self.client.sparse_index = await asyncio.to_thread(BM25Index.from_snapshot, self.snapshot_path, **self.kwargs)
+        self._loaded = current
+        self.reloads += 1
+        return True
+
+    async def watch(self) -> None:
+        """
+        Refresh every `version.check_seconds` until cancelled.
+        """
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Failed to rebuild the BM25 index from {self.snapshot_path}: {e}")
+            await asyncio.sleep(self.version.check_seconds)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Doc]], top_k: int, k: int = 60) -> List[Doc]:
+    """
+    Merge ranked hit lists by summing 1 / (k + rank) per document id. Rank based, so
+    BM25 and cosine scores need no calibration against each other.
+    """
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Doc] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            scores[doc["id"]] = scores.get(doc["id"], 0.0) + 1.0 / (k + rank + 1)
+            docs.setdefault(doc["id"], doc)
+
+    fused = sorted(scores, key=lambda doc_id: -scores[doc_id])[:top_k]
+    return [docs[doc_id] for doc_id in fused]
@@ -1,7 +1,53 @@
-from pymongo import MongoClient
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, AsyncMongoClient, IndexModel, MongoClient
+from pymongo.errors import PyMongoError
+
 from .config import settings
+from .logger import logging
+
+logger = logging.getLogger(__name__)
 
 client = MongoClient(settings.DATABASE_URL)
 db = client["user_db"]
 user_collection = db["users"]
-chat_collection = db["chats"]
\ No newline at end of file
+chat_collection = db["chats"]
+# chat messages, one document per message keyed by (chat_id, seq)
+message_collection = db["messages"]
+
+# asyncio client used by the request handlers, so database round-trips never hold a worker thread
+async_client = AsyncMongoClient(settings.DATABASE_URL)
+async_db = async_client["user_db"]
+async_user_collection = async_db["users"]
+async_chat_collection = async_db["chats"]
+async_message_collection = async_db["messages"]
+
+# indexes backing the hot queries, created on startup, see scripts/check_query_plans.py
+INDEXES: Dict[str, List[IndexModel]] = {
+    # login, registration and token validation look users up by email
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    # chat history: filter by user, newest first
+    "chats": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_created_at"),
+    ],
+    # message pages and the LLM history window: seq ranges within a chat
+    "messages": [
+        IndexModel([("chat_id", ASCENDING), ("seq", ASCENDING)], unique=True, name="chat_id_seq_unique"),
+    ],
+}
+
+
+async def ensure_indexes() -> None:
+    """
+    Create the declared indexes. Existing indexes with the same definition are a no-op,
+    a failure (e.g. duplicate emails preventing the unique index) is logged and the app
+    keeps serving, on collection scans.
+    """
+    for name, indexes in INDEXES.items():
+        try:
+            created = await async_db[name].create_indexes(indexes)
+            logger.info(f"Ensured indexes on {name}: {created}")
+        except PyMongoError as e:
+            logger.error(f"Failed to create indexes on {name}: {e}")
@@ -0,0 +1,8 @@
+"""
+Bulk loading and incremental sync of the FAQ knowledge base into the vector index,
+see scripts/ingest.py and scripts/sync_index.py.
+"""
+from .chunking import Chunk, chunk_record, split_text
+from .manifest import Manifest, content_hash
+from .pipeline import Checkpoint, IngestionPipeline, IngestStats
+from .sources import iter_records, record_id
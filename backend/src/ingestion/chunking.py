@@ -0,0 +1,74 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+# paragraph breaks, then sentence ends, then any whitespace
+_BOUNDARIES = (re.compile(r"\n\s*\n"), re.compile(r"(?<=[.!?])\s+"), re.compile(r"\s+"))
+
+
+@dataclass
+class Chunk:
+    """
+    One vector of the knowledge base: the text that gets embedded and the metadata
+    stored next to it (question/answer, as read by PineconeClient.query_documents).
+    """
+    id: str
+    text: str
+    metadata: Dict = field(default_factory=dict)
+
+
+def split_text(text: str, max_chars: int = 1500, overlap: int = 200) -> List[str]:
+    """
+    Split text into pieces of at most `max_chars`, cutting at the strongest boundary
+    (paragraph, sentence, word) inside the window. Consecutive pieces share up to
+    `overlap` characters so an answer split mid-thought keeps its context.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    pieces = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            window = text[start:end]
+            for boundary in _BOUNDARIES:
+                cuts = [m.start() for m in boundary.finditer(window) if m.start() > max_chars // 2]
+                if cuts:
+                    end = start + cuts[-1]
+                    break
+
+        piece = text[start:end].strip()
+        if piece:
+            pieces.append(piece)
+        if end >= len(text):
+            break
+
+        # step back by the overlap, to a word start
+        next_start = max(end - overlap, start + 1)
+        space = text.find(" ", next_start, end)
+        start = space + 1 if overlap and space != -1 else end
+
+    return pieces
+
+
+def chunk_record(record: Dict, max_chars: int = 1500, overlap: int = 200) -> List[Chunk]:
+    """
+    Chunks of one FAQ record. Short answers give one chunk with the record id; long
+    ones are split, and chunk n > 0 gets the id "<id>#<n>". Every chunk keeps the full
+    question, the field the reranker ranks on.
+    """
+    question = record["question"]
+    extra = {key: value for key, value in record.items() if key not in ("id", "question", "answer")}
+    budget = max(max_chars - len(question) - 1, max_chars // 2)
+
+    chunks = []
+    for n, answer in enumerate(split_text(record["answer"], budget, overlap)):
+        chunks.append(Chunk(
+            id=record["id"] if n == 0 else f"{record['id']}#{n}",
+            text=f"{question}\n{answer}",
+            metadata={**extra, "question": question, "answer": answer, "source_id": record["id"], "chunk": n},
+        ))
+    return chunks
@@ -0,0 +1,105 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Iterable, List
+
+from .chunking import Chunk
+
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+
+def content_hash(chunk: Chunk) -> str:
+    """
+    Hash of everything that ends up in the index for a chunk: the embedded text and
+    the stored metadata.
+    """
+    payload = chunk.text + "\x1f" + json.dumps(chunk.metadata, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Manifest:
+    """
+    What the index holds for one (index, namespace): chunk id -> content hash ->
+    embedding model, in a SQLite file. A sync compares a corpus against it to embed
+    only new or changed chunks and to find the chunks that were removed.
+
+    Entries are written only after their vectors were upserted, so an interrupted sync
+    leaves the remaining chunks marked as changed and the next run picks them up.
+    """
+
+    def __init__(self, path: str, index_name: str, namespace: str, model: str) -> None:
+        self.path = path
+        self.index_name = index_name
+        self.namespace = namespace
+        self.model = model
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " index_name TEXT NOT NULL, namespace TEXT NOT NULL, id TEXT NOT NULL,"
+            " hash TEXT NOT NULL, model TEXT NOT NULL, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (index_name, namespace, id)) WITHOUT ROWID"
+        )
+        # ids of the corpus being synced, kept on disk rather than in a Python set
+        self._db.execute("CREATE TEMP TABLE seen (id TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def status(self, chunk: Chunk) -> str:
+        """
+        NEW, CHANGED (content or embedding model differs) or UNCHANGED. Also marks the
+        chunk as part of the corpus, see removed().
+        """
+        self._db.execute("INSERT OR IGNORE INTO seen (id) VALUES (?)", (chunk.id,))
+        row = self._db.execute(
+            "SELECT hash, model FROM chunks WHERE index_name = ? AND namespace = ? AND id = ?",
+            (self.index_name, self.namespace, chunk.id),
+        ).fetchone()
+        if row is None:
+            return NEW
+        return UNCHANGED if row == (content_hash(chunk), self.model) else CHANGED
+
+    def record(self, chunks: Iterable[Chunk]) -> None:
+        """
+        Remember chunks whose vectors are now in the index.
+        """
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO chunks (index_name, namespace, id, hash, model, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(self.index_name, self.namespace, chunk.id, content_hash(chunk), self.model, now) for chunk in chunks],
+            )
+
+    def removed(self) -> List[str]:
+        """
+        Ids in the manifest that the corpus passed to status() no longer has.
+        """
+        rows = self._db.execute(
+            "SELECT id FROM chunks WHERE index_name = ? AND namespace = ? AND id NOT IN (SELECT id FROM seen)",
+            (self.index_name, self.namespace),
+        ).fetchall()
+        return [chunk_id for (chunk_id,) in rows]
+
+    def forget(self, ids: List[str]) -> None:
+        with self._db:
+            self._db.executemany(
+                "DELETE FROM chunks WHERE index_name = ? AND namespace = ? AND id = ?",
+                [(self.index_name, self.namespace, chunk_id) for chunk_id in ids],
+            )
+
+    def __len__(self) -> int:
+        return self._db.execute(
+            "SELECT COUNT(*) FROM chunks WHERE index_name = ? AND namespace = ?", (self.index_name, self.namespace)
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
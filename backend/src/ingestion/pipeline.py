@@ -0,0 +1,281 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..logger import logging
+from .chunking import Chunk, chunk_record
+from .manifest import NEW, UNCHANGED, Manifest
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestStats:
+    records: int = 0
+    # chunks sent to the index
+    chunks: int = 0
+    upserted: int = 0
+    batches: int = 0
+    retries: int = 0
+    # with a manifest: chunks not in it, different from it, identical to it, and
+    # manifest entries deleted from the index because the corpus no longer has them
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    # first source position not fully upserted yet, where a resumed run starts
+    resume_from: int = 0
+    elapsed_seconds: float = 0.0
+
+
+@dataclass
+class _Batch:
+    seq: int
+    chunks: List[Chunk] = field(default_factory=list)
+    # every record before this source position is complete once this batch and the
+    # ones before it are upserted
+    safe_position: int = 0
+
+
+class Checkpoint:
+    """
+    Progress of an ingestion run in a small JSON file, rewritten atomically after
+    every batch so a crash never leaves it half written. `key` identifies the run
+    (source file, index, namespace, model); a checkpoint of another run is refused.
+    """
+
+    def __init__(self, path: str, key: Dict) -> None:
+        self.path = path
+        self.key = key
+
+    def load(self) -> int:
+        """
+        Source position to resume from, 0 without a checkpoint.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path) as f:
+            state = json.load(f)
+        if state.get("key") != self.key:
+            raise ValueError(
+                f"Checkpoint {self.path} belongs to another run ({state.get('key')}), "
+                "remove it or pass another checkpoint path"
+            )
+        return state["position"]
+
+    def save(self, position: int, stats: IngestStats) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"key": self.key, "position": position, "stats": asdict(stats), "updated_at": time.time()}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class IngestionPipeline:
+    """
+    Streams FAQ records into the vector index: records are chunked, grouped into
+    batches of `client.EMBED_BATCH_SIZE` chunks, embedded with input_type="document"
+    and upserted by `concurrency` workers. The batch queue holds at most `concurrency`
+    batches, so reading stops while the workers are busy and memory stays bounded
+    whatever the corpus size.
+
+    Batches complete out of order; the checkpoint only advances over the contiguous
+    prefix of finished batches, so resuming never skips a record. Records after the
+    checkpoint that were already upserted are upserted again, which is idempotent.
+
+    With a manifest every upserted chunk is recorded in it, and sync() re-indexes
+    incrementally: only new or changed chunks are embedded and upserted, chunks the
+    corpus no longer has are deleted.
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        concurrency: int = 4,
+        max_chars: int = 1500,
+        overlap: int = 200,
+        retries: int = 5,
+        checkpoint: Optional[Checkpoint] = None,
+        manifest: Optional[Manifest] = None,
+    ) -> None:
+        """
+        Args:
+            client: PineconeClient-like object exposing aembed_texts() and aupsert().
+            concurrency: Batches embedded and upserted at the same time.
+            max_chars: Longest chunk text, see chunking.split_text().
+            overlap: Characters shared by consecutive chunks of one answer.
+            retries: Attempts per batch before the run fails, with exponential backoff.
+            checkpoint: Where progress is recorded; None disables resume.
+            manifest: What the index holds, needed by sync() and diff().
+        """
+        self.client = client
+        self.batch_size = client.EMBED_BATCH_SIZE
+        self.concurrency = concurrency
+        self.max_chars = max_chars
+        self.overlap = overlap
+        self.retries = retries
+        self.checkpoint = checkpoint
+        self.manifest = manifest
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def resume_position(self) -> int:
+        return self.checkpoint.load() if self.checkpoint else 0
+
+    async def run(
+        self, records: Iterable[Tuple[int, Dict]], start: int = 0, skip_unchanged: bool = False
+    ) -> IngestStats:
+        """
+        Ingest (position, record) pairs as yielded by sources.iter_records(path, start).
+        `skip_unchanged` leaves out the chunks the manifest already has. Raises the error
+        of a batch that still fails after all retries.
+        """
+        stats = IngestStats(resume_from=start)
+        started = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        done: Dict[int, int] = {}
+        next_seq = 0
+
+        def complete(batch: _Batch, upserted: int) -> None:
+            nonlocal next_seq
+            stats.upserted += upserted
+            stats.batches += 1
+            done[batch.seq] = batch.safe_position
+            while next_seq in done:
+                stats.resume_from = max(stats.resume_from, done.pop(next_seq))
+                next_seq += 1
+            stats.elapsed_seconds = round(time.perf_counter() - started, 3)
+            if self.checkpoint:
+                self.checkpoint.save(stats.resume_from, stats)
+
+        async def worker() -> None:
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+                upserted = await self._ingest_batch(batch, stats)
+                if self.manifest is not None:
+                    self.manifest.record(batch.chunks)
+                complete(batch, upserted)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+
+        async def put(item: Optional[_Batch]) -> None:
+            # wait for room in the queue, or for a failed worker to end the run
+            pending = asyncio.ensure_future(queue.put(item))
+            while not pending.done():
+                await asyncio.wait(
+                    [pending, *(task for task in workers if not task.done())], return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in workers:
+                    if task.done() and task.exception() is not None:
+                        pending.cancel()
+                        raise task.exception()
+
+        try:
+            for batch in self._batches(records, start, stats, skip_unchanged):
+                await put(batch)
+            for _ in workers:
+                await put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            stats.elapsed_seconds = round(time.perf_counter() - started, 3)
+
+        logger.info(f"Ingestion finished: {stats}")
+        return stats
+
+    async def sync(self, records: Iterable[Tuple[int, Dict]], delete_removed: bool = True) -> IngestStats:
+        """
+        Bring the index in line with the whole corpus in `records`: embed and upsert new
+        and changed chunks, then delete the chunks in the manifest the corpus no longer
+        has. Deletion only happens once every chunk was upserted.
+        """
+        if self.manifest is None:
+            raise ValueError("sync() needs a manifest")
+
+        stats = await self.run(records, skip_unchanged=True)
+        if delete_removed:
+            stats.deleted = await self._delete(self.manifest.removed())
+        return stats
+
+    def diff(self, records: Iterable[Tuple[int, Dict]]) -> IngestStats:
+        """
+        What sync() would do, without embedding, upserting or deleting anything.
+        """
+        if self.manifest is None:
+            raise ValueError("diff() needs a manifest")
+
+        stats = IngestStats()
+        for _ in self._batches(records, 0, stats, skip_unchanged=True):
+            pass
+        stats.deleted = len(self.manifest.removed())
+        return stats
+
+    # -----------------------------
+    # Internal helpers
+    # -----------------------------
+    def _batches(self, records: Iterable[Tuple[int, Dict]], start: int, stats: IngestStats, skip_unchanged: bool):
+        batch = _Batch(seq=0, safe_position=start)
+        for position, record in records:
+            stats.records += 1
+            for chunk in chunk_record(record, self.max_chars, self.overlap):
+                if skip_unchanged:
+                    status = self.manifest.status(chunk)
+                    if status == UNCHANGED:
+                        stats.unchanged += 1
+                        continue
+                    if status == NEW:
+                        stats.new += 1
+                    else:
+                        stats.changed += 1
+                # a full batch is only handed out once the next chunk shows up, so the
+                # record that filled it is marked complete first
+                if len(batch.chunks) == self.batch_size:
+                    yield batch
+                    batch = _Batch(seq=batch.seq + 1, safe_position=batch.safe_position)
+                stats.chunks += 1
+                batch.chunks.append(chunk)
+            batch.safe_position = position + 1
+
+        if batch.chunks:
+            yield batch
+
+    async def _ingest_batch(self, batch: _Batch, stats: IngestStats) -> int:
+        for attempt in range(1, self.retries + 1):
+            try:
+                vectors = await self.client.aembed_texts([chunk.text for chunk in batch.chunks], input_type="document")
+                return await self.client.aupsert([
+                    {"id": chunk.id, "values": vector, "metadata": chunk.metadata}
+                    for chunk, vector in zip(batch.chunks, vectors)
+                ])
+            except Exception as e:
+                if attempt == self.retries:
+                    logger.error(f"Batch {batch.seq} failed after {attempt} attempts: {e}")
+                    raise
+                stats.retries += 1
+                wait_seconds = min(2 ** (attempt - 1), 30)
+                logger.warning(f"[Attempt {attempt}] Batch {batch.seq} failed, retrying in {wait_seconds}s: {e}")
+                await asyncio.sleep(wait_seconds)
+        return 0
+
+    async def _delete(self, ids: List[str]) -> int:
+        step = self.client.DELETE_BATCH_SIZE
+        for start in range(0, len(ids), step):
+            batch = ids[start:start + step]
+            await self.client.adelete(batch)
+            self.manifest.forget(batch)
+        if ids:
+            logger.info(f"Deleted {len(ids)} removed chunks from the index")
+        return len(ids)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import csv
+import hashlib
+import json
+import os
+from typing import Dict, Iterator, Optional, Tuple
+
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+CSV_EXTENSIONS = (".csv", ".tsv")
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+
+
+def record_id(question: str) -> str:
+    """
+    Stable id for a record without one, derived from its question so re-runs of the
+    same corpus address the same vectors.
+    """
+    digest = hashlib.sha1(" ".join(question.lower().split()).encode("utf-8")).hexdigest()
+    return f"faq-{digest[:16]}"
+
+
+def iter_records(path: str, start: int = 0, fmt: Optional[str] = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    Stream FAQ records from a CSV/TSV (header row) or JSONL file, one at a time, as
+    (position, {"id", "question", "answer", **other scalar fields}). The position is the
+    row number in the file, so `start` (rows to skip) is a stable resume point. Rows
+    without a question or answer are skipped with a warning.
+    """
+    fmt = fmt or _detect_format(path)
+    rows = _iter_csv(path) if fmt == "csv" else _iter_jsonl(path, start)
+
+    for position, row in enumerate(rows):
+        if position < start or not row:
+            continue
+
+        question = str(row.get("question") or "").strip()
+        answer = str(row.get("answer") or "").strip()
+        if not question or not answer:
+            logger.warning(f"Skipping row {position} of {path}: missing question or answer")
+            continue
+
+        record = {
+            key: value for key, value in row.items()
+            if key and value not in (None, "") and isinstance(value, (str, int, float, bool))
+        }
+        record.update(
+            id=str(row.get("id") or "").strip() or record_id(question),
+            question=question,
+            answer=answer,
+        )
+        yield position, record
+
+
+def _detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in CSV_EXTENSIONS:
+        return "csv"
+    if ext in JSONL_EXTENSIONS:
+        return "jsonl"
+    raise ValueError(f"Unsupported corpus format {ext!r}, expected one of {CSV_EXTENSIONS + JSONL_EXTENSIONS}")
+
+
+def _iter_csv(path: str) -> Iterator[Dict]:
+    with open(path, newline="", encoding="utf-8") as f:
+        dialect = csv.excel_tab if path.lower().endswith(".tsv") else csv.excel
+        yield from csv.DictReader(f, dialect=dialect)
+
+
+def _iter_jsonl(path: str, start: int = 0) -> Iterator[Dict]:
+    with open(path, encoding="utf-8") as f:
+        for position, line in enumerate(f):
+            # lines before the resume point are counted, not parsed
+            line = line.strip()
+            yield json.loads(line) if line and position >= start else {}
@@ -6,6 +6,8 @@ from datetime import datetime
 class MessageModel(BaseModel):
     text: str
     role: str
+    # position of the message in its chat, used as pagination cursor
+    seq: Optional[int] = None
     
 
 class ChatModel(BaseModel):
@@ -20,6 +22,12 @@ class ChatModel(BaseModel):
     user_id: PyObjectId = Field(...)
     title: str = Field(...)
     messages: list[MessageModel] = Field(...)
+    # rolling summary of the first `summarized_count` messages, see core/history.py
+    summary: Optional[str] = Field(default=None)
+    summarized_count: int = Field(default=0)
+    message_count: int = Field(default=0)
+    # pass as `before` to GET /chats/{chat_id}/messages for older messages, None when all are loaded
+    next_cursor: Optional[int] = Field(default=None)
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
 
     model_config = ConfigDict(
@@ -33,4 +41,31 @@ class ChatModel(BaseModel):
                 "created_at": "2025-11-06T20:09:19.050+00:00",
             }
         },
-    )
\ No newline at end of file
+    )
+
+
+class ChatSummaryModel(BaseModel):
+    """
+    Chat metadata without its messages, for the chat history list.
+    """
+
+    id: Optional[PyObjectId] = Field(alias="_id", default=None)
+    user_id: PyObjectId = Field(...)
+    title: str = Field(...)
+    message_count: int = Field(default=0)
+    created_at: Optional[datetime] = Field(default=None)
+    updated_at: Optional[datetime] = Field(default=None)
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True,
+    )
+
+
+class MessagePageModel(BaseModel):
+    """
+    A page of chat messages in chronological order.
+    """
+
+    messages: list[MessageModel] = Field(...)
+    next_cursor: Optional[int] = Field(default=None)
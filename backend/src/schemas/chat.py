@@ -1,7 +1,10 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class ChatReq(BaseModel):
     prompt: str
     user_id: Optional[str] = None
-    chat_id: Optional[str] = None
\ No newline at end of file
+    chat_id: Optional[str] = None
+
+class BatchChatReq(BaseModel):
+    prompts: List[str]
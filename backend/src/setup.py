@@ -1,3 +1,6 @@
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
 from typing import Any
 
 import fastapi
@@ -5,24 +8,95 @@ from fastapi import APIRouter, Depends, FastAPI
 from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from .models import *  # noqa: F403
 from .config import (
+    CryptSettings,
     DatabaseSettings,
     OpenAISettings,
     EnvironmentOption,
     EnvironmentSettings,
+    MetricsSettings,
     PineconeSettings,
     OllamaSettings
 )
+from .core.clients import chat_bot, embedding_cache, pinecone_client, sparse_reloader
+from .core.local_index_client import LocalIndexClient
+from .database import async_client, ensure_indexes
+from .logger import logging
+from .utils.jwt_handler import password_pool
+
+logger = logging.getLogger(__name__)
+
+
+# -------------- lifespan --------------
+def lifespan_factory(
+    settings: (
+        DatabaseSettings
+        | CryptSettings
+        | OpenAISettings
+        | EnvironmentSettings
+        | MetricsSettings
+        | PineconeSettings
+        | OllamaSettings
+    ),
+) -> Callable[[FastAPI], _AsyncGeneratorContextManager[Any]]:
+    """Factory to create a lifespan async context manager for a FastAPI app."""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncGenerator:
+        if isinstance(settings, DatabaseSettings):
+            await ensure_indexes()
+
+        if isinstance(settings, CryptSettings):
+            await password_pool.start()
+
+        if isinstance(settings, PineconeSettings) and not isinstance(pinecone_client, LocalIndexClient):
+            # resolve the index host now, not on the first chat request
+            try:
+                await pinecone_client.aconnect()
+            except Exception as e:
+                logger.warning(f"Could not resolve the Pinecone index host on startup ({e}), retrying on first use")
+
+        # in the background, the app serves while the model loads
+        keep_warm = None
+        if isinstance(settings, OllamaSettings) and settings.OLLAMA_WARMUP_ENABLED:
+            keep_warm = asyncio.create_task(chat_bot.keep_warm(settings.OLLAMA_KEEP_WARM_SECONDS))
+
+        reload_sparse = None
+        if isinstance(settings, PineconeSettings) and sparse_reloader is not None:
+            reload_sparse = asyncio.create_task(sparse_reloader.watch())
+
+        yield
+
+        for task in (keep_warm, reload_sparse):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        if isinstance(settings, CryptSettings):
+            password_pool.shutdown()
+
+        if isinstance(settings, PineconeSettings):
+            await pinecone_client.aclose()
+            embedding_cache.close()
+
+        if isinstance(settings, DatabaseSettings):
+            await async_client.close()
+
+    return lifespan
+
 
 # -------------- application --------------
 def create_application(
     router: APIRouter,
     settings: (
         DatabaseSettings
+        | CryptSettings
         | OpenAISettings
         | EnvironmentSettings
+        | MetricsSettings
         | PineconeSettings
         | OllamaSettings
     ),
@@ -43,7 +117,13 @@ def create_application(
         It determines the configuration applied:
 
         - AppSettings: Configures basic app metadata like name, description, contact, and license info.
-        - DatabaseSettings: Adds event handlers for initializing database tables during startup.
+        - DatabaseSettings: Creates the MongoDB indexes declared in database.py during startup
+          and closes the asyncio MongoDB client on shutdown.
+        - CryptSettings: Starts the password hashing process pool on startup and stops it on shutdown.
+        - PineconeSettings: Closes the asyncio Pinecone sessions and the embedding cache on shutdown.
+        - OllamaSettings: Loads the model and prefills the system prompt on startup and keeps
+          it warm with pings while idle (`OLLAMA_WARMUP_ENABLED`, `OLLAMA_KEEP_WARM_SECONDS`).
+        - MetricsSettings: Serves the Prometheus metrics of the chat pipeline on `METRICS_PATH`.
         - EnvironmentSettings: Conditionally sets documentation URLs and integrates custom routes for API documentation
           based on the environment type.
 
@@ -65,7 +145,9 @@ def create_application(
         kwargs.update({"docs_url": None, "redoc_url": None, "openapi_url": None})
 
 
-    application = FastAPI(**kwargs)
+    lifespan = lifespan_factory(settings)
+
+    application = FastAPI(lifespan=lifespan, **kwargs)
     application.include_router(router)
 
     # Define the origins that are allowed to access the API
@@ -84,6 +166,15 @@ def create_application(
         allow_headers=["*"],    # or restrict to ["Authorization", "Content-Type", ...]
     )
 
+    if isinstance(settings, MetricsSettings) and settings.METRICS_ENABLED:
+        metrics_router = APIRouter()
+
+        @metrics_router.get(settings.METRICS_PATH, include_in_schema=False)
+        async def metrics() -> fastapi.responses.Response:
+            return fastapi.responses.Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+        application.include_router(metrics_router)
+
     if isinstance(settings, EnvironmentSettings):
         if settings.ENVIRONMENT != EnvironmentOption.PRODUCTION:
             docs_router = APIRouter()
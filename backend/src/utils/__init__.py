@@ -1,11 +1,19 @@
 import re
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
+from ..config import settings
+from ..utils.auth_cache import TokenCache, UserCache
 from ..utils.jwt_handler import decode_access_token
-from ..database import user_collection
+from ..database import async_user_collection
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+token_cache = TokenCache(max_entries=settings.AUTH_TOKEN_CACHE_SIZE)
+user_cache = UserCache(
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_USER_CACHE_SIZE,
+)
+
 def snake_to_camel(snake_str):
     parts = snake_str.split('_')
     return parts[0] + ''.join(word.capitalize() for word in parts[1:])
@@ -21,15 +29,26 @@ def agent_log_camel_to_snake(agent_log: dict) -> dict:
     return {camel_to_snake(k): v for k, v in agent_log.items()}
 
 
-# Dependency to get current user
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    payload = decode_access_token(token)
+# Dependency to get the verified token payload
+async def get_token_payload(token: str = Depends(oauth2_scheme)):
+    payload = token_cache.get(token)
     if payload is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-
-    user = user_collection.find_one({"email": payload.get("email")})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+        payload = decode_access_token(token)
+        if payload is None:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        token_cache.put(token, payload)
+
+    return payload
+
+
+# Dependency to get current user, served from user_cache for repeated requests
+async def get_current_user(payload: dict = Depends(get_token_payload)):
+    email = payload.get("email")
+    user = user_cache.get(email)
+    if user is None:
+        user = await async_user_collection.find_one({"email": email}, projection={"password": 0})
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        user_cache.put(email, user)
     
-    return user
\ No newline at end of file
+    return user
@@ -0,0 +1,86 @@
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified JWT payloads, so a token's signature is checked once and
+    not on every request. An entry expires at the token's own `exp` claim, tokens
+    without one are never cached.
+    """
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Dict]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        payload, expires_at = entry
+        if time.time() >= expires_at:
+            del self._entries[token]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: Dict) -> None:
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+
+        self._entries[token] = (payload, float(expires_at))
+        self._entries.move_to_end(token)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class UserCache:
+    """
+    Short-TTL cache of the user documents behind verified tokens, keyed by email.
+    Only existing users are cached, so a fresh registration is visible at once. The
+    API never changes or deletes a user, the TTL is the only invalidation: a user
+    edited in MongoDB directly is served stale for up to `ttl_seconds`.
+    """
+
+    def __init__(self, ttl_seconds: int = 60, max_entries: int = 10000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, email: str) -> Optional[Dict]:
+        entry = self._entries.get(email)
+        if entry is None or time.monotonic() >= entry[1]:
+            self._entries.pop(email, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(email)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, email: str, user: Dict) -> None:
+        if self.ttl_seconds <= 0:
+            return
+
+        self._entries[email] = (user, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(email)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import asyncio
+import math
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException, status
+
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _timed(fn: Callable[..., Any], *args) -> Tuple[float, float, Any]:
+    # wall clock, the only clock comparable across processes
+    started = time.time()
+    result = fn(*args)
+    return started, time.time(), result
+
+
+def _noop() -> None:
+    return None
+
+
+class PasswordHashPool:
+    """
+    Runs bcrypt hashing and verification in a dedicated process pool, so a burst of
+    logins burns CPU in other processes instead of holding the GIL of the worker that
+    serves chat traffic.
+
+    Admission control: at most `max_workers + max_queue` calls are in flight; past
+    that callers get a 429 with a Retry-After estimated from the recent service time,
+    and a 503 if the pool itself broke. Time spent waiting for a free process is
+    recorded for stats().
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 64, window: int = 1000) -> None:
+        """
+        Args:
+            max_workers: Processes in the pool.
+            max_queue: Calls allowed to wait for a free process before rejecting.
+            window: Number of recent calls the wait and service time stats cover.
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight = 0
+        self._waits: Deque[float] = deque(maxlen=window)
+        self._services: Deque[float] = deque(maxlen=window)
+
+        self.completed = 0
+        self.rejected = 0
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run `fn(*args)` in the pool. `fn` must be importable from a fresh process.
+        """
+        if self._inflight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent sign-ins, retry shortly",
+                headers={"Retry-After": str(self.retry_after())},
+            )
+
+        self._inflight += 1
+        submitted = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            started, finished, result = await loop.run_in_executor(self.executor, _timed, fn, *args)
+        except BrokenProcessPool:
+            # a worker died (e.g. OOM killed), start over with a fresh pool on the next call
+            logger.error("Password hashing pool is broken, restarting it")
+            self.shutdown()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Sign-in temporarily unavailable",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            self._inflight -= 1
+
+        self._waits.append(max(started - submitted, 0.0))
+        self._services.append(finished - started)
+        self.completed += 1
+        return result
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the parent runs event loop and driver threads that must not be forked
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def start(self) -> None:
+        """
+        Spawn every process up front, so the first logins do not pay the start-up cost.
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _noop) for _ in range(self.max_workers)
+        ))
+
+    def retry_after(self) -> int:
+        """
+        Seconds until the current backlog should have drained.
+        """
+        service = float(np.mean(self._services)) if self._services else 0.3
+        return max(1, math.ceil(self._inflight * service / self.max_workers))
+
+    def stats(self) -> dict:
+        waits = np.asarray(self._waits) * 1000
+        services = np.asarray(self._services) * 1000
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "inflight": self._inflight,
+            "queued": max(self._inflight - self.max_workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_p50_ms": round(float(np.percentile(waits, 50)), 2) if len(waits) else 0.0,
+            "wait_p95_ms": round(float(np.percentile(waits, 95)), 2) if len(waits) else 0.0,
+            "service_p50_ms": round(float(np.percentile(services, 50)), 2) if len(services) else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
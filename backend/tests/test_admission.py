@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.core.admission import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_BATCH,
+    PRIORITY_GUEST,
+    PRIORITY_USER,
+    LLMAdmission,
+)
+
+
+async def _hold(admission, priority, release):
+    async with admission.slot(priority):
+        await release.wait()
+
+
+async def _enter(admission, priority, entered):
+    async with admission.slot(priority):
+        entered.append(priority)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _assert_shed(error):
+    assert error.status_code == 429
+    assert int(error.headers["Retry-After"]) >= 1
+
+
+def test_waiters_are_admitted_by_priority_then_arrival():
+    async def scenario():
+        admission = LLMAdmission(max_concurrency=1, max_wait_seconds=60)
+        release = asyncio.Event()
+        entered = []
+
+        holder = asyncio.ensure_future(_hold(admission, PRIORITY_USER, release))
+        await _settle()
+        arrivals = [PRIORITY_BATCH, PRIORITY_BACKGROUND, PRIORITY_GUEST, PRIORITY_USER, PRIORITY_GUEST]
+        waiters = [asyncio.ensure_future(_enter(admission, p, entered)) for p in arrivals]
+        await _settle()
+        assert admission.stats()["queued"] == {"user": 1, "guest": 2, "background": 1, "batch": 1}
+
+        release.set()
+        await asyncio.gather(holder, *waiters)
+
+        assert entered == [PRIORITY_USER, PRIORITY_GUEST, PRIORITY_GUEST, PRIORITY_BACKGROUND, PRIORITY_BATCH]
+        assert admission.admitted == 6
+        assert admission.rejected == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_sheds_a_guest_with_retry_after():
+    async def scenario():
+        admission = LLMAdmission(max_concurrency=1, max_queue=1, max_wait_seconds=60)
+        release = asyncio.Event()
+
+        holder = asyncio.ensure_future(_hold(admission, PRIORITY_USER, release))
+        await _settle()
+        queued = asyncio.ensure_future(_hold(admission, PRIORITY_GUEST, release))
+        await _settle()
+
+        with pytest.raises(HTTPException) as shed:
+            admission.check(PRIORITY_GUEST)
+        _assert_shed(shed.value)
+        with pytest.raises(HTTPException) as shed:
+            async with admission.slot(PRIORITY_GUEST):
+                pass
+        _assert_shed(shed.value)
+        assert admission.rejected == 2
+
+        release.set()
+        await asyncio.gather(holder, queued)
+
+    asyncio.run(scenario())
+
+
+def test_user_evicts_the_latest_guest_from_a_full_queue():
+    async def scenario():
+        admission = LLMAdmission(max_concurrency=1, max_queue=2, max_wait_seconds=60)
+        release = asyncio.Event()
+        entered = []
+
+        holder = asyncio.ensure_future(_hold(admission, PRIORITY_USER, release))
+        await _settle()
+        early_guest = asyncio.ensure_future(_enter(admission, PRIORITY_GUEST, entered))
+        late_guest = asyncio.ensure_future(_enter(admission, PRIORITY_GUEST, entered))
+        await _settle()
+        # a user is never turned away while a guest could make room
+        admission.check(PRIORITY_USER)
+        user = asyncio.ensure_future(_enter(admission, PRIORITY_USER, entered))
+        await _settle()
+
+        assert late_guest.done()
+        _assert_shed(late_guest.exception())
+        assert admission.stats()["queued"]["guest"] == 1
+
+        release.set()
+        await asyncio.gather(holder, early_guest, user)
+        assert entered == [PRIORITY_USER, PRIORITY_GUEST]
+
+    asyncio.run(scenario())
+
+
+def test_expected_wait_over_the_deadline_is_shed_up_front():
+    async def scenario():
+        admission = LLMAdmission(max_concurrency=1, max_wait_seconds=0.05)
+        # one call long enough to put the service time estimate over the deadline
+        async with admission.slot(PRIORITY_USER):
+            await asyncio.sleep(0.1)
+
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(_hold(admission, PRIORITY_USER, release))
+        await _settle()
+
+        with pytest.raises(HTTPException) as shed:
+            admission.check(PRIORITY_GUEST)
+        _assert_shed(shed.value)
+        admission.check(PRIORITY_BACKGROUND)
+
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+
+
+def test_chat_waiting_past_the_deadline_times_out_but_background_keeps_waiting():
+    async def scenario():
+        admission = LLMAdmission(max_concurrency=1, max_queue=1, max_wait_seconds=0.05)
+        release = asyncio.Event()
+        entered = []
+
+        holder = asyncio.ensure_future(_hold(admission, PRIORITY_USER, release))
+        await _settle()
+        background = asyncio.ensure_future(_enter(admission, PRIORITY_BACKGROUND, entered))
+        batch = asyncio.ensure_future(_enter(admission, PRIORITY_BATCH, entered))
+
+        with pytest.raises(HTTPException) as shed:
+            async with admission.slot(PRIORITY_GUEST):
+                pass
+        _assert_shed(shed.value)
+
+        await asyncio.sleep(0.1)
+        assert not background.done() and not batch.done()
+        assert admission.stats()["queued"]["guest"] == 0
+
+        release.set()
+        await asyncio.gather(holder, background, batch)
+        assert entered == [PRIORITY_BACKGROUND, PRIORITY_BATCH]
+        assert admission.rejected == 1
+
+    asyncio.run(scenario())
+
+
+def test_disabled_admission_never_queues():
+    async def scenario():
+        admission = LLMAdmission(max_concurrency=1, max_queue=0, enabled=False)
+        entered = []
+        await asyncio.gather(*(_enter(admission, PRIORITY_GUEST, entered) for _ in range(3)))
+        admission.check(PRIORITY_GUEST)
+        assert entered == [PRIORITY_GUEST] * 3
+        assert admission.stats()["active"] == 0
+
+    asyncio.run(scenario())
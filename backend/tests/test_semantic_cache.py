@@ -0,0 +1,100 @@
+import pytest
+
+from src.core import semantic_cache
+from src.core.semantic_cache import SemanticCache, make_fingerprint
+
+FINGERPRINT = make_fingerprint("index", "namespace", "model")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_close_prompt_hits_and_distant_prompt_misses():
+    cache = SemanticCache(threshold=0.95)
+    cache.put([1.0, 0.0, 0.0], "What is RAG?", "answer", FINGERPRINT, cost_seconds=2.0)
+
+    assert cache.lookup([0.99, 0.05, 0.0], FINGERPRINT) == "answer"
+    assert cache.lookup([0.0, 1.0, 0.0], FINGERPRINT) is None
+    assert cache.lookup([0.0, 0.0, 0.0], FINGERPRINT) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["saved_seconds"] == 2.0
+
+
+def test_entry_expires_after_its_ttl(clock):
+    cache = SemanticCache(ttl_seconds=60)
+    cache.put([1.0, 0.0], "prompt", "answer", FINGERPRINT)
+
+    clock[0] += 59
+    assert cache.lookup([1.0, 0.0], FINGERPRINT) == "answer"
+    clock[0] += 2
+    assert cache.lookup([1.0, 0.0], FINGERPRINT) is None
+    assert cache.stats()["entries"] == 0
+    assert cache.evictions == 1
+
+
+def test_expired_best_match_falls_back_to_the_next_one(clock):
+    cache = SemanticCache(threshold=0.9, ttl_seconds=60)
+    cache.put([1.0, 0.0], "old", "old answer", FINGERPRINT)
+    clock[0] += 30
+    cache.put([0.95, 0.3], "new", "new answer", FINGERPRINT)
+    clock[0] += 31
+
+    assert cache.lookup([1.0, 0.0], FINGERPRINT) == "new answer"
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = SemanticCache(max_entries=2)
+    cache.put([1.0, 0.0, 0.0], "a", "A", FINGERPRINT)
+    cache.put([0.0, 1.0, 0.0], "b", "B", FINGERPRINT)
+    # touching "a" leaves "b" as the least recently used
+    assert cache.lookup([1.0, 0.0, 0.0], FINGERPRINT) == "A"
+    cache.put([0.0, 0.0, 1.0], "c", "C", FINGERPRINT)
+
+    assert cache.lookup([0.0, 1.0, 0.0], FINGERPRINT) is None
+    assert cache.lookup([1.0, 0.0, 0.0], FINGERPRINT) == "A"
+    assert cache.lookup([0.0, 0.0, 1.0], FINGERPRINT) == "C"
+    assert cache.stats()["entries"] == 2
+    assert cache.evictions == 1
+
+
+def test_byte_budget_evicts_before_the_entry_limit():
+    cache = SemanticCache(max_entries=8, max_bytes=2 * (2 * 4 + 1 + 100))
+    for i, vector in enumerate(([1.0, 0.0], [0.0, 1.0], [-1.0, 0.0])):
+        cache.put(vector, str(i), "x" * 100, FINGERPRINT)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= cache.max_bytes
+    assert cache.lookup([1.0, 0.0], FINGERPRINT) is None
+
+
+def test_fingerprint_change_invalidates_everything():
+    cache = SemanticCache()
+    cache.put([1.0, 0.0], "prompt", "answer", FINGERPRINT)
+
+    changed = make_fingerprint("index", "namespace", "another model")
+    assert changed != FINGERPRINT
+    assert cache.lookup([1.0, 0.0], changed) is None
+    assert cache.stats()["invalidations"] == 1
+    # the old setup's answers are gone for good
+    assert cache.lookup([1.0, 0.0], FINGERPRINT) is None
+
+
+def test_invalidate_drops_every_entry():
+    cache = SemanticCache()
+    cache.put([1.0, 0.0], "a", "A", FINGERPRINT)
+    cache.put([0.0, 1.0], "b", "B", FINGERPRINT)
+    cache.invalidate()
+
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+    assert cache.lookup([1.0, 0.0], FINGERPRINT) is None
+    # evicted slots are reusable
+    cache.put([1.0, 0.0], "a", "A", FINGERPRINT)
+    assert cache.lookup([1.0, 0.0], FINGERPRINT) == "A"
@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+from src.core.single_flight import SingleFlight
+
+
+def test_caller_arriving_while_the_last_waiter_leaves_starts_afresh():
+    async def scenario():
+        flights = SingleFlight()
+        abandoned = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                abandoned.set()
+                raise
+
+        async def fast():
+            return "fresh"
+
+        first = asyncio.ensure_future(flights.run("key", slow))
+        await asyncio.sleep(0)
+        # the only waiter goes away and a new caller arrives in the same loop iteration
+        first.cancel()
+        late = asyncio.ensure_future(flights.run("key", fast))
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await late == ("fresh", False)
+        await abandoned.wait()
+        assert flights.started == 2
+        assert len(flights) == 0
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_callers_share_one_result():
+    async def scenario():
+        flights = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "answer"
+
+        callers = [asyncio.ensure_future(flights.run("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert len(flights) == 1
+        release.set()
+
+        assert await asyncio.gather(*callers) == [("answer", False), ("answer", True), ("answer", True)]
+        assert calls == 1
+        assert flights.stats()["started"] == 1 and flights.stats()["joined"] == 2
+        assert len(flights) == 0
+
+        # nothing is kept once the flight landed
+        assert await flights.run("key", work) == ("answer", False)
+        assert calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_do_not_join():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0)
+            return "answer"
+
+        results = await asyncio.gather(flights.run("a", work), flights.run("b", work))
+        assert results == [("answer", False), ("answer", False)]
+        assert flights.started == 2
+
+    asyncio.run(scenario())
+
+
+def test_exception_is_shared_with_every_caller():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            raise ValueError("boom")
+
+        callers = [asyncio.ensure_future(flights.run("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+
+        for caller in callers:
+            with pytest.raises(ValueError, match="boom"):
+                await caller
+        assert len(flights) == 0
+
+    asyncio.run(scenario())
+
+
+def test_follower_survives_the_leader_going_away():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "answer"
+
+        leader = asyncio.ensure_future(flights.run("key", work))
+        follower = asyncio.ensure_future(flights.run("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await follower == ("answer", True)
+
+    asyncio.run(scenario())
+
+
+def test_work_is_cancelled_once_every_caller_left():
+    async def scenario():
+        flights = SingleFlight()
+        abandoned = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                abandoned.set()
+                raise
+
+        callers = [asyncio.ensure_future(flights.run("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+
+        await asyncio.wait_for(abandoned.wait(), 1)
+        assert len(flights) == 0
+
+    asyncio.run(scenario())
+
+
+def test_disabled_single_flight_runs_every_call():
+    async def scenario():
+        flights = SingleFlight(enabled=False)
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            return "answer"
+
+        results = await asyncio.gather(flights.run("key", work), flights.run("key", work))
+        assert results == [("answer", False), ("answer", False)]
+        assert calls == 2
+        assert flights.started == 0
+
+    asyncio.run(scenario())